@@ -0,0 +1,29 @@
+"""Add tasks_version to teams
+
+Revision ID: 3b9d4f0e7a12
+Revises: c1ca59e32a57
+Create Date: 2026-10-17 14:03:27.114902
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3b9d4f0e7a12'
+down_revision: Union[str, None] = 'c1ca59e32a57'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # A constant default does not rewrite the table on PostgreSQL 11+
+    op.add_column('teams', sa.Column('tasks_version', sa.Integer(), server_default=sa.text('0'), nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('teams', 'tasks_version')
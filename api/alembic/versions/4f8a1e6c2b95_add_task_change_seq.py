@@ -0,0 +1,35 @@
+"""Add change_seq to tasks for the change feed
+
+Revision ID: 4f8a1e6c2b95
+Revises: 7d2e9f4b1c63
+Create Date: 2026-10-17 18:55:14.402617
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4f8a1e6c2b95'
+down_revision: Union[str, None] = '7d2e9f4b1c63'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # A constant default does not rewrite the table on PostgreSQL 11+. Existing
+    # tasks start at 0, before any token: a first sync lists them anyway.
+    op.add_column('tasks', sa.Column('change_seq', sa.Integer(), server_default=sa.text('0'), nullable=False))
+    with op.get_context().autocommit_block():
+        op.create_index('ix_tasks_team_id_change_seq', 'tasks', ['team_id', 'change_seq', 'id'], unique=False,
+                        postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_tasks_team_id_change_seq', table_name='tasks', postgresql_concurrently=True)
+    op.drop_column('tasks', 'change_seq')
@@ -0,0 +1,44 @@
+"""Add full-text search index on tasks
+
+Revision ID: 5c2e8a1d9f30
+Revises: 3b9d4f0e7a12
+Create Date: 2026-10-17 16:41:09.207315
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c2e8a1d9f30'
+down_revision: Union[str, None] = '3b9d4f0e7a12'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+ACTIVE_TASKS = sa.text('is_deleted = false')
+# Must stay identical to app.models.task.SEARCH_VECTOR_SQL
+SEARCH_VECTOR_SQL = (
+    "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(description, '')), 'B')"
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    with op.get_context().autocommit_block():
+        op.create_index('ix_tasks_search_vector_active', 'tasks', [sa.text(f'({SEARCH_VECTOR_SQL})')],
+                        unique=False, postgresql_using='gin', postgresql_where=ACTIVE_TASKS,
+                        postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_tasks_search_vector_active', table_name='tasks', postgresql_concurrently=True)
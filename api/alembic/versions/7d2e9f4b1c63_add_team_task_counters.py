@@ -0,0 +1,51 @@
+"""Add team task counters
+
+Revision ID: 7d2e9f4b1c63
+Revises: e3b7c5a90d42
+Create Date: 2026-10-17 17:40:52.918364
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7d2e9f4b1c63'
+down_revision: Union[str, None] = 'e3b7c5a90d42'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('team_task_counters',
+    sa.Column('team_id', sa.UUID(), nullable=False),
+    sa.Column('dimension', sa.String(length=16), nullable=False),
+    sa.Column('key', sa.String(length=64), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['team_id'], ['teams.id'], ),
+    sa.PrimaryKeyConstraint('team_id', 'dimension', 'key')
+    )
+    # Backfill with the keys of app.crud.crud_task_stats.counter_keys;
+    # `python -m app.commands.reconcile_task_stats` recomputes them the same way
+    op.execute("""
+        INSERT INTO team_task_counters (team_id, dimension, key, count)
+        SELECT team_id, 'status', CASE WHEN completed THEN 'completed' ELSE 'open' END, count(*)
+        FROM tasks WHERE NOT is_deleted GROUP BY 1, 2, 3
+        UNION ALL
+        SELECT team_id, 'priority', coalesce(priority::text, 'none'), count(*)
+        FROM tasks WHERE NOT is_deleted AND NOT completed GROUP BY 1, 2, 3
+        UNION ALL
+        SELECT team_id, 'assignee', coalesce(assignee_id::text, 'none'), count(*)
+        FROM tasks WHERE NOT is_deleted AND NOT completed GROUP BY 1, 2, 3
+        UNION ALL
+        SELECT team_id, 'due_date', to_char(due_date, 'YYYY-MM-DD'), count(*)
+        FROM tasks WHERE NOT is_deleted AND NOT completed GROUP BY 1, 2, 3
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('team_task_counters')
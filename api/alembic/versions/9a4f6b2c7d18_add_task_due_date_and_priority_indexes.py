@@ -0,0 +1,40 @@
+"""Add due date and priority indexes for team task listing
+
+Revision ID: 9a4f6b2c7d18
+Revises: 5c2e8a1d9f30
+Create Date: 2026-10-17 15:02:37.184250
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9a4f6b2c7d18'
+down_revision: Union[str, None] = '5c2e8a1d9f30'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+ACTIVE_TASKS = sa.text('is_deleted = false')
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Built CONCURRENTLY outside of the migration transaction, like the other task indexes
+    with op.get_context().autocommit_block():
+        op.create_index('ix_tasks_team_id_due_date_active', 'tasks',
+                        ['team_id', 'due_date', 'id'], unique=False,
+                        postgresql_where=ACTIVE_TASKS, postgresql_concurrently=True)
+        op.create_index('ix_tasks_team_id_priority_active', 'tasks',
+                        ['team_id', 'priority', 'id'], unique=False,
+                        postgresql_where=ACTIVE_TASKS, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_tasks_team_id_priority_active', table_name='tasks', postgresql_concurrently=True)
+        op.drop_index('ix_tasks_team_id_due_date_active', table_name='tasks', postgresql_concurrently=True)
@@ -0,0 +1,54 @@
+"""Add composite and partial indexes for team task listing
+
+Revision ID: c1ca59e32a57
+Revises: 6e78ab76ddd5
+Create Date: 2026-10-17 09:12:41.508311
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c1ca59e32a57'
+down_revision: Union[str, None] = '6e78ab76ddd5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+ACTIVE_TASKS = sa.text('is_deleted = false')
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Indexes are built CONCURRENTLY so existing tables stay writable,
+    # which has to happen outside of the migration transaction.
+    with op.get_context().autocommit_block():
+        op.create_index('ix_tasks_team_id_created_at_active', 'tasks',
+                        ['team_id', 'created_at', 'id'], unique=False,
+                        postgresql_where=ACTIVE_TASKS, postgresql_concurrently=True)
+        op.create_index('ix_tasks_team_id_assignee_id_created_at_active', 'tasks',
+                        ['team_id', 'assignee_id', 'created_at', 'id'], unique=False,
+                        postgresql_where=ACTIVE_TASKS, postgresql_concurrently=True)
+        op.create_index('ix_tasks_team_id_completed_created_at_active', 'tasks',
+                        ['team_id', 'completed', 'created_at', 'id'], unique=False,
+                        postgresql_where=ACTIVE_TASKS, postgresql_concurrently=True)
+        op.create_index('ix_tasks_assignee_id', 'tasks', ['assignee_id'], unique=False,
+                        postgresql_concurrently=True)
+        op.create_index('ix_tasks_creator_id', 'tasks', ['creator_id'], unique=False,
+                        postgresql_concurrently=True)
+        op.create_index('ix_team_members_user_id_team_id', 'team_members',
+                        ['user_id', 'team_id'], unique=False, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_team_members_user_id_team_id', table_name='team_members', postgresql_concurrently=True)
+        op.drop_index('ix_tasks_creator_id', table_name='tasks', postgresql_concurrently=True)
+        op.drop_index('ix_tasks_assignee_id', table_name='tasks', postgresql_concurrently=True)
+        op.drop_index('ix_tasks_team_id_completed_created_at_active', table_name='tasks', postgresql_concurrently=True)
+        op.drop_index('ix_tasks_team_id_assignee_id_created_at_active', table_name='tasks', postgresql_concurrently=True)
+        op.drop_index('ix_tasks_team_id_created_at_active', table_name='tasks', postgresql_concurrently=True)
@@ -0,0 +1,40 @@
+"""Add assignee and creator due date indexes for the user task inbox
+
+Revision ID: e3b7c5a90d42
+Revises: 9a4f6b2c7d18
+Create Date: 2026-10-17 16:21:08.730194
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e3b7c5a90d42'
+down_revision: Union[str, None] = '9a4f6b2c7d18'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+ACTIVE_TASKS = sa.text('is_deleted = false')
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Built CONCURRENTLY outside of the migration transaction, like the other task indexes
+    with op.get_context().autocommit_block():
+        op.create_index('ix_tasks_assignee_id_due_date_active', 'tasks',
+                        ['assignee_id', 'due_date', 'id'], unique=False,
+                        postgresql_where=ACTIVE_TASKS, postgresql_concurrently=True)
+        op.create_index('ix_tasks_creator_id_due_date_active', 'tasks',
+                        ['creator_id', 'due_date', 'id'], unique=False,
+                        postgresql_where=ACTIVE_TASKS, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_tasks_creator_id_due_date_active', table_name='tasks', postgresql_concurrently=True)
+        op.drop_index('ix_tasks_assignee_id_due_date_active', table_name='tasks', postgresql_concurrently=True)
@@ -1,13 +1,13 @@
-from typing import Generator
+from typing import AsyncGenerator, Optional
 import uuid
 
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Query, Request, WebSocket, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.security import decode_token
 from app.core.config import settings
-from app.db.session import SessionLocal
+from app.db.session import AsyncSessionLocal, read_session_factory, record_write
 from app.models.user import User
 from app.crud import crud_user
 from app.schemas import token as token_schema
@@ -16,48 +16,95 @@ reusable_oauth2 = OAuth2PasswordBearer(
     tokenUrl=f"{settings.API_V1_STR}/login/access-token"
 )
 
-def get_db() -> Generator:
-    """Dependency to get a database session."""
-    db = SessionLocal()
-    try:
+# Requests that cannot write, and so do not pin the user to the primary
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+async def get_db() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Dependency to get an async database session.
+    CRUD functions are sync and run through `await db.run_sync(crud_fn, ...)`.
+    """
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
 
-def get_current_user(
-    db: Session = Depends(get_db),
-    token: str = Depends(reusable_oauth2)
-) -> User:
-    """Dependency to get the current user based on JWT token."""
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
+async def get_token_user(db: AsyncSession, token: str) -> Optional[User]:
+    """Gets the user a JWT token was issued to, or None if the token is invalid."""
     payload = decode_token(token)
     if payload is None:
-        raise credentials_exception
+        return None
 
     user_id_str = payload.get("sub")
     if user_id_str is None:
-        raise credentials_exception
+        return None
 
     try:
         user_id = uuid.UUID(user_id_str)
     except ValueError:
-        raise credentials_exception # Invalid UUID format in token
+        return None # Invalid UUID format in token
 
     token_data = token_schema.TokenData(sub=user_id_str) # Validate payload structure (optional but good practice)
 
-    user = crud_user.get_user(db, user_id=user_id)
+    # None if the user ID from the token doesn't exist
+    return await db.run_sync(crud_user.get_user_cached, user_id=user_id)
+
+async def get_current_user(
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    token: str = Depends(reusable_oauth2)
+) -> User:
+    """Dependency to get the current user based on JWT token."""
+    user = await get_token_user(db, token)
     if user is None:
-        raise credentials_exception # User ID from token doesn't exist
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    if request.method not in SAFE_METHODS:
+        record_write(user.id)
     return user
 
-def get_current_active_user(
+async def get_current_active_user(
     current_user: User = Depends(get_current_user)
 ) -> User:
     """Dependency to get the current active user. Rejects inactive users."""
     if not current_user.is_active:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Inactive user")
     return current_user
+
+async def get_websocket_user(
+    websocket: WebSocket,
+    db: AsyncSession = Depends(get_db),
+    token: Optional[str] = Query(None, description="Access token, for clients that cannot set the Authorization header"),
+) -> Optional[User]:
+    """
+    Dependency to get the active user of a WebSocket connection, from a bearer
+    token in the Authorization header or else the `token` query parameter.
+    Returns None instead of raising: the endpoint closes the connection.
+    """
+    authorization = websocket.headers.get("Authorization")
+    if authorization:
+        scheme, _, param = authorization.partition(" ")
+        token = param if scheme.lower() == "bearer" else None
+    if not token:
+        return None
+    user = await get_token_user(db, token)
+    if user is None or not user.is_active:
+        return None
+    return user
+
+async def get_read_db(
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+) -> AsyncGenerator[AsyncSession, None]:
+    """
+    Dependency to get a session for read-only endpoints: on a read replica when
+    replicas are configured, unless the current user wrote recently and must
+    read from the primary to see their own writes.
+    """
+    session_factory = read_session_factory(current_user.id)
+    if session_factory is None:
+        yield db
+        return
+    async with session_factory() as replica_db:
+        yield replica_db
@@ -0,0 +1,26 @@
+from fastapi import APIRouter, Depends
+
+from app import schemas
+from app.api import deps
+from app.crud import crud_team, crud_user
+from app.db.session import async_engine, pool_status
+from app.models import user as models_user
+
+router = APIRouter()
+
+@router.get("/", response_model=schemas.Metrics)
+async def read_metrics(
+    current_user: models_user.User = Depends(deps.get_current_active_user),
+):
+    """
+    Process-local operational metrics: database pool usage and checkout waits,
+    and hit rates of the in-process caches. Requires an authenticated user.
+    """
+    return {
+        "db_pool": pool_status(async_engine.pool),
+        "caches": {
+            "membership": crud_team.membership_cache.stats(),
+            "principal": crud_user.principal_cache.stats(),
+            "team_directory": crud_team.directory_cache.stats(),
+        },
+    }
@@ -1,129 +1,652 @@
+import asyncio
+import csv
+import io
 import uuid
+from datetime import date, datetime
 from typing import List, Optional
 import math
 
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, File, Header, HTTPException, status, Query, Response, UploadFile, WebSocket
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app import models, schemas
 from app.api import deps
-from app.crud import crud_task, crud_team
+from app.core import events
+from app.crud import crud_task, crud_task_import, crud_task_search, crud_team
 from app.models import user as models_user
-from app.schemas.task import Task, TaskCreate, TaskUpdate, TaskPage
-from app.utils.pagination import create_page
+from app.schemas.common import ExportFormat, TotalMode
+from app.schemas.task import Task, TaskChange, TaskChangeFeed, TaskCreate, TaskUpdate, TaskPage, TaskSearchPage
+from app.utils.etag import etag_matches, make_etag
+from app.utils.export import MEDIA_TYPES, stream_export
+from app.utils.pagination import create_page, create_cursor_page, encode_cursor, decode_cursor
+from app.utils.serialization import json_response
 
 router = APIRouter()
 
+# Rows fetched from the server-side cursor per round trip of an export
+EXPORT_CHUNK_SIZE = 1000
+
+# Keyset pages cost the same however deep a client scrolls, so the cap is higher
+# than what OFFSET paging could sustain on large teams.
+MAX_PAGE_SIZE = 500
+
+# Every hit of a search page is ranked and gets a snippet, so pages stay small
+MAX_SEARCH_PAGE_SIZE = 100
+
+
+def task_cursor(task: models.task.Task, sort: crud_task.TaskSort = crud_task.DEFAULT_TASK_SORT) -> str:
+    """Builds the opaque keyset cursor pointing right after `task` in a list ordered by `sort`."""
+    return encode_cursor(*crud_task.task_sort_values(task, sort))
+
+
+def task_etag(task: models.task.Task) -> str:
+    """Strong ETag of a task: changes with the task's and its assignee's updated_at."""
+    return make_etag(task.id, task.updated_at, task.assignee.updated_at if task.assignee else None)
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
 
 @router.post("/", response_model=schemas.Task, status_code=status.HTTP_201_CREATED)
-def create_task(
+async def create_task(
     *,
-    db: Session = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_db),
     task_in: schemas.TaskCreate,
     current_user: models_user.User = Depends(deps.get_current_active_user),
 ) -> schemas.Task:
     """
     Create new task for a specific team. User must be a member of the team.
     """
-    # Check if the target team exists
-    team = crud_team.get_team(db=db, team_id=task_in.team_id)
-    if not team:
+    # Check that the target team exists and the current user is a member of it
+    team_exists, is_member = await db.run_sync(crud_team.get_team_access, team_id=task_in.team_id, user_id=current_user.id)
+    if not team_exists:
          raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Team with id {task_in.team_id} not found.",
         )
-    # Check if the current user is a member of the target team
-    is_member = crud_team.is_user_member_of_team(db=db, team_id=task_in.team_id, user_id=current_user.id)
     if not is_member:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not authorized to create tasks for this team",
         )
     # Use the updated CRUD function, passing creator_id
-    task = crud_task.create_task(db=db, task_in=task_in, creator_id=current_user.id)
+    task = await db.run_sync(crud_task.create_task, task_in=task_in, creator_id=current_user.id)
     return task
 
 
+@router.post("/bulk", response_model=List[schemas.Task], status_code=status.HTTP_201_CREATED)
+async def create_tasks_bulk(
+    *,
+    db: AsyncSession = Depends(deps.get_db),
+    tasks_in: schemas.TaskBulkCreate,
+    current_user: models_user.User = Depends(deps.get_current_active_user),
+) -> Response:
+    """
+    Create up to 1000 tasks at once, possibly across several teams. User must be a member of every team.
+    Either all tasks are created, or none: when any item is invalid the response is a 400 whose
+    detail lists the position and error of each invalid item.
+    """
+    tasks, errors = await db.run_sync(crud_task.create_tasks_bulk, tasks_in=tasks_in.items, creator_id=current_user.id)
+    if errors:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=[error.model_dump() for error in errors],
+        )
+    return json_response(List[schemas.Task], tasks, status_code=status.HTTP_201_CREATED)
+
+
+async def authorize_bulk_selection(
+    db: AsyncSession, selection: schemas.TaskBulkSelection, user: models_user.User
+) -> List[uuid.UUID]:
+    """
+    Checks that the user is a member of every team touched by a bulk selection,
+    once per team, and returns those team ids.
+    """
+    if selection.ids is not None:
+        team_access = await db.run_sync(crud_task.get_task_teams_for_user, task_ids=selection.ids, user_id=user.id)
+        if not all(team_access.values()):
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Not authorized to modify tasks of all the given teams",
+            )
+        return list(team_access)
+
+    team_id = selection.filter.team_id
+    team_exists, is_member = await db.run_sync(crud_team.get_team_access, team_id=team_id, user_id=user.id)
+    if not team_exists:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Team with id {team_id} not found.",
+        )
+    if not is_member:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to modify tasks of this team",
+        )
+    return [team_id]
+
+
+@router.patch("/bulk", response_model=schemas.TaskBulkResult)
+async def update_tasks_bulk(
+    *,
+    db: AsyncSession = Depends(deps.get_db),
+    bulk_in: schemas.TaskBulkUpdate,
+    current_user: models_user.User = Depends(deps.get_current_active_user),
+) -> schemas.TaskBulkResult:
+    """
+    Apply one set of changes to many tasks, given by ids or by a filter within a team.
+    User must be a member of every team involved. Unknown or deleted tasks are skipped;
+    the response lists the ids of the tasks that were updated.
+    """
+    changes = bulk_in.changes.model_dump(exclude_unset=True)
+    if "team_id" in changes:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cannot change team_id via update. Create a new task or implement a move feature.",
+        )
+    if not changes:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="No changes given.")
+
+    team_ids = await authorize_bulk_selection(db, bulk_in, current_user)
+    affected_ids = await db.run_sync(
+        crud_task.update_tasks_bulk,
+        team_ids=team_ids,
+        values=changes,
+        task_ids=bulk_in.ids,
+        assignee_id=bulk_in.filter.assignee_id if bulk_in.filter else None,
+        completed=bulk_in.filter.completed if bulk_in.filter else None,
+    )
+    return schemas.TaskBulkResult(affected_ids=affected_ids)
+
+
+@router.post("/bulk/delete", response_model=schemas.TaskBulkResult)
+async def delete_tasks_bulk(
+    *,
+    db: AsyncSession = Depends(deps.get_db),
+    selection: schemas.TaskBulkSelection,
+    current_user: models_user.User = Depends(deps.get_current_active_user),
+) -> schemas.TaskBulkResult:
+    """
+    Soft delete many tasks, given by ids or by a filter within a team.
+    User must be a member of every team involved. The response lists the ids of the tasks that were deleted.
+    """
+    team_ids = await authorize_bulk_selection(db, selection, current_user)
+    affected_ids = await db.run_sync(
+        crud_task.update_tasks_bulk,
+        team_ids=team_ids,
+        values={"is_deleted": True},
+        task_ids=selection.ids,
+        assignee_id=selection.filter.assignee_id if selection.filter else None,
+        completed=selection.filter.completed if selection.filter else None,
+    )
+    return schemas.TaskBulkResult(affected_ids=affected_ids)
+
+
+@router.post("/import", response_model=schemas.TaskImportResult, status_code=status.HTTP_201_CREATED)
+async def import_tasks(
+    *,
+    db: AsyncSession = Depends(deps.get_db),
+    team_id: uuid.UUID = Query(..., description="The ID of the team to import the tasks into"),
+    skip_invalid: bool = Query(False, description="Import the valid rows even if some rows are invalid"),
+    file: UploadFile = File(..., description="CSV file with a header row: title, due_date and optionally description, completed, priority, assignee_id"),
+    current_user: models_user.User = Depends(deps.get_current_active_user),
+) -> schemas.TaskImportResult:
+    """
+    Import tasks into a team from a CSV file. User must be a member of the team.
+    Rows are validated and bulk loaded (COPY on PostgreSQL) in chunks into a staging table, then
+    merged into the team's tasks in one statement. Invalid rows are reported by line number; unless
+    `skip_invalid` is set, any invalid row makes the import fail with a 400 and nothing is created.
+    """
+    # Check that the team exists and the current user is a member of it
+    team_exists, is_member = await db.run_sync(crud_team.get_team_access, team_id=team_id, user_id=current_user.id)
+    if not team_exists:
+         raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Team with id {team_id} not found.",
+        )
+    if not is_member:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to create tasks for this team",
+        )
+
+    task_import = crud_task_import.TaskImport(team_id=team_id, creator_id=current_user.id, skip_invalid=skip_invalid)
+    await db.run_sync(task_import.start)
+    try:
+        # The upload is spooled to disk by Starlette and read lazily, chunk by chunk
+        for chunk in crud_task_import.read_csv_chunks(io.TextIOWrapper(file.file, encoding="utf-8-sig", newline="")):
+            await db.run_sync(task_import.add_chunk, chunk)
+    except (ValueError, UnicodeDecodeError, csv.Error) as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Invalid CSV file: {e}")
+    result = await db.run_sync(task_import.finish)
+
+    if result.error_count and not skip_invalid:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=result.model_dump())
+    return result
+
+
 @router.get("/", response_model=TaskPage)
-def read_tasks(
+async def read_tasks(
     *,
-    db: Session = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_read_db),
     team_id: uuid.UUID = Query(..., description="The ID of the team whose tasks to retrieve"),
-    skip: int = Query(0, ge=0, description="Number of items to skip (0-based index)"),
-    limit: int = Query(100, ge=1, le=100, description="Maximum number of items per page"),
+    skip: int = Query(0, ge=0, description="Number of items to skip (0-based index). Legacy OFFSET paging, prefer `cursor`"),
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE, description="Maximum number of items per page"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page's `next_cursor`"),
     current_user: models_user.User = Depends(deps.get_current_active_user),
     # Optional Filters
     assignee_id: Optional[uuid.UUID] = Query(None, description="Filter tasks by assignee user ID"),
-    completed: Optional[bool] = Query(None, description="Filter tasks by completion status (true=completed, false=pending)")
-) -> TaskPage:
-    """Retrieve tasks for a specific team with pagination and optional filters. User must be a member of the team."""
-    # Check if the team exists
-    team = crud_team.get_team(db=db, team_id=team_id)
-    if not team:
+    completed: Optional[bool] = Query(None, description="Filter tasks by completion status (true=completed, false=pending)"),
+    due_after: Optional[date] = Query(None, description="Only tasks due on or after this date"),
+    due_before: Optional[date] = Query(None, description="Only tasks due on or before this date"),
+    priority: Optional[int] = Query(None, description="Filter tasks by priority"),
+    overdue: Optional[bool] = Query(None, description="true: only pending tasks due before today; false: all others"),
+    sort: str = Query(
+        "created_at",
+        description="Comma separated sort keys among due_date, priority, created_at and title, "
+        "prefixed with '-' for descending order, e.g. due_date,-priority,created_at",
+    ),
+    # Total count
+    total: TotalMode = Query(TotalMode.EXACT, description="How to compute total_items: exact, estimated (planner estimate) or none"),
+    include_total: bool = Query(True, description="Set to false to skip computing total_items (same as total=none)"),
+    if_none_match: Optional[str] = Header(None),
+) -> Response:
+    """
+    Retrieve tasks for a specific team with pagination and optional filters. User must be a member of the team.
+    Tasks are ordered by `sort` (creation time by default), ties broken by id; tasks without a
+    priority come last. Pass the `next_cursor` of a page as `cursor`, with the same filters and
+    sort, to get the next one; `skip` is kept for OFFSET paging.
+    Counting every matching task is the most expensive part of a page on large teams:
+    use `total=estimated` or `include_total=false` when an exact total is not needed.
+    Responses carry an ETag versioning the team's tasks and their embedded assignees, for these
+    query parameters; polling with `If-None-Match` returns 304 without listing anything while no
+    task of the team was written and no assignee of its live tasks was updated. Pages with an
+    estimated total carry no ETag, since the estimate changes without writes.
+    The page is serialized straight from the loaded rows, without re-validating them.
+    """
+    try:
+        task_sort = crud_task.parse_task_sort(sort)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    after = None
+    if cursor is not None:
+        if skip:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Use either skip or cursor, not both.",
+            )
+        try:
+            after = tuple(decode_cursor(cursor, *crud_task.task_sort_types(task_sort)))
+        except ValueError:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+    # Check that the team exists and the current user is a member of it, reading the
+    # task list version first: a write racing with the listing can only make the ETag older
+    tasks_version, is_member = await db.run_sync(crud_team.get_team_tasks_version, team_id=team_id, user_id=current_user.id)
+    if tasks_version is None:
          raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Team with id {team_id} not found.",
         )
-    # Check if the current user is a member of the requested team
-    is_member = crud_team.is_user_member_of_team(db=db, team_id=team_id, user_id=current_user.id)
     if not is_member:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not authorized to view tasks for this team",
         )
+    if not include_total:
+        total = TotalMode.NONE
+    # A planner estimate can change without any write, so estimated pages get no ETag
+    headers = None
+    if total is not TotalMode.ESTIMATED:
+        # Each page, filter set, sort and total mode is a representation of its own
+        etag = make_etag(
+            team_id, tasks_version, skip, limit, after, assignee_id, completed, due_after, due_before,
+            priority, overdue, task_sort, total.value,
+            # Which tasks are overdue changes at midnight without any write
+            date.today() if overdue is not None else None,
+        )
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+        headers = {"ETag": etag}
 
     # Call CRUD function to get items and total count, passing filters
-    tasks_list, total_items = crud_task.get_tasks_by_team(
-        db=db,
+    tasks_list, total_items = await db.run_sync(
+        crud_task.get_tasks_by_team,
         team_id=team_id,
         skip=skip,
-        limit=limit,
+        # Fetch one extra row to know whether another page follows without relying on the total
+        limit=limit + 1,
         assignee_id=assignee_id, # Pass filter
-        completed=completed # Pass filter
+        completed=completed, # Pass filter
+        due_after=due_after,
+        due_before=due_before,
+        priority=priority,
+        overdue=overdue,
+        sort=task_sort,
+        after=after,
+        total=total,
+    )
+    is_estimate = total is TotalMode.ESTIMATED
+
+    def cursor_for(task: models.task.Task) -> str:
+        return task_cursor(task, task_sort)
+
+    if after is not None:
+        page = create_cursor_page(
+            items=tasks_list, total_items=total_items, limit=limit, cursor_for=cursor_for, total_is_estimate=is_estimate,
+        )
+        return json_response(TaskPage, page, headers=headers)
+
+    # Offset pages also hand out a cursor so clients can switch to keyset paging
+    has_more = len(tasks_list) > limit
+    tasks_list = tasks_list[:limit]
+    next_cursor = cursor_for(tasks_list[-1]) if has_more and tasks_list else None
+    page = create_page(
+        items=tasks_list, total_items=total_items, skip=skip, limit=limit, next_cursor=next_cursor, total_is_estimate=is_estimate,
+    )
+    return json_response(TaskPage, page, headers=headers)
+
+
+@router.get("/export", response_class=StreamingResponse)
+async def export_tasks(
+    *,
+    db: AsyncSession = Depends(deps.get_db),
+    team_id: uuid.UUID = Query(..., description="The ID of the team whose tasks to export"),
+    export_format: ExportFormat = Query(ExportFormat.NDJSON, alias="format", description="Output format: ndjson or csv"),
+    current_user: models_user.User = Depends(deps.get_current_active_user),
+    # Optional Filters
+    assignee_id: Optional[uuid.UUID] = Query(None, description="Filter tasks by assignee user ID"),
+    completed: Optional[bool] = Query(None, description="Filter tasks by completion status (true=completed, false=pending)"),
+    due_after: Optional[date] = Query(None, description="Only tasks due on or after this date"),
+    due_before: Optional[date] = Query(None, description="Only tasks due on or before this date"),
+    priority: Optional[int] = Query(None, description="Filter tasks by priority"),
+    overdue: Optional[bool] = Query(None, description="true: only pending tasks due before today; false: all others"),
+    sort: str = Query(
+        "created_at",
+        description="Comma separated sort keys among due_date, priority, created_at and title, "
+        "prefixed with '-' for descending order, e.g. due_date,-priority,created_at",
+    ),
+) -> StreamingResponse:
+    """
+    Export every task of a team matching the filters, as NDJSON or CSV, ordered by `sort`
+    (creation time by default) like GET /tasks. User must be a member of the team. Rows are
+    streamed from a server-side cursor in chunks, so the export runs in constant memory
+    whatever the size of the team.
+    """
+    try:
+        task_sort = crud_task.parse_task_sort(sort)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    # Check that the team exists and the current user is a member of it
+    team_exists, is_member = await db.run_sync(crud_team.get_team_access, team_id=team_id, user_id=current_user.id)
+    if not team_exists:
+         raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Team with id {team_id} not found.",
+        )
+    if not is_member:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to view tasks for this team",
+        )
+
+    stmt = crud_task.get_tasks_export_query(
+        team_id=team_id, assignee_id=assignee_id, completed=completed,
+        due_after=due_after, due_before=due_before, priority=priority, overdue=overdue, sort=task_sort,
+    )
+    # Started before the response so that query errors still surface as an error status.
+    # The cursor outlives this function: get_db closes the session only once the body is sent.
+    result = await db.stream(stmt.execution_options(yield_per=EXPORT_CHUNK_SIZE))
+    return StreamingResponse(
+        stream_export(result, export_format),
+        media_type=MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="tasks-{team_id}.{export_format.value}"'},
     )
 
-    return create_page(items=tasks_list, total_items=total_items, skip=skip, limit=limit)
+
+@router.get("/search", response_model=TaskSearchPage)
+async def search_tasks(
+    *,
+    db: AsyncSession = Depends(deps.get_read_db),
+    team_id: uuid.UUID = Query(..., description="The ID of the team whose tasks to search"),
+    q: str = Query(..., min_length=1, max_length=200, description="Keywords, in web search syntax on PostgreSQL (\"phrase\", -word, or)"),
+    limit: int = Query(20, ge=1, le=MAX_SEARCH_PAGE_SIZE, description="Maximum number of hits per page"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page's `next_cursor`"),
+    current_user: models_user.User = Depends(deps.get_current_active_user),
+) -> Response:
+    """
+    Search a team's tasks by keywords in their title and description, best matches first.
+    User must be a member of the team. Each hit carries a snippet with the matches highlighted.
+    Pass the `next_cursor` of a page as `cursor` to get the next one.
+    """
+    after = None
+    if cursor is not None:
+        try:
+            after = tuple(decode_cursor(cursor, float, uuid.UUID))
+        except ValueError:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+    # Check that the team exists and the current user is a member of it
+    team_exists, is_member = await db.run_sync(crud_team.get_team_access, team_id=team_id, user_id=current_user.id)
+    if not team_exists:
+         raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Team with id {team_id} not found.",
+        )
+    if not is_member:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to view tasks for this team",
+        )
+
+    # One extra hit tells whether another page follows
+    hits = await db.run_sync(crud_task_search.search_tasks, team_id=team_id, query=q, limit=limit + 1, after=after)
+    page = create_cursor_page(
+        items=hits, total_items=None, limit=limit, cursor_for=lambda hit: encode_cursor(hit.rank, hit.task.id),
+    )
+    return json_response(TaskSearchPage, page)
+
+
+@router.get("/mine", response_model=TaskPage)
+async def read_my_tasks(
+    *,
+    db: AsyncSession = Depends(deps.get_read_db),
+    include_created: bool = Query(False, description="Also list the tasks the current user created"),
+    completed: Optional[bool] = Query(None, description="Filter tasks by completion status (true=completed, false=pending)"),
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE, description="Maximum number of items per page"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page's `next_cursor`"),
+    current_user: models_user.User = Depends(deps.get_current_active_user),
+) -> Response:
+    """
+    Retrieve the tasks assigned to the current user (optionally also the ones they created)
+    across all the teams they are a member of, ordered by due date.
+    Pass the `next_cursor` of a page as `cursor` to get the next one. No total is computed.
+    """
+    after = None
+    if cursor is not None:
+        try:
+            after = tuple(decode_cursor(cursor, *crud_task.task_sort_types(crud_task.USER_TASK_SORT)))
+        except ValueError:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+    # One extra row tells whether another page follows
+    tasks_list = await db.run_sync(
+        crud_task.get_tasks_for_user,
+        user_id=current_user.id,
+        include_created=include_created,
+        completed=completed,
+        limit=limit + 1,
+        after=after,
+    )
+    page = create_cursor_page(
+        items=tasks_list, total_items=None, limit=limit,
+        cursor_for=lambda task: task_cursor(task, crud_task.USER_TASK_SORT),
+    )
+    return json_response(TaskPage, page)
+
+
+@router.get("/changes", response_model=TaskChangeFeed)
+async def read_task_changes(
+    *,
+    db: AsyncSession = Depends(deps.get_read_db),
+    team_id: uuid.UUID = Query(..., description="The ID of the team whose task changes to retrieve"),
+    since: Optional[str] = Query(None, description="`next_token` of a previous response; omit for a first, full sync"),
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE, description="Maximum number of changes per response"),
+    current_user: models_user.User = Depends(deps.get_current_active_user),
+) -> Response:
+    """
+    Delta sync of a team's tasks. User must be a member of the team.
+    Without `since`, lists every live task; with the `next_token` of a previous response,
+    only the tasks created, updated or deleted since then, deleted ones as tombstones.
+    Changes are ordered by a per-team sequence stamped by every task write, not by clock.
+    Keep calling with `next_token` while `has_more` is true, then store the token for the next sync.
+    """
+    after = None
+    if since is not None:
+        try:
+            after = tuple(decode_cursor(since, int, uuid.UUID))
+        except ValueError:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid change token")
+
+    # Read before the changes: every write stamped with this version or less is visible below
+    tasks_version, is_member = await db.run_sync(crud_team.get_team_tasks_version, team_id=team_id, user_id=current_user.id)
+    if tasks_version is None:
+         raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Team with id {team_id} not found.",
+        )
+    if not is_member:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to view tasks for this team",
+        )
+
+    # One extra row tells whether more changes follow
+    tasks_list = await db.run_sync(crud_task.get_task_changes, team_id=team_id, after=after, limit=limit + 1)
+    has_more = len(tasks_list) > limit
+    tasks_list = tasks_list[:limit]
+    if has_more:
+        # Resume inside the last change_seq: one bulk write can span several pages
+        next_token = encode_cursor(tasks_list[-1].change_seq, tasks_list[-1].id)
+    else:
+        # Caught up: the token covers every write seen, and never moves backwards
+        seen = max(tasks_version, tasks_list[-1].change_seq if tasks_list else 0, after[0] if after else 0)
+        next_token = encode_cursor(seen, None)
+
+    feed = TaskChangeFeed.model_construct(
+        changes=[
+            TaskChange.model_construct(id=task.id, deleted=task.is_deleted, task=None if task.is_deleted else task)
+            for task in tasks_list
+        ],
+        next_token=next_token,
+        has_more=has_more,
+    )
+    return json_response(TaskChangeFeed, feed)
+
+
+@router.websocket("/events")
+async def task_events(
+    websocket: WebSocket,
+    team_id: uuid.UUID = Query(..., description="The ID of the team whose task changes to follow"),
+    db: AsyncSession = Depends(deps.get_db),
+    current_user: Optional[models_user.User] = Depends(deps.get_websocket_user),
+) -> None:
+    """
+    Pushes the task changes of a team as they are committed. User must be a member of the team.
+    The first message is `{"type": "subscribed", "team_id": ..., "change_seq": ...}`, then one
+    `{"type": "created" | "updated" | "deleted", "team_id": ..., "task_ids": [...], "change_seq": ...}`
+    per write. Events carry no task contents: fetch them with GET /tasks/changes, which the
+    `change_seq` tells when to call. `task_ids` is null for imports and large bulk writes, and
+    `{"type": "resync"}` means events were missed: sync with GET /tasks/changes either way.
+    Connections are refused (close code 1008) without valid credentials or membership.
+    """
+    if current_user is None:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason="Could not validate credentials")
+        return
+
+    # Subscribed before reading the version, so no write falls between the two
+    with events.broker.subscribe(team_id) as subscription:
+        tasks_version, is_member = await db.run_sync(crud_team.get_team_tasks_version, team_id=team_id, user_id=current_user.id)
+        # Ends the transaction: the session holds no connection while the socket stays open
+        await db.commit()
+        if not is_member:
+            await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason="Not authorized to view tasks for this team")
+            return
+
+        await websocket.accept()
+        await websocket.send_json({"type": "subscribed", "team_id": str(team_id), "change_seq": tasks_version})
+
+        async def forward_events() -> None:
+            while True:
+                await websocket.send_json(await subscription.get())
+
+        sender = asyncio.create_task(forward_events())
+        try:
+            # Clients send nothing; reading only notices when they disconnect
+            while (await websocket.receive())["type"] != "websocket.disconnect":
+                pass
+        finally:
+            sender.cancel()
+            await asyncio.gather(sender, return_exceptions=True)
 
 
 @router.get("/{task_id}", response_model=schemas.Task)
-def read_task(
+async def read_task(
     *,
-    db: Session = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_read_db),
     task_id: uuid.UUID,
     current_user: models_user.User = Depends(deps.get_current_active_user),
+    if_none_match: Optional[str] = Header(None),
+    response: Response,
 ) -> schemas.Task:
     """
     Get task by ID. User must be a member of the task's team.
+    Honors `If-None-Match`: an unchanged task is answered with 304 from a single
+    timestamp lookup, without loading or serializing it.
     """
-    task = crud_task.get_task(db=db, task_id=task_id)
+    if if_none_match is not None:
+        timestamps, is_member = await db.run_sync(crud_task.get_task_timestamps_for_user, task_id=task_id, user_id=current_user.id)
+        if timestamps is not None and is_member:
+            etag = make_etag(task_id, *timestamps)
+            if etag_matches(if_none_match, etag):
+                return not_modified(etag)
+
+    # Load the task and check that the current user is a member of its team
+    task, is_member = await db.run_sync(crud_task.get_task_for_user, task_id=task_id, user_id=current_user.id)
     if not task:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Task not found")
-    # Check if the current user is a member of the task's team
-    is_member = crud_team.is_user_member_of_team(db=db, team_id=task.team_id, user_id=current_user.id)
     if not is_member:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not authorized to access this task",
         )
+    response.headers["ETag"] = task_etag(task)
     return task
 
 
 @router.put("/{task_id}", response_model=schemas.Task)
-def update_task(
+async def update_task(
     *,
-    db: Session = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_db),
     task_id: uuid.UUID,
     task_in: schemas.TaskUpdate,
     current_user: models_user.User = Depends(deps.get_current_active_user),
+    if_match: Optional[str] = Header(None),
+    response: Response,
 ) -> schemas.Task:
     """
     Update a task. User must be a member of the task's team.
+    With `If-Match`, the update only happens if the task still has that ETag, otherwise 412.
     """
-    task = crud_task.get_task(db=db, task_id=task_id)
+    # Load the task and check that the current user is a member of its team.
+    # Under If-Match the row is locked so the ETag cannot change before the update.
+    task, is_member = await db.run_sync(
+        crud_task.get_task_for_user, task_id=task_id, user_id=current_user.id, for_update=if_match is not None,
+    )
     if not task:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Task not found")
-    # Check if the current user is a member of the task's team
-    is_member = crud_team.is_user_member_of_team(db=db, team_id=task.team_id, user_id=current_user.id)
     if not is_member:
          raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -135,29 +658,34 @@ def update_task(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Cannot change team_id via update. Create a new task or implement a move feature.",
         )
-    updated_task = crud_task.update_task(db=db, db_task=task, task_in=task_in)
+    if if_match is not None and not etag_matches(if_match, task_etag(task), weak=False):
+        raise HTTPException(
+            status_code=status.HTTP_412_PRECONDITION_FAILED,
+            detail="The task was modified since it was read",
+        )
+    updated_task = await db.run_sync(crud_task.update_task, db_task=task, task_in=task_in)
+    response.headers["ETag"] = task_etag(updated_task)
     return updated_task
 
 
 @router.delete("/{task_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_task(
+async def delete_task(
     *,
-    db: Session = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_db),
     task_id: uuid.UUID,
     current_user: models_user.User = Depends(deps.get_current_active_user),
 ) -> None:
     """
     Soft delete a task. User must be a member of the task's team.
     """
-    task = crud_task.get_task(db=db, task_id=task_id)
+    # Load the task and check that the current user is a member of its team
+    task, is_member = await db.run_sync(crud_task.get_task_for_user, task_id=task_id, user_id=current_user.id)
     if not task:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Task not found")
-    # Check if the current user is a member of the task's team
-    is_member = crud_team.is_user_member_of_team(db=db, team_id=task.team_id, user_id=current_user.id)
     if not is_member:
          raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not authorized to delete this task",
         )
-    crud_task.soft_delete_task(db=db, db_task=task)
+    await db.run_sync(crud_task.soft_delete_task, db_task=task)
     return None
@@ -1,21 +1,28 @@
 import uuid
-from typing import Any, List
+from typing import Any, Dict, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, Header, HTTPException, status, Query, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app import models, schemas
 from app.api import deps
-from app.crud import crud_team, crud_user
+from app.crud import crud_task_stats, crud_team, crud_user
 from app.models import user as models_user
 from app.models import team as models_team
+from app.utils.etag import etag_matches, make_etag
+from app.utils.pagination import create_cursor_page, create_page, decode_cursor, encode_cursor
+from app.utils.serialization import json_response
 
 router = APIRouter()
 
+# Upper bounds of a page of teams and of a page of members
+MAX_TEAMS_PAGE_SIZE = 500
+MAX_MEMBERS_PAGE_SIZE = 500
+
 @router.post("/", response_model=schemas.Team, status_code=status.HTTP_201_CREATED)
-def create_team(
+async def create_team(
     *,
-    db: Session = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_db),
     team_in: schemas.TeamCreate,
     current_user: models_user.User = Depends(deps.get_current_active_user)
 ) -> models_team.Team:
@@ -23,68 +30,143 @@ def create_team(
     Create new team. The user creating the team becomes the first member.
     """
     # Check if team name already exists
-    existing_team = crud_team.get_team_by_name(db=db, name=team_in.name)
+    existing_team = await db.run_sync(crud_team.get_team_by_name, name=team_in.name)
     if existing_team:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="A team with this name already exists.",
         )
-    team = crud_team.create_team_with_creator(db=db, team_in=team_in, creator=current_user)
+    team = await db.run_sync(crud_team.create_team_with_creator, team_in=team_in, creator=current_user)
     return team
 
 
-@router.get("/", response_model=List[schemas.Team])
-def read_teams(
-    db: Session = Depends(deps.get_db),
-    skip: int = 0,
-    limit: int = 100,
+def team_cursor(team: models_team.Team) -> str:
+    """Builds the opaque keyset cursor pointing right after `team` in a list ordered by team id."""
+    return encode_cursor(team.id)
+
+
+def next_page_link(request: Request, next_cursor: Optional[str]) -> Dict[str, str]:
+    """`Link` header to the next page, kept alongside `next_cursor` for clients that page by URL."""
+    if next_cursor is None:
+        return {}
+    next_url = request.url.remove_query_params("skip").include_query_params(cursor=next_cursor)
+    return {"Link": f'<{next_url}>; rel="next"'}
+
+
+@router.get("/", response_model=schemas.TeamPage)
+async def read_teams(
+    *,
+    db: AsyncSession = Depends(deps.get_read_db),
+    request: Request,
+    skip: int = Query(0, ge=0, description="Number of teams to skip. Legacy OFFSET paging, prefer `cursor`"),
+    limit: int = Query(100, ge=1, le=MAX_TEAMS_PAGE_SIZE, description="Maximum number of teams per page"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page's `next_cursor`"),
+    include_members: bool = Query(False, description=f"Include the first {crud_team.MEMBERS_PREVIEW_SIZE} members of each team"),
     current_user: models_user.User = Depends(deps.get_current_active_user)
-) -> List[models_team.Team]:
+) -> Response:
     """
-    Retrieve teams the current user is a member of.
+    Retrieve a page of the teams the current user is a member of, ordered by team id.
+    Pass the `next_cursor` of a page as `cursor` to get the next one; the `Link` header
+    (`rel="next"`) holds the same next page as a URL. `total_items` is not computed.
+    Full member lists are served page by page by GET /teams/{id}/members.
     """
-    teams = crud_team.get_user_teams(db=db, user_id=current_user.id, skip=skip, limit=limit)
-    return teams
+    after = None
+    if cursor is not None:
+        if skip:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Use either skip or cursor, not both.")
+        try:
+            (after,) = decode_cursor(cursor, uuid.UUID)
+        except ValueError:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+    teams = await db.run_sync(
+        crud_team.get_user_teams,
+        user_id=current_user.id,
+        skip=skip,
+        # One extra row tells whether another page follows
+        limit=limit + 1,
+        after=after,
+        members_limit=crud_team.MEMBERS_PREVIEW_SIZE if include_members else 0,
+    )
+    if after is not None:
+        page = create_cursor_page(items=teams, total_items=None, limit=limit, cursor_for=team_cursor)
+    else:
+        # Offset pages also hand out a cursor so clients can switch to keyset paging
+        has_more = len(teams) > limit
+        teams = teams[:limit]
+        page = create_page(
+            items=teams, total_items=None, skip=skip, limit=limit, next_cursor=team_cursor(teams[-1]) if has_more and teams else None,
+        )
+    schema = schemas.TeamWithMembersPage if include_members else schemas.TeamPage
+    return json_response(schema, page, headers=next_page_link(request, page.next_cursor))
 
 
-@router.get("/all", response_model=List[schemas.Team])
-def read_all_teams(
-    db: Session = Depends(deps.get_db)
-) -> List[models_team.Team]:
+@router.get("/all", response_model=schemas.TeamPage)
+async def read_all_teams(
+    *,
+    db: AsyncSession = Depends(deps.get_read_db),
+    request: Request,
+    limit: int = Query(100, ge=1, le=MAX_TEAMS_PAGE_SIZE, description="Maximum number of teams per page"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page's `next_cursor`"),
+    current_user: models_user.User = Depends(deps.get_current_active_user),
+) -> Response:
     """
-    Retrieve all teams.
+    Retrieve the directory of all teams, ordered by team id, one page at a time.
+    Requires an authenticated user. Pass the `next_cursor` of a page as `cursor` to get
+    the next one; the `Link` header (`rel="next"`) holds the same next page as a URL.
+    Pages are served from an in-process snapshot that every team write replaces.
     """
-    teams_list = crud_team.get_all_teams_directly(db=db)
-    return teams_list
+    after = None
+    if cursor is not None:
+        try:
+            (after,) = decode_cursor(cursor, uuid.UUID)
+        except ValueError:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+    # One extra row tells whether another page follows
+    teams = await db.run_sync(crud_team.get_team_directory_page, limit=limit + 1, after=after)
+    page = create_cursor_page(items=teams, total_items=None, limit=limit, cursor_for=team_cursor)
+    return json_response(schemas.TeamPage, page, headers=next_page_link(request, page.next_cursor))
 
 
 @router.get("/{team_id}", response_model=schemas.Team)
-def read_team(
+async def read_team(
     *,
-    db: Session = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_read_db),
     team_id: uuid.UUID,
-    current_user: models_user.User = Depends(deps.get_current_active_user)
+    current_user: models_user.User = Depends(deps.get_current_active_user),
+    if_none_match: Optional[str] = Header(None),
+    response: Response,
 ) -> models_team.Team:
     """
     Get team by ID. User must be a member of the team.
+    Honors `If-None-Match`: an unchanged team is answered with 304 from a single
+    timestamp lookup, without loading or serializing it.
     """
-    team = crud_team.get_team(db=db, team_id=team_id)
+    if if_none_match is not None:
+        updated_at, is_member = await db.run_sync(crud_team.get_team_updated_at_for_user, team_id=team_id, user_id=current_user.id)
+        if updated_at is not None and is_member:
+            etag = make_etag(team_id, updated_at)
+            if etag_matches(if_none_match, etag):
+                return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+    # Load the team and check that the current user is a member of it
+    team, is_member = await db.run_sync(crud_team.get_team_for_user, team_id=team_id, user_id=current_user.id)
     if not team:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Team not found")
-    # Check if current user is a member
-    is_member = crud_team.is_user_member_of_team(db=db, team_id=team_id, user_id=current_user.id)
     if not is_member:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not authorized to access this team",
         )
+    response.headers["ETag"] = make_etag(team.id, team.updated_at)
     return team
 
 
 @router.put("/{team_id}", response_model=schemas.Team)
-def update_team(
+async def update_team(
     *,
-    db: Session = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_db),
     team_id: uuid.UUID,
     team_in: schemas.TeamUpdate,
     current_user: models_user.User = Depends(deps.get_current_active_user)
@@ -92,11 +174,10 @@ def update_team(
     """
     Update a team. User must be a member. (Future: Add admin roles).
     """
-    team = crud_team.get_team(db=db, team_id=team_id)
+    # Load the team and check that the current user is a member of it
+    team, is_member = await db.run_sync(crud_team.get_team_for_user, team_id=team_id, user_id=current_user.id)
     if not team:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Team not found")
-    # Check membership
-    is_member = crud_team.is_user_member_of_team(db=db, team_id=team_id, user_id=current_user.id)
     if not is_member:
          raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -104,21 +185,21 @@ def update_team(
         )
     # Check if new name conflicts
     if team_in.name:
-        existing_team = crud_team.get_team_by_name(db=db, name=team_in.name)
+        existing_team = await db.run_sync(crud_team.get_team_by_name, name=team_in.name)
         if existing_team and existing_team.id != team_id:
              raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Another team with this name already exists.",
             )
 
-    team = crud_team.update_team(db=db, db_team=team, team_in=team_in)
+    team = await db.run_sync(crud_team.update_team, db_team=team, team_in=team_in)
     return team
 
 
 @router.delete("/{team_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_team(
+async def delete_team(
     *,
-    db: Session = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_db),
     team_id: uuid.UUID,
     current_user: models_user.User = Depends(deps.get_current_active_user)
 ) -> None:
@@ -126,26 +207,25 @@ def delete_team(
     Delete a team. User must be a member. (Future: Add admin roles).
     Tasks associated with the team will be cascade deleted by the DB relationship.
     """
-    team = crud_team.get_team(db=db, team_id=team_id)
+    # Load the team and check that the current user is a member of it
+    team, is_member = await db.run_sync(crud_team.get_team_for_user, team_id=team_id, user_id=current_user.id)
     if not team:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Team not found")
-    # Check membership
-    is_member = crud_team.is_user_member_of_team(db=db, team_id=team_id, user_id=current_user.id)
     if not is_member:
          raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not authorized to delete this team",
         )
-    crud_team.delete_team(db=db, db_team=team)
+    await db.run_sync(crud_team.delete_team, db_team=team)
     return None
 
 
 # --- Team Member Management ---
 
 @router.post("/{team_id}/members/{user_id}", response_model=schemas.Team)
-def add_team_member(
+async def add_team_member(
     *,
-    db: Session = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_db),
     team_id: uuid.UUID,
     user_id: uuid.UUID,
     current_user: models_user.User = Depends(deps.get_current_active_user)
@@ -153,22 +233,22 @@ def add_team_member(
     """
     Add a user to a team. Any authenticated user can add members.
     """
-    team = crud_team.get_team(db=db, team_id=team_id)
+    team, _ = await db.run_sync(crud_team.get_team_for_user, team_id=team_id, user_id=current_user.id)
     if not team:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Team not found")
     # Get the user to add
-    user_to_add = crud_user.get_user(db=db, user_id=user_id)
+    user_to_add = await db.run_sync(crud_user.get_user, user_id=user_id)
     if not user_to_add:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User to add not found")
 
-    updated_team = crud_team.add_user_to_team(db=db, db_team=team, db_user=user_to_add)
+    updated_team = await db.run_sync(crud_team.add_user_to_team, db_team=team, db_user=user_to_add)
     return updated_team
 
 
 @router.delete("/{team_id}/members/{user_id}", response_model=schemas.Team)
-def remove_team_member(
+async def remove_team_member(
     *,
-    db: Session = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_db),
     team_id: uuid.UUID,
     user_id: uuid.UUID,
     current_user: models_user.User = Depends(deps.get_current_active_user)
@@ -177,12 +257,10 @@ def remove_team_member(
     Remove a user from a team. Current user must be a member.
     Users can remove themselves. (Future: Add admin logic for removing others).
     """
-    team = crud_team.get_team(db=db, team_id=team_id)
+    # Load the team and check that the current user is a member of it (authorization)
+    team, is_current_user_member = await db.run_sync(crud_team.get_team_for_user, team_id=team_id, user_id=current_user.id)
     if not team:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Team not found")
-
-    # Check if current user is a member (authorization)
-    is_current_user_member = crud_team.is_user_member_of_team(db=db, team_id=team_id, user_id=current_user.id)
     if not is_current_user_member:
          raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -190,12 +268,73 @@ def remove_team_member(
         )
 
     # Check if user to remove exists
-    user_to_remove = crud_user.get_user(db=db, user_id=user_id)
+    user_to_remove = await db.run_sync(crud_user.get_user, user_id=user_id)
     if not user_to_remove:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User to remove not found")
 
     # Prevent removing the last member? Or should deleting the team handle this?
     # For now, allow removal. Deleting the team requires a member.
 
-    updated_team = crud_team.remove_user_from_team(db=db, db_team=team, db_user=user_to_remove)
+    updated_team = await db.run_sync(crud_team.remove_user_from_team, db_team=team, db_user=user_to_remove)
     return updated_team
+
+
+@router.get("/{team_id}/members", response_model=schemas.UserPage)
+async def read_team_members(
+    *,
+    db: AsyncSession = Depends(deps.get_read_db),
+    team_id: uuid.UUID,
+    limit: int = Query(100, ge=1, le=MAX_MEMBERS_PAGE_SIZE, description="Maximum number of members per page"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page's `next_cursor`"),
+    current_user: models_user.User = Depends(deps.get_current_active_user),
+) -> Response:
+    """
+    List the members of a team, ordered by user id. User must be a member of the team.
+    Pass the `next_cursor` of a page as `cursor` to get the next one.
+    """
+    after = None
+    if cursor is not None:
+        try:
+            (after,) = decode_cursor(cursor, uuid.UUID)
+        except ValueError:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+    team, is_member = await db.run_sync(crud_team.get_team_for_user, team_id=team_id, user_id=current_user.id)
+    if not team:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Team not found")
+    if not is_member:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to view the members of this team",
+        )
+
+    # One extra row tells whether another page follows
+    members = await db.run_sync(crud_team.get_team_members, team_id=team_id, limit=limit + 1, after=after)
+    page = create_cursor_page(
+        items=members, total_items=team.member_count, limit=limit, cursor_for=lambda user: encode_cursor(user.id),
+    )
+    return json_response(schemas.UserPage, page)
+
+
+@router.get("/{team_id}/stats", response_model=schemas.TeamTaskStats)
+async def read_team_stats(
+    *,
+    db: AsyncSession = Depends(deps.get_read_db),
+    team_id: uuid.UUID,
+    current_user: models_user.User = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Task statistics of a team: open, completed and overdue tasks, and open tasks
+    per priority and per assignee. User must be a member of the team.
+    Read from counters kept up to date by every task write, so the cost does not
+    grow with the number of tasks.
+    """
+    team_exists, is_member = await db.run_sync(crud_team.get_team_access, team_id=team_id, user_id=current_user.id)
+    if not team_exists:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Team not found")
+    if not is_member:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to view the statistics of this team",
+        )
+    return await db.run_sync(crud_task_stats.get_team_task_stats, team_id=team_id)
@@ -1,28 +1,31 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app import schemas 
 from app.api import deps
+from app.core.security import get_password_hash_async
 from app.crud import crud_user 
 
 router = APIRouter()
 
 @router.post("/", response_model=schemas.User, status_code=status.HTTP_201_CREATED)
-def create_user_endpoint(
+async def create_user_endpoint(
     *,
-    db: Session = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_db),
     user_in: schemas.UserCreate,
 ):
     """
     Create new user.
     """
-    user = crud_user.get_user_by_email(db, email=user_in.email)
+    user = await db.run_sync(crud_user.get_user_by_email, email=user_in.email)
     if user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="The user with this email already exists in the system.",
         )
-    user = crud_user.create_user(db=db, user_in=user_in)
+    # bcrypt runs on its own bounded executor (503 when saturated)
+    hashed_password = await get_password_hash_async(user_in.password)
+    user = await db.run_sync(crud_user.create_user, user_in=user_in, hashed_password=hashed_password)
     return user
 
 # Add other user endpoints here later (e.g., get user, update user)
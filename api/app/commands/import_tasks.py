@@ -0,0 +1,50 @@
+"""
+Imports tasks into a team from a CSV file, for loads too large for an upload:
+
+    python -m app.commands.import_tasks --team-id <uuid> --creator-email admin@example.com tasks.csv
+
+Uses the same validation, staging table and COPY path as POST /api/v1/tasks/import.
+"""
+import argparse
+import sys
+import uuid
+
+from app.crud import crud_task_import, crud_team, crud_user
+from app.db.session import SessionLocal
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Import tasks into a team from a CSV file.")
+    parser.add_argument("csv_file", help="CSV file with a header row")
+    parser.add_argument("--team-id", required=True, type=uuid.UUID, help="Team to import the tasks into")
+    parser.add_argument("--creator-email", required=True, help="Email of the user recorded as the tasks' creator")
+    parser.add_argument("--skip-invalid", action="store_true", help="Import the valid rows even if some rows are invalid")
+    args = parser.parse_args(argv)
+
+    db = SessionLocal()
+    try:
+        if crud_team.get_team(db, team_id=args.team_id) is None:
+            print(f"No team with id {args.team_id}", file=sys.stderr)
+            return 1
+        creator = crud_user.get_user_by_email(db, email=args.creator_email)
+        if creator is None:
+            print(f"No user with email {args.creator_email}", file=sys.stderr)
+            return 1
+        with open(args.csv_file, encoding="utf-8-sig", newline="") as file:
+            result = crud_task_import.import_tasks_csv(
+                db, file=file, team_id=args.team_id, creator_id=creator.id, skip_invalid=args.skip_invalid,
+            )
+    except ValueError as e:
+        print(f"Invalid CSV file: {e}", file=sys.stderr)
+        return 1
+    finally:
+        db.close()
+
+    for error in result.errors:
+        print(f"line {error.line}: {error.detail}", file=sys.stderr)
+    print(f"Imported {result.imported} tasks, {result.error_count} invalid rows")
+    return 1 if result.error_count and not args.skip_invalid else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
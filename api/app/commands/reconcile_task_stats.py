@@ -0,0 +1,37 @@
+"""
+Recomputes the task counters behind GET /api/v1/teams/{id}/stats from the tasks
+themselves and fixes the teams whose counters drifted, e.g. after manual SQL:
+
+    python -m app.commands.reconcile_task_stats [--team-id <uuid> ...]
+
+Each team is locked and rewritten in its own short transaction, so the job can
+run while the API serves writes.
+"""
+import argparse
+import sys
+import uuid
+
+from app.crud import crud_task_stats
+from app.db.session import SessionLocal
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Recompute the task counters of teams.")
+    parser.add_argument("--team-id", action="append", type=uuid.UUID, dest="team_ids",
+                        help="Team to reconcile; repeat for several teams (default: every team)")
+    args = parser.parse_args(argv)
+
+    db = SessionLocal()
+    try:
+        drifted = crud_task_stats.reconcile_task_stats(db, team_ids=args.team_ids)
+    finally:
+        db.close()
+
+    for team_id in drifted:
+        print(f"team {team_id}: counters corrected", file=sys.stderr)
+    print(f"Reconciled task counters, {len(drifted)} teams corrected")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,4 +1,6 @@
 import os
+from typing import List, Optional
+
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
@@ -8,12 +10,65 @@ class Settings(BaseSettings):
 
     # Database settings loaded from environment - required
     DATABASE_URL: str
+    # URL used by the async engine serving requests. Derived from DATABASE_URL
+    # (psycopg2 -> asyncpg, sqlite -> aiosqlite) when not set.
+    ASYNC_DATABASE_URL: Optional[str] = None
+
+    # Connection pool, per worker process. Size it so that
+    # workers * (DB_POOL_SIZE + DB_MAX_OVERFLOW) fits the Postgres connection budget.
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT_SECONDS: float = 30.0
+    DB_POOL_RECYCLE_SECONDS: int = 1800
+    # Ping connections on checkout (one extra round trip). When disabled, stale
+    # connections are only caught by DB_POOL_RECYCLE_SECONDS or on first use.
+    DB_POOL_PRE_PING: bool = True
+    # Server-side statement_timeout for every statement, disabled when unset
+    DB_STATEMENT_TIMEOUT_MS: Optional[int] = None
+    # Running behind PgBouncer in transaction pooling mode: no app-side pool,
+    # no server-side prepared statements and no session-level settings.
+    DB_PGBOUNCER_MODE: bool = False
+
+    # Read replicas serving the read-only endpoints, as a JSON list of URLs. Drivers are
+    # swapped for async ones like for DATABASE_URL. When empty, all reads use the primary.
+    DATABASE_REPLICA_URLS: List[str] = []
+    # After a write, the user's reads stay on the primary for this long so they see their
+    # own writes despite replication lag. Tracked per worker process: keep it above the
+    # usual replica lag, and route a client to one worker if it must read its writes at once.
+    REPLICA_STICKINESS_SECONDS: float = 5.0
 
     # JWT Settings loaded from environment - required
     SECRET_KEY: str
     ALGORITHM: str
     ACCESS_TOKEN_EXPIRE_MINUTES: int
 
+    # In-process cache of team memberships (user id -> team ids).
+    # TTL bounds how long a removal made through another worker can go unnoticed.
+    MEMBERSHIP_CACHE_SIZE: int = 10000
+    MEMBERSHIP_CACHE_TTL_SECONDS: float = 30.0
+
+    # In-process cache of authenticated users, so requests skip loading their principal.
+    # TTL bounds how long a deactivation or password change made through another worker can go unnoticed.
+    PRINCIPAL_CACHE_SIZE: int = 10000
+    PRINCIPAL_CACHE_TTL_SECONDS: float = 30.0
+
+    # In-process cache of team directory pages (GET /teams/all). Team writes in this worker
+    # start a new version at once; TTL bounds how long writes through other workers go unseen.
+    TEAM_DIRECTORY_CACHE_SIZE: int = 1000
+    TEAM_DIRECTORY_CACHE_TTL_SECONDS: float = 30.0
+
+    # bcrypt runs on its own thread pool so login bursts cannot starve other requests.
+    # Jobs beyond workers + queue size are rejected with 503 instead of piling up.
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_QUEUE_SIZE: int = 16
+
+    # Task change events (WebSocket /tasks/events). Each subscriber buffers this many
+    # events; one that falls further behind is told to resync through GET /tasks/changes.
+    TASK_EVENTS_QUEUE_SIZE: int = 100
+    # Direct connection LISTENing for the events of other workers, defaults to DATABASE_URL.
+    # Set it when DATABASE_URL goes through PgBouncer transaction pooling, which drops LISTEN.
+    TASK_EVENTS_LISTEN_URL: Optional[str] = None
+
     class Config:
         case_sensitive = True
 
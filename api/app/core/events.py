@@ -0,0 +1,210 @@
+"""
+Task change events pushed to the subscribers of a team (WebSocket /api/v1/tasks/events).
+
+Task writes publish events within their transaction. On PostgreSQL they are sent
+with NOTIFY, which delivers them at commit (and drops them on rollback) to every
+worker LISTENing on the channel; each worker forwards them to its in-process
+broker. Other databases (single node, tests) hand them to the broker right after
+the session commits.
+
+Events only carry ids and the change sequence, never task contents: clients
+fetch what changed through GET /tasks/changes, where access is checked again.
+"""
+import asyncio
+import json
+import logging
+import threading
+import uuid
+from collections import defaultdict
+from contextlib import contextmanager, suppress
+from typing import Any, Dict, Generator, Iterable, Optional, Set
+
+from sqlalchemy import event, func, select
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "task_events"
+# Events list at most this many task ids, keeping NOTIFY payloads well under
+# their 8000 byte limit; larger writes send none and clients resync instead
+MAX_EVENT_TASK_IDS = 100
+# Pause before (re)connecting the LISTEN connection, doubled after each failure up to the maximum
+LISTEN_RETRY_SECONDS = 1.0
+LISTEN_MAX_RETRY_SECONDS = 30.0
+
+# Session.info key of the events waiting for the transaction to commit
+PENDING_EVENTS = "pending_task_events"
+
+# Sent to a subscriber that missed events: it should catch up with GET /tasks/changes
+RESYNC_EVENT = {"type": "resync"}
+
+
+class Subscription:
+    """Events of one team for one subscriber, queued on the subscriber's event loop."""
+
+    def __init__(self, team_id: uuid.UUID, queue_size: int):
+        self.team_id = team_id
+        self.loop = asyncio.get_running_loop()
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.missed_events = False
+
+    def deliver(self, event: Dict[str, Any]) -> None:
+        """Queues an event; runs on the subscriber's loop. A slow subscriber misses events and gets a resync."""
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.missed_events = True
+
+    async def get(self) -> Dict[str, Any]:
+        """Waits for the next event."""
+        if self.missed_events:
+            self.missed_events = False
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            return RESYNC_EVENT
+        return await self.queue.get()
+
+
+class TaskEventBroker:
+    """
+    In-process fan-out of task events to the subscribers of each team.
+    Events can be published from any thread; each subscriber receives them on
+    its own event loop.
+    """
+
+    def __init__(self, queue_size: int):
+        self.queue_size = queue_size
+        self._subscriptions: Dict[uuid.UUID, Set[Subscription]] = defaultdict(set)
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def subscribe(self, team_id: uuid.UUID) -> Generator[Subscription, Any, None]:
+        """Subscribes to the events of a team for the duration of the block."""
+        subscription = Subscription(team_id, self.queue_size)
+        with self._lock:
+            self._subscriptions[team_id].add(subscription)
+        try:
+            yield subscription
+        finally:
+            with self._lock:
+                self._subscriptions[team_id].discard(subscription)
+                if not self._subscriptions[team_id]:
+                    del self._subscriptions[team_id]
+
+    def subscriber_count(self, team_id: uuid.UUID) -> int:
+        with self._lock:
+            return len(self._subscriptions.get(team_id, ()))
+
+    def publish(self, event: Dict[str, Any]) -> None:
+        """Hands an event to every subscriber of its team."""
+        with self._lock:
+            subscriptions = list(self._subscriptions.get(uuid.UUID(event["team_id"]), ()))
+        for subscription in subscriptions:
+            subscription.loop.call_soon_threadsafe(subscription.deliver, event)
+
+    def resync_all(self) -> None:
+        """Tells every subscriber to resync, e.g. after events were lost while not listening."""
+        with self._lock:
+            subscriptions = [s for team in self._subscriptions.values() for s in team]
+        for subscription in subscriptions:
+            subscription.loop.call_soon_threadsafe(subscription.deliver, RESYNC_EVENT)
+
+
+broker = TaskEventBroker(queue_size=settings.TASK_EVENTS_QUEUE_SIZE)
+
+
+def publish_task_event(
+    db: Session, *, team_id: uuid.UUID, type: str, task_ids: Optional[Iterable[uuid.UUID]], change_seq: int
+) -> None:
+    """
+    Publishes a task event ("created", "updated" or "deleted") once the
+    transaction of `db` commits. `task_ids` is None when the write touched
+    tasks it does not list (imports); events list no ids above
+    MAX_EVENT_TASK_IDS either.
+    """
+    task_ids = list(task_ids) if task_ids is not None else None
+    task_event = {
+        "type": type,
+        "team_id": str(team_id),
+        "task_ids": [str(task_id) for task_id in task_ids] if task_ids is not None and len(task_ids) <= MAX_EVENT_TASK_IDS else None,
+        "change_seq": change_seq,
+    }
+    if db.get_bind().dialect.name == "postgresql":
+        db.execute(select(func.pg_notify(CHANNEL, json.dumps(task_event))))
+    else:
+        db.info.setdefault(PENDING_EVENTS, []).append(task_event)
+
+
+@event.listens_for(Session, "after_commit")
+def publish_pending_events(session: Session) -> None:
+    for task_event in session.info.pop(PENDING_EVENTS, ()):
+        broker.publish(task_event)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def discard_pending_events(session: Session, previous_transaction: Any) -> None:
+    session.info.pop(PENDING_EVENTS, None)
+
+
+def listen_url() -> Optional[str]:
+    """asyncpg DSN of the LISTEN connection, or None when the database is not PostgreSQL."""
+    url = make_url(settings.TASK_EVENTS_LISTEN_URL or settings.DATABASE_URL)
+    if url.get_backend_name() != "postgresql":
+        return None
+    return url.set(drivername="postgresql").render_as_string(hide_password=False)
+
+
+async def listen(dsn: str, task_broker: TaskEventBroker = broker) -> None:
+    """
+    Forwards the notifications of CHANNEL to the broker until cancelled, on a
+    dedicated connection outside of the pools. Reconnects with backoff when
+    connecting or listening fails or the connection drops; subscribers are told
+    to resync since events sent meanwhile are lost.
+    """
+    import asyncpg
+
+    connected_before = False
+    retry_seconds = LISTEN_RETRY_SECONDS
+    while True:
+        connection = None
+        try:
+            connection = await asyncpg.connect(dsn)
+            closed = asyncio.get_running_loop().create_future()
+            connection.add_termination_listener(lambda _, closed=closed: closed.done() or closed.set_result(None))
+            await connection.add_listener(
+                CHANNEL, lambda _connection, _pid, _channel, payload: task_broker.publish(json.loads(payload))
+            )
+            if connected_before:
+                task_broker.resync_all()
+            connected_before = True
+            retry_seconds = LISTEN_RETRY_SECONDS
+            await closed
+            logger.warning("LISTEN connection for task events closed, reconnecting")
+        except Exception:
+            # Anything but cancellation: a listener that stops would silently cut off other workers' events
+            logger.exception("Cannot LISTEN for task events, retrying in %.1fs", retry_seconds)
+        finally:
+            if connection is not None:
+                with suppress(Exception):
+                    await connection.close()
+        await asyncio.sleep(retry_seconds)
+        retry_seconds = min(retry_seconds * 2, LISTEN_MAX_RETRY_SECONDS)
+
+
+def start_listener() -> Optional[asyncio.Task]:
+    """Starts forwarding PostgreSQL notifications to the broker, if the database is PostgreSQL."""
+    dsn = listen_url()
+    if dsn is None:
+        return None
+    return asyncio.get_running_loop().create_task(listen(dsn))
+
+
+async def stop_listener(listener: Optional[asyncio.Task]) -> None:
+    if listener is None:
+        return
+    listener.cancel()
+    with suppress(asyncio.CancelledError):
+        await listener
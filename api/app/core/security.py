@@ -1,6 +1,10 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
-from typing import Any, Union, Optional
+from typing import Any, Callable, Union, Optional
 
+from fastapi import HTTPException, status
 from jose import jwt, JWTError
 from passlib.context import CryptContext
 
@@ -9,6 +13,14 @@ from app.core.config import settings
 # Use bcrypt as the hashing algorithm
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# Dedicated pool for bcrypt. bcrypt releases the GIL, so threads hash in parallel.
+password_executor = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    thread_name_prefix="password-hash",
+)
+# Running plus queued jobs; once exhausted, requests are rejected right away
+password_slots = threading.BoundedSemaphore(settings.PASSWORD_HASH_WORKERS + settings.PASSWORD_HASH_QUEUE_SIZE)
+
 ALGORITHM = settings.ALGORITHM
 
 def create_access_token(
@@ -35,6 +47,36 @@ def get_password_hash(password: str) -> str:
     """Hashes a plain password using bcrypt."""
     return pwd_context.hash(password)
 
+async def run_password_job(func: Callable[..., Any], *args: Any) -> Any:
+    """
+    Runs a bcrypt function on the password executor without blocking the event loop.
+    Raises a 503 HTTPException when the executor and its queue are full.
+    The slot is held by the job, not by the caller: it is released when the job
+    finishes, or is cancelled before it started, even if the caller went away
+    (e.g. the client disconnected) while waiting for it.
+    """
+    if not password_slots.acquire(blocking=False):
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many password operations in progress, try again shortly.",
+            headers={"Retry-After": "1"},
+        )
+    try:
+        future = password_executor.submit(func, *args)
+    except BaseException:
+        password_slots.release()
+        raise
+    future.add_done_callback(lambda _: password_slots.release())
+    return await asyncio.wrap_future(future)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verifies a password on the password executor."""
+    return await run_password_job(verify_password, plain_password, hashed_password)
+
+async def get_password_hash_async(password: str) -> str:
+    """Hashes a password on the password executor."""
+    return await run_password_job(get_password_hash, password)
+
 def decode_token(token: str) -> dict | None:
     """
     Decodes a JWT token. Returns the payload if valid, None otherwise.
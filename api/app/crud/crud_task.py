@@ -1,14 +1,19 @@
+import json
 import uuid
-from typing import List, Optional, Tuple
+from datetime import date, datetime
+from typing import Any, Collection, Dict, List, Optional, Sequence, Tuple
 
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import func, select
+from sqlalchemy.orm import Session, joinedload, selectinload
+from sqlalchemy import ColumnElement, Select, and_, case, exists, false, func, insert, or_, select, tuple_, update
 from fastapi import HTTPException, status
 
+from app.core.events import publish_task_event
 from app.models.task import Task
+from app.models.team import Team, team_members_table
 from app.models.user import User
-from app.schemas.task import TaskCreate, TaskUpdate
-from app.crud import crud_team
+from app.schemas.common import TotalMode
+from app.schemas.task import TaskBulkError, TaskCreate, TaskUpdate
+from app.crud import crud_task_stats, crud_team
 
 
 def create_task(db: Session, *, task_in: TaskCreate, creator_id: uuid.UUID) -> Task:
@@ -35,13 +40,98 @@ def create_task(db: Session, *, task_in: TaskCreate, creator_id: uuid.UUID) -> T
     # Convert Pydantic schema to dict, excluding unset values if needed
     # creator_id is handled separately
     task_data = task_in.model_dump(exclude_unset=True) # Use exclude_unset for flexibility
-    db_task = Task(**task_data, creator_id=creator_id, is_deleted=False)
+    versions = crud_team.bump_tasks_version(db, team_ids=[task_in.team_id])
+    # The id is set here rather than at flush, so the event below can list it
+    db_task = Task(**task_data, id=uuid.uuid4(), creator_id=creator_id, is_deleted=False, change_seq=versions[task_in.team_id])
     db.add(db_task)
+    crud_task_stats.change_task_counts(db, [(crud_task_stats.task_state(db_task), 1)])
+    publish_task_event(db, team_id=db_task.team_id, type="created", task_ids=[db_task.id], change_seq=db_task.change_seq)
     db.commit()
     db.refresh(db_task)
     return db_task
 
 
+def publish_team_events(
+    db: Session, *, type: str, rows: Sequence[Tuple[uuid.UUID, uuid.UUID]], versions: Dict[uuid.UUID, int]
+) -> None:
+    """Publishes one event per team for the (team_id, task_id) rows written with the new `versions`."""
+    task_ids_by_team: Dict[uuid.UUID, List[uuid.UUID]] = {}
+    for team_id, task_id in rows:
+        task_ids_by_team.setdefault(team_id, []).append(task_id)
+    for team_id, task_ids in task_ids_by_team.items():
+        publish_task_event(db, team_id=team_id, type=type, task_ids=task_ids, change_seq=versions[team_id])
+
+
+def create_tasks_bulk(
+    db: Session, *, tasks_in: List[TaskCreate], creator_id: uuid.UUID
+) -> Tuple[List[Task], List[TaskBulkError]]:
+    """
+    Creates many tasks with a single multi-row INSERT. Teams, the creator's
+    memberships and assignees are validated for the whole batch with set-based
+    queries. Nothing is inserted when any item is invalid.
+    Returns a tuple: (created_tasks, errors)
+    """
+    team_ids = {task_in.team_id for task_in in tasks_in}
+    assignee_ids = {task_in.assignee_id for task_in in tasks_in if task_in.assignee_id}
+
+    # Existing teams and whether the creator belongs to each, in one statement
+    creator_is_member = exists().where(
+        team_members_table.c.team_id == Team.id,
+        team_members_table.c.user_id == creator_id,
+    )
+    team_access = dict(db.execute(
+        select(Team.id, creator_is_member.label("is_member")).where(Team.id.in_(team_ids))
+    ).all())
+
+    existing_assignees = set()
+    assignee_memberships = set()
+    if assignee_ids:
+        existing_assignees = set(db.scalars(select(User.id).where(User.id.in_(assignee_ids))))
+        assignee_memberships = {
+            (team_id, user_id)
+            for team_id, user_id in db.execute(
+                select(team_members_table.c.team_id, team_members_table.c.user_id).where(
+                    team_members_table.c.team_id.in_(team_ids),
+                    team_members_table.c.user_id.in_(assignee_ids),
+                )
+            )
+        }
+
+    errors = []
+    for index, task_in in enumerate(tasks_in):
+        if task_in.team_id not in team_access:
+            detail = f"Team with id {task_in.team_id} not found."
+        elif not team_access[task_in.team_id]:
+            detail = "Not authorized to create tasks for this team"
+        elif task_in.assignee_id and task_in.assignee_id not in existing_assignees:
+            detail = f"Assignee user with id {task_in.assignee_id} not found."
+        elif task_in.assignee_id and (task_in.team_id, task_in.assignee_id) not in assignee_memberships:
+            detail = f"Assignee user {task_in.assignee_id} is not a member of team {task_in.team_id}"
+        else:
+            continue
+        errors.append(TaskBulkError(index=index, detail=detail))
+    if errors:
+        return [], errors
+
+    # Every row has the same keys (render_nulls keeps None values), so the
+    # batch goes out as one INSERT ... VALUES (...), (...) RETURNING statement
+    versions = crud_team.bump_tasks_version(db, team_ids=team_ids)
+    rows = [
+        {**task_in.model_dump(), "creator_id": creator_id, "is_deleted": False, "change_seq": versions[task_in.team_id]}
+        for task_in in tasks_in
+    ]
+    stmt = (
+        insert(Task)
+        .returning(Task, sort_by_parameter_order=True)
+        .execution_options(render_nulls=True)
+    )
+    tasks = db.scalars(stmt, rows).all()
+    crud_task_stats.change_task_counts(db, [(crud_task_stats.task_state(task), 1) for task in tasks])
+    publish_team_events(db, type="created", rows=[(task.team_id, task.id) for task in tasks], versions=versions)
+    db.commit()
+    return list(tasks), []
+
+
 def get_task(db: Session, task_id: uuid.UUID, *, include_deleted: bool = False) -> Task | None:
     """Gets a specific task by ID. Optionally includes soft-deleted tasks."""
     query = db.query(Task).filter(Task.id == task_id)
@@ -50,11 +140,198 @@ def get_task(db: Session, task_id: uuid.UUID, *, include_deleted: bool = False)
     return query.first()
 
 
+def get_task_for_user(
+    db: Session, *, task_id: uuid.UUID, user_id: uuid.UUID, include_deleted: bool = False, for_update: bool = False
+) -> Tuple[Optional[Task], bool]:
+    """
+    Gets a task and checks that the user is a member of its team in a single statement.
+    With `for_update` the task row stays locked until the transaction ends, so a
+    precondition checked against it still holds when it is updated.
+    Returns a tuple: (task_or_None, is_member)
+    """
+    is_member = exists().where(
+        team_members_table.c.team_id == Task.team_id,
+        team_members_table.c.user_id == user_id,
+    )
+    stmt = (
+        select(Task, is_member.label("is_member"))
+        .options(selectinload(Task.assignee))
+        .where(Task.id == task_id)
+    )
+    if not include_deleted:
+        stmt = stmt.where(Task.is_deleted == False)
+    if for_update:
+        stmt = stmt.with_for_update(of=Task)
+    row = db.execute(stmt).first()
+    if row is None:
+        return None, False
+    return row.Task, row.is_member
+
+
+def get_task_timestamps_for_user(
+    db: Session, *, task_id: uuid.UUID, user_id: uuid.UUID
+) -> Tuple[Optional[Tuple[datetime, Optional[datetime]]], bool]:
+    """
+    Reads the updated_at of a live task and of its assignee, and checks that the
+    user is a member of its team, in a single statement without loading the task.
+    Returns a tuple: ((task_updated_at, assignee_updated_at) or None, is_member)
+    """
+    is_member = exists().where(
+        team_members_table.c.team_id == Task.team_id,
+        team_members_table.c.user_id == user_id,
+    )
+    row = db.execute(
+        select(Task.updated_at, User.updated_at.label("assignee_updated_at"), is_member.label("is_member"))
+        .outerjoin(User, User.id == Task.assignee_id)
+        .where(Task.id == task_id, Task.is_deleted == False)
+    ).first()
+    if row is None:
+        return None, False
+    return (row.updated_at, row.assignee_updated_at), row.is_member
+
+
 def get_tasks(db: Session) -> list[Task]:
     """Retrieve all tasks (use with caution, consider pagination elsewhere)."""
     return db.query(Task).all()
 
 
+def team_task_filters(
+    *,
+    team_id: uuid.UUID,
+    assignee_id: Optional[uuid.UUID] = None,
+    completed: Optional[bool] = None,
+    due_after: Optional[date] = None,
+    due_before: Optional[date] = None,
+    priority: Optional[int] = None,
+    overdue: Optional[bool] = None,
+) -> List[ColumnElement[bool]]:
+    """
+    WHERE criteria selecting the live tasks of a team, with the optional list filters.
+    The due date range is inclusive on both ends. Overdue tasks are the pending
+    ones whose due date is before today.
+    """
+    filters = [Task.team_id == team_id, Task.is_deleted == False]
+    # Apply optional filters
+    if assignee_id is not None:
+        filters.append(Task.assignee_id == assignee_id)
+    if completed is not None:
+        # Filter based on the boolean completed field
+        filters.append(Task.completed == completed)
+    if due_after is not None:
+        filters.append(Task.due_date >= due_after)
+    if due_before is not None:
+        filters.append(Task.due_date <= due_before)
+    if priority is not None:
+        filters.append(Task.priority == priority)
+    if overdue is not None:
+        is_overdue = and_(Task.completed == False, Task.due_date < date.today())
+        filters.append(is_overdue if overdue else ~is_overdue)
+    return filters
+
+
+# Columns task lists can be sorted by, with the type of their values in cursors
+TASK_SORT_COLUMNS = {
+    "due_date": (Task.due_date, date),
+    "priority": (Task.priority, int),
+    "created_at": (Task.created_at, datetime),
+    "title": (Task.title, str),
+}
+# Sort keys whose column is nullable; NULLs sort last in both directions
+NULLABLE_SORT_KEYS = {"priority"}
+
+# A task list sort: (column name, descending) pairs, tie-broken by id
+TaskSort = Tuple[Tuple[str, bool], ...]
+DEFAULT_TASK_SORT: TaskSort = (("created_at", False),)
+
+
+def parse_task_sort(spec: str) -> TaskSort:
+    """
+    Parses a sort parameter such as "due_date,-priority,created_at": comma
+    separated column names, each descending when prefixed with "-".
+    Raises ValueError on unknown, repeated or missing keys.
+    """
+    sort = []
+    for key in spec.split(","):
+        key = key.strip()
+        descending = key.startswith("-")
+        name = key[1:] if descending else key
+        if name not in TASK_SORT_COLUMNS:
+            raise ValueError(f"Unknown sort key {name!r}, expected one of: {', '.join(TASK_SORT_COLUMNS)}")
+        if any(name == seen for seen, _ in sort):
+            raise ValueError(f"Sort key {name!r} is repeated")
+        sort.append((name, descending))
+    return tuple(sort)
+
+
+def task_sort_keys(sort: TaskSort) -> List[Tuple[Any, bool, bool]]:
+    """(column, descending, nullable) of every sort key, ending with the id tie-breaker."""
+    keys = [(TASK_SORT_COLUMNS[name][0], descending, name in NULLABLE_SORT_KEYS) for name, descending in sort]
+    # The tie-breaker follows the last key, so single-direction sorts stay one index scan
+    return keys + [(Task.id, sort[-1][1], False)]
+
+
+def task_sort_types(sort: TaskSort) -> List[type]:
+    """Types of the values of a keyset cursor for `sort`, as passed to `decode_cursor`."""
+    return [TASK_SORT_COLUMNS[name][1] for name, _ in sort] + [uuid.UUID]
+
+
+def task_sort_values(task: Task, sort: TaskSort) -> Tuple[Any, ...]:
+    """The keyset of `task` under `sort`: its sort column values followed by its id."""
+    return tuple(getattr(task, name) for name, _ in sort) + (task.id,)
+
+
+def task_sort_order(sort: TaskSort) -> List[ColumnElement]:
+    """ORDER BY clauses of `sort`."""
+    order = []
+    for column, descending, nullable in task_sort_keys(sort):
+        clause = column.desc() if descending else column.asc()
+        order.append(clause.nulls_last() if nullable else clause)
+    return order
+
+
+def task_keyset_filter(sort: TaskSort, after: Sequence[Any]) -> ColumnElement[bool]:
+    """
+    Predicate selecting the tasks ordered after the keyset `after` under `sort`.
+    Single-direction sorts over non-null columns compare row values, which the
+    composite indexes can seek to; other sorts expand to a chain of OR terms.
+    """
+    keys = task_sort_keys(sort)
+    directions = {descending for _, descending, _ in keys}
+    if len(directions) == 1 and not any(nullable for _, _, nullable in keys):
+        columns = tuple_(*(column for column, _, _ in keys))
+        return columns < tuple(after) if directions.pop() else columns > tuple(after)
+
+    # (k1 beyond) OR (k1 = v1 AND ((k2 beyond) OR (k2 = v2 AND ...))), from the last key up
+    predicate = None
+    for (column, descending, nullable), value in reversed(list(zip(keys, after))):
+        if value is None:
+            # NULLs sort last: only later NULLs follow
+            beyond, same = false(), column.is_(None)
+        else:
+            beyond = column < value if descending else column > value
+            if nullable:
+                beyond = or_(beyond, column.is_(None))
+            same = column == value
+        predicate = beyond if predicate is None else or_(beyond, and_(same, predicate))
+    return predicate
+
+
+def estimate_row_count(db: Session, stmt: Select) -> int:
+    """
+    Number of rows `stmt` returns according to the PostgreSQL planner, read from
+    EXPLAIN without executing the query. Other databases get an exact count.
+    """
+    bind = db.get_bind()
+    if bind.dialect.name != "postgresql":
+        return db.scalar(select(func.count()).select_from(stmt.subquery()))
+    # Bound values are UUIDs, booleans, dates and integers here, rendered safely by the dialect
+    compiled = stmt.compile(dialect=bind.dialect, compile_kwargs={"literal_binds": True})
+    plan = db.connection().exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled}").scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
 def get_tasks_by_team(
     db: Session,
     *,
@@ -63,32 +340,164 @@ def get_tasks_by_team(
     limit: int = 100,
     assignee_id: Optional[uuid.UUID] = None,
     completed: Optional[bool] = None,
-) -> Tuple[List[Task], int]:
+    due_after: Optional[date] = None,
+    due_before: Optional[date] = None,
+    priority: Optional[int] = None,
+    overdue: Optional[bool] = None,
+    sort: TaskSort = DEFAULT_TASK_SORT,
+    after: Optional[Sequence[Any]] = None,
+    total: TotalMode = TotalMode.EXACT,
+) -> Tuple[List[Task], Optional[int]]:
     """
     Gets a list of tasks for a specific team with pagination and total count,
     excluding soft-deleted tasks and applying optional filters.
+    Tasks are ordered by `sort` then id, by (created_at, id) by default. When
+    `after` is given it is the keyset of the last task already seen (see
+    `task_sort_values`) and the page starts right after it (keyset pagination);
+    `skip` is ignored in that case.
+
+    `total` selects how the count is obtained: EXACT counts in the same statement
+    as the page, ESTIMATED asks the planner, NONE skips it and returns None.
     Returns a tuple: (list_of_tasks, total_count)
     """
-    query = db.query(Task).filter(Task.is_deleted == False)
-    query = query.options(joinedload(Task.assignee)) # Eager load assignee
-    query = query.filter(Task.team_id == team_id)
+    filters = team_task_filters(
+        team_id=team_id, assignee_id=assignee_id, completed=completed,
+        due_after=due_after, due_before=due_before, priority=priority, overdue=overdue,
+    )
+    query = db.query(Task).filter(*filters)
+    query = query.options(selectinload(Task.assignee)) # Eager load assignees with one IN query by primary key
+    count_stmt = select(func.count()).select_from(Task).where(*filters)
+    if total is TotalMode.EXACT:
+        # Uncorrelated scalar subquery: evaluated once per statement, over the
+        # filters only (not the keyset predicate), so it is the full total
+        query = query.add_columns(count_stmt.scalar_subquery().label("total_count"))
 
-    # Apply optional filters
-    if assignee_id is not None:
-        query = query.filter(Task.assignee_id == assignee_id)
-    if completed is not None:
-        # Filter based on the boolean completed field
-        query = query.filter(Task.completed == completed)
-
-    # Get the total count *after* applying filters
-    total_count = query.count()
+    # Apply a stable ordering, then either seek past the cursor or use OFFSET
+    query = query.order_by(*task_sort_order(sort))
+    if after is not None:
+        query = query.filter(task_keyset_filter(sort, after))
+    else:
+        query = query.offset(skip)
+    rows = query.limit(limit).all()
 
-    # Apply pagination and get items
-    items = query.offset(skip).limit(limit).all()
+    if total is TotalMode.EXACT:
+        items = [row.Task for row in rows]
+        if rows:
+            total_count = rows[0].total_count
+        elif skip or after is not None:
+            # Past the last page no row carries the count
+            total_count = db.scalar(count_stmt)
+        else:
+            total_count = 0
+    elif total is TotalMode.ESTIMATED:
+        items = rows
+        total_count = estimate_row_count(db, select(Task.id).where(*filters))
+        if after is None:
+            # Never report fewer items than this page proves exist
+            total_count = max(total_count, skip + len(items))
+    else:
+        items = rows
+        total_count = None
 
     return items, total_count
 
 
+# Columns written by task exports, in output order
+EXPORT_COLUMNS = (
+    Task.id, Task.title, Task.description, Task.due_date, Task.completed, Task.priority,
+    Task.team_id, Task.creator_id, Task.assignee_id, Task.created_at, Task.updated_at,
+)
+
+
+def get_tasks_export_query(
+    *,
+    team_id: uuid.UUID,
+    assignee_id: Optional[uuid.UUID] = None,
+    completed: Optional[bool] = None,
+    due_after: Optional[date] = None,
+    due_before: Optional[date] = None,
+    priority: Optional[int] = None,
+    overdue: Optional[bool] = None,
+    sort: TaskSort = DEFAULT_TASK_SORT,
+) -> Select:
+    """
+    Statement selecting the flat export columns of a team's live tasks, with the
+    filters and ordering of `get_tasks_by_team`. Plain rows rather than ORM
+    objects, so streaming it keeps no identity map and loads no relationships.
+    """
+    filters = team_task_filters(
+        team_id=team_id, assignee_id=assignee_id, completed=completed,
+        due_after=due_after, due_before=due_before, priority=priority, overdue=overdue,
+    )
+    return select(*EXPORT_COLUMNS).where(*filters).order_by(*task_sort_order(sort))
+
+
+# The inbox of a user lists their tasks by due date
+USER_TASK_SORT: TaskSort = (("due_date", False),)
+
+
+def get_tasks_for_user(
+    db: Session,
+    *,
+    user_id: uuid.UUID,
+    include_created: bool = False,
+    completed: Optional[bool] = None,
+    limit: int = 100,
+    after: Optional[Tuple[date, uuid.UUID]] = None,
+) -> List[Task]:
+    """
+    Gets the live tasks assigned to a user, and with `include_created` also the
+    ones they created, across every team they are still a member of.
+    Tasks are ordered by (due_date, id); when `after` is given it is the key of
+    the last task already seen and the page starts right after it.
+    """
+    owned = Task.assignee_id == user_id
+    if include_created:
+        owned = or_(owned, Task.creator_id == user_id)
+    is_member = exists().where(
+        team_members_table.c.team_id == Task.team_id,
+        team_members_table.c.user_id == user_id,
+    )
+    stmt = (
+        select(Task)
+        .options(selectinload(Task.assignee))
+        .where(owned, Task.is_deleted == False, is_member)
+        .order_by(*task_sort_order(USER_TASK_SORT))
+        .limit(limit)
+    )
+    if completed is not None:
+        stmt = stmt.where(Task.completed == completed)
+    if after is not None:
+        stmt = stmt.where(task_keyset_filter(USER_TASK_SORT, after))
+    return list(db.scalars(stmt))
+
+
+def get_task_changes(
+    db: Session,
+    *,
+    team_id: uuid.UUID,
+    after: Optional[Tuple[int, Optional[uuid.UUID]]] = None,
+    limit: int = 100,
+) -> List[Task]:
+    """
+    Gets the tasks of a team written after a change token, ordered by
+    (change_seq, id). `after` is (change_seq, id) of the last change already
+    seen, with a None id when every change up to that change_seq was seen.
+    Deleted tasks are included as tombstones, except in a first sync (no
+    `after`), which lists the live tasks only.
+    """
+    stmt = select(Task).options(selectinload(Task.assignee)).where(Task.team_id == team_id)
+    if after is None:
+        stmt = stmt.where(Task.is_deleted == False)
+    else:
+        change_seq, task_id = after
+        if task_id is None:
+            stmt = stmt.where(Task.change_seq > change_seq)
+        else:
+            stmt = stmt.where(tuple_(Task.change_seq, Task.id) > (change_seq, task_id))
+    return list(db.scalars(stmt.order_by(Task.change_seq, Task.id).limit(limit)))
+
+
 def update_task(db: Session, *, db_task: Task, task_in: TaskUpdate) -> Task:
     """Updates an existing task, validating assignee if changed."""
     update_data = task_in.model_dump(exclude_unset=True)
@@ -115,21 +524,135 @@ def update_task(db: Session, *, db_task: Task, task_in: TaskUpdate) -> Task:
                 )
         # If new_assignee_id is None, it's valid (unassigning)
 
+    old_state = crud_task_stats.task_state(db_task)
     for field, value in update_data.items():
         if field not in ["team_id", "creator_id"]:
             setattr(db_task, field, value)
 
+    db_task.change_seq = crud_team.bump_tasks_version(db, team_ids=[db_task.team_id])[db_task.team_id]
     db.add(db_task)
+    crud_task_stats.change_task_counts(db, [(old_state, -1), (crud_task_stats.task_state(db_task), 1)])
+    publish_task_event(db, team_id=db_task.team_id, type="updated", task_ids=[db_task.id], change_seq=db_task.change_seq)
     db.commit()
     db.refresh(db_task)
     return db_task
 
 
+def get_task_teams_for_user(
+    db: Session, *, task_ids: Collection[uuid.UUID], user_id: uuid.UUID
+) -> Dict[uuid.UUID, bool]:
+    """
+    Gets the teams of the given live tasks and whether the user is a member of
+    each, in a single statement. Unknown or deleted tasks are left out.
+    Returns a dict: {team_id: is_member}
+    """
+    is_member = exists().where(
+        team_members_table.c.team_id == Task.team_id,
+        team_members_table.c.user_id == user_id,
+    )
+    stmt = (
+        select(Task.team_id, is_member.label("is_member"))
+        .where(Task.id.in_(task_ids), Task.is_deleted == False)
+        .distinct()
+    )
+    return dict(db.execute(stmt).all())
+
+
+def update_tasks_bulk(
+    db: Session,
+    *,
+    team_ids: Collection[uuid.UUID],
+    values: Dict[str, Any],
+    task_ids: Optional[Collection[uuid.UUID]] = None,
+    assignee_id: Optional[uuid.UUID] = None,
+    completed: Optional[bool] = None,
+) -> List[uuid.UUID]:
+    """
+    Applies `values` to the live tasks of `team_ids` with one UPDATE ... RETURNING,
+    restricted to `task_ids` when given and to the optional filters. The rows are
+    locked and read first to update the team task counters, and only the teams
+    of the matched tasks get a new tasks version. Callers are
+    responsible for checking that the user may modify tasks of these teams.
+    A new assignee is validated against every team at once.
+    Returns the ids of the updated tasks.
+    """
+    if not team_ids:
+        return []
+
+    new_assignee_id = values.get("assignee_id")
+    if new_assignee_id is not None:
+        # Check if assignee exists
+        assignee_exists = db.query(User.id).filter(User.id == new_assignee_id).first() is not None
+        if not assignee_exists:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Assignee user with id {new_assignee_id} not found."
+            )
+        # Check if assignee is member of every affected team
+        member_of = set(db.scalars(
+            select(team_members_table.c.team_id).where(
+                team_members_table.c.user_id == new_assignee_id,
+                team_members_table.c.team_id.in_(team_ids),
+            )
+        ))
+        for team_id in team_ids:
+            if team_id not in member_of:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Assignee user {new_assignee_id} is not a member of team {team_id}"
+                )
+
+    filters = [Task.team_id.in_(team_ids), Task.is_deleted == False]
+    if task_ids is not None:
+        filters.append(Task.id.in_(task_ids))
+    # Apply optional filters
+    if assignee_id is not None:
+        filters.append(Task.assignee_id == assignee_id)
+    if completed is not None:
+        filters.append(Task.completed == completed)
+
+    # Lock the matching rows and read what the team counters hold for them, so
+    # the update below changes exactly these rows
+    old_rows = db.execute(
+        select(Task.id, *crud_task_stats.TASK_STATE_COLUMNS).where(*filters).with_for_update()
+    ).all()
+    if not old_rows:
+        db.commit()
+        return []
+
+    # Only the teams with matching tasks: the others' list ETags and change tokens stay valid
+    versions = crud_team.bump_tasks_version(db, team_ids={row.team_id for row in old_rows})
+    values = {field: value for field, value in values.items() if field not in ["team_id", "creator_id"]}
+    new_rows = db.execute(
+        update(Task)
+        .where(Task.id.in_([row.id for row in old_rows]))
+        .values(**values, change_seq=case(versions, value=Task.team_id))
+        .returning(Task.id, *crud_task_stats.TASK_STATE_COLUMNS)
+    ).all()
+    crud_task_stats.change_task_counts(db, [
+        *((crud_task_stats.TaskState(*row[1:]), -1) for row in old_rows),
+        *((crud_task_stats.TaskState(*row[1:]), 1) for row in new_rows),
+    ])
+    publish_team_events(
+        db,
+        type="deleted" if values.get("is_deleted") else "updated",
+        rows=[(row.team_id, row.id) for row in new_rows],
+        versions=versions,
+    )
+    updated_ids = [row.id for row in new_rows]
+    db.commit()
+    return list(updated_ids)
+
+
 def soft_delete_task(db: Session, *, db_task: Task) -> Task:
     """Marks a task as deleted (soft delete)."""
     if not db_task.is_deleted:
+        old_state = crud_task_stats.task_state(db_task)
         db_task.is_deleted = True
+        db_task.change_seq = crud_team.bump_tasks_version(db, team_ids=[db_task.team_id])[db_task.team_id]
         db.add(db_task)
+        crud_task_stats.change_task_counts(db, [(old_state, -1)])
+        publish_task_event(db, team_id=db_task.team_id, type="deleted", task_ids=[db_task.id], change_seq=db_task.change_seq)
         db.commit()
         db.refresh(db_task)
     return db_task
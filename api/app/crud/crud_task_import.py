@@ -0,0 +1,205 @@
+import csv
+import io
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterator, List, Optional, Sequence, TextIO, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy import Boolean, Column, Date, DateTime, Integer, MetaData, String, Table, Uuid, func, insert, literal, select
+from sqlalchemy.orm import Session
+from sqlalchemy.util import await_only
+
+from app.core.events import publish_task_event
+from app.crud import crud_task_stats, crud_team
+from app.models.task import Task
+from app.models.team import team_members_table
+from app.schemas.task import TaskImportError, TaskImportResult, TaskImportRow
+
+# Rows validated and copied per step; one step runs between two awaits of the endpoint
+IMPORT_CHUNK_SIZE = 5000
+# Only the first errors are reported, the rest are counted
+MAX_REPORTED_ERRORS = 1000
+
+REQUIRED_COLUMNS = {"title", "due_date"}
+OPTIONAL_COLUMNS = {"description", "completed", "priority", "assignee_id"}
+
+# Staging table the validated rows are copied into before a single merge into
+# tasks. Kept out of the application metadata: it only exists per transaction.
+staging_table = Table(
+    "task_import",
+    MetaData(),
+    Column("line", Integer, nullable=False),
+    Column("id", Uuid, nullable=False),
+    Column("title", String(255), nullable=False),
+    Column("description", String, nullable=True),
+    Column("due_date", Date, nullable=False),
+    Column("completed", Boolean, nullable=False),
+    Column("priority", Integer, nullable=True),
+    Column("assignee_id", Uuid, nullable=True),
+    Column("created_at", DateTime(timezone=True), nullable=False),
+    prefixes=["TEMPORARY"],
+    postgresql_on_commit="DROP",
+)
+
+
+def read_csv_chunks(file: TextIO, chunk_size: int = IMPORT_CHUNK_SIZE) -> Iterator[List[Tuple[int, Dict[str, str]]]]:
+    """
+    Reads a CSV file with a header row into chunks of (line_number, row) pairs,
+    without loading the whole file. Raises ValueError if the header is invalid.
+    """
+    reader = csv.DictReader(file)
+    columns = set(reader.fieldnames or [])
+    missing = REQUIRED_COLUMNS - columns
+    if missing:
+        raise ValueError(f"Missing required columns: {', '.join(sorted(missing))}")
+    unknown = columns - REQUIRED_COLUMNS - OPTIONAL_COLUMNS
+    if unknown:
+        raise ValueError(f"Unknown columns: {', '.join(sorted(unknown))}")
+
+    chunk = []
+    for row in reader:
+        chunk.append((reader.line_num, row))
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def copy_rows(db: Session, table: Table, rows: Sequence[Tuple[Any, ...]]) -> None:
+    """
+    Bulk loads rows into `table` with PostgreSQL COPY (psycopg2 or asyncpg),
+    falling back to a multi-row INSERT on other databases.
+    """
+    connection = db.connection()
+    columns = [column.name for column in table.columns]
+    driver = connection.dialect.driver
+    if driver == "psycopg2":
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(rows)  # None is written as an empty, unquoted field: NULL
+        buffer.seek(0)
+        cursor = connection.connection.cursor()
+        try:
+            cursor.copy_expert(f"COPY {table.name} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buffer)
+        finally:
+            cursor.close()
+    elif driver == "asyncpg":
+        # run_sync executes in a greenlet, so the driver coroutine can be awaited from here
+        await_only(connection.connection.driver_connection.copy_records_to_table(
+            table.name, records=rows, columns=columns,
+        ))
+    else:
+        connection.execute(insert(table), [dict(zip(columns, row)) for row in rows])
+
+
+class TaskImport:
+    """
+    Imports CSV rows as tasks of one team, chunk by chunk: each chunk is validated
+    against the Task constraints and the team's members, then copied into a
+    temporary staging table; `finish` merges everything into tasks with one
+    INSERT ... SELECT and commits. Tasks are created a microsecond apart in file
+    order, so lists ordered by creation time keep that order.
+
+    Invalid rows are reported by line. Unless `skip_invalid` is set, a single
+    invalid row aborts the import and nothing is created.
+    """
+
+    def __init__(self, *, team_id: uuid.UUID, creator_id: uuid.UUID, skip_invalid: bool = False):
+        self.team_id = team_id
+        self.creator_id = creator_id
+        self.skip_invalid = skip_invalid
+        self.errors: List[TaskImportError] = []
+        self.error_count = 0
+        self.staged_count = 0
+        self.member_ids: set = set()
+        self.started_at: Optional[datetime] = None
+
+    def start(self, db: Session) -> None:
+        """Creates the staging table and loads the team's members for assignee checks."""
+        # Database time, like the created_at default of single writes
+        self.started_at = db.scalar(select(func.now()))
+        self.member_ids = set(db.scalars(
+            select(team_members_table.c.user_id).where(team_members_table.c.team_id == self.team_id)
+        ))
+        connection = db.connection()
+        # A temporary table outlives a failed import on SQLite, where DDL is not transactional
+        staging_table.drop(connection, checkfirst=True)
+        staging_table.create(connection)
+
+    def add_error(self, line: int, detail: str) -> None:
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append(TaskImportError(line=line, detail=detail))
+
+    def add_chunk(self, db: Session, chunk: List[Tuple[int, Dict[str, str]]]) -> None:
+        """Validates a chunk of (line_number, row) pairs and stages the valid rows."""
+        valid_rows = []
+        for line, row in chunk:
+            # DictReader puts the fields beyond the header under None
+            if None in row:
+                self.add_error(line, "Row has more fields than the header")
+                continue
+            try:
+                task = TaskImportRow.model_validate({key: value for key, value in row.items() if value not in ("", None)})
+            except ValidationError as e:
+                error = e.errors()[0]
+                self.add_error(line, f"{'.'.join(str(loc) for loc in error['loc'])}: {error['msg']}")
+                continue
+            if task.assignee_id is not None and task.assignee_id not in self.member_ids:
+                self.add_error(line, f"Assignee user {task.assignee_id} is not a member of team {self.team_id}")
+                continue
+            valid_rows.append((
+                line, uuid.uuid4(), task.title, task.description, task.due_date,
+                task.completed, task.priority, task.assignee_id,
+                # One microsecond per line keeps the file order in created_at listings
+                self.started_at + timedelta(microseconds=line),
+            ))
+        # Once the import is bound to fail, the remaining rows are only validated
+        if valid_rows and (self.skip_invalid or not self.error_count):
+            copy_rows(db, staging_table, valid_rows)
+            self.staged_count += len(valid_rows)
+
+    def finish(self, db: Session) -> TaskImportResult:
+        """Merges the staged rows into tasks and commits. On errors only the staging table is dropped."""
+        if self.error_count and not self.skip_invalid:
+            staging_table.drop(db.connection())
+            return TaskImportResult(imported=0, error_count=self.error_count, errors=self.errors)
+
+        imported = 0
+        if self.staged_count:
+            # Bumped first: the merged rows carry the new version as their change_seq
+            version = crud_team.bump_tasks_version(db, team_ids=[self.team_id])[self.team_id]
+            staged = select(
+                staging_table.c.id, staging_table.c.title, staging_table.c.description, staging_table.c.due_date,
+                staging_table.c.completed, staging_table.c.priority, staging_table.c.assignee_id, staging_table.c.created_at,
+                literal(self.team_id, Uuid), literal(self.creator_id, Uuid), literal(False), literal(version),
+            ).order_by(staging_table.c.line)
+            merge = insert(Task.__table__).from_select(
+                ["id", "title", "description", "due_date", "completed", "priority", "assignee_id", "created_at",
+                 "team_id", "creator_id", "is_deleted", "change_seq"],
+                staged,
+            )
+            imported = db.execute(merge).rowcount
+            # Counted per distinct state, so a large import adds few counter updates
+            state_columns = [staging_table.c.completed, staging_table.c.priority, staging_table.c.assignee_id, staging_table.c.due_date]
+            groups = db.execute(select(*state_columns, func.count()).group_by(*state_columns)).all()
+            crud_task_stats.change_task_counts(db, [
+                (crud_task_stats.TaskState(self.team_id, False, completed, priority, assignee_id, due_date), n)
+                for completed, priority, assignee_id, due_date, n in groups
+            ])
+            # Imports can be large: subscribers fetch the new tasks through the change feed
+            publish_task_event(db, team_id=self.team_id, type="created", task_ids=None, change_seq=version)
+        staging_table.drop(db.connection())
+        db.commit()
+        return TaskImportResult(imported=imported, error_count=self.error_count, errors=self.errors)
+
+
+def import_tasks_csv(
+    db: Session, *, file: TextIO, team_id: uuid.UUID, creator_id: uuid.UUID, skip_invalid: bool = False
+) -> TaskImportResult:
+    """Imports a whole CSV file in one call, for synchronous callers such as scripts."""
+    task_import = TaskImport(team_id=team_id, creator_id=creator_id, skip_invalid=skip_invalid)
+    task_import.start(db)
+    for chunk in read_csv_chunks(file):
+        task_import.add_chunk(db, chunk)
+    return task_import.finish(db)
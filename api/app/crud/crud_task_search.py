@@ -0,0 +1,141 @@
+import html
+import re
+import uuid
+from typing import List, NamedTuple, Optional, Sequence, Tuple
+
+from sqlalchemy import and_, case, func, literal_column, or_, select
+from sqlalchemy.orm import Session, selectinload
+
+from app.crud.crud_task import team_task_filters
+from app.models.task import SEARCH_CONFIG, SEARCH_VECTOR_SQL, Task
+
+# Markers around matched words in snippets. The task text around them is
+# HTML-escaped, so snippets can be rendered as HTML.
+HIGHLIGHT_START = "<mark>"
+HIGHLIGHT_STOP = "</mark>"
+HEADLINE_OPTIONS = f"StartSel={HIGHLIGHT_START}, StopSel={HIGHLIGHT_STOP}, MaxFragments=2, MaxWords=20, MinWords=5"
+# Separates the title from the description in the text snippets are cut from
+SNIPPET_SEPARATOR = " — "
+
+# Characters escaped in snippets, in order ("&" first), as html.escape does
+HTML_ESCAPES = [("&", "&amp;"), ("<", "&lt;"), (">", "&gt;"), ('"', "&quot;"), ("'", "&#x27;")]
+
+# Weights of title and description matches in the fallback ranking
+TITLE_WEIGHT = 1.0
+DESCRIPTION_WEIGHT = 0.4
+
+
+class SearchHit(NamedTuple):
+    task: Task
+    rank: float
+    snippet: str
+
+
+def search_tasks(
+    db: Session,
+    *,
+    team_id: uuid.UUID,
+    query: str,
+    limit: int = 20,
+    after: Optional[Tuple[float, uuid.UUID]] = None,
+) -> List[SearchHit]:
+    """
+    Searches the live tasks of a team by keywords in their title and description,
+    best matches first, ordered by (rank desc, id). When `after` is given it is the
+    (rank, id) key of the last hit already seen and the page starts right after it.
+
+    PostgreSQL matches against the GIN-indexed search vector with web search syntax
+    ("quoted phrases", -excluded words, or). Other databases fall back to matching
+    every word as a case-insensitive substring.
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        return search_tasks_postgresql(db, team_id=team_id, query=query, limit=limit, after=after)
+    return search_tasks_fallback(db, team_id=team_id, query=query, limit=limit, after=after)
+
+
+def after_key(rank, after: Optional[Tuple[float, uuid.UUID]]) -> list:
+    """Keyset predicate for (rank desc, id) ordering."""
+    if after is None:
+        return []
+    after_rank, after_id = after
+    return [or_(rank < after_rank, and_(rank == after_rank, Task.id > after_id))]
+
+
+def search_tasks_postgresql(
+    db: Session, *, team_id: uuid.UUID, query: str, limit: int, after: Optional[Tuple[float, uuid.UUID]]
+) -> List[SearchHit]:
+    config = literal_column(f"'{SEARCH_CONFIG}'")
+    vector = literal_column(f"({SEARCH_VECTOR_SQL})")
+    tsquery = func.websearch_to_tsquery(config, query)
+    rank = func.ts_rank_cd(vector, tsquery)
+
+    # Rank and pick the page first, so headlines are only built for the page
+    page = (
+        select(Task.id, rank.label("rank"))
+        .where(*team_task_filters(team_id=team_id), vector.op("@@")(tsquery), *after_key(rank, after))
+        .order_by(rank.desc(), Task.id)
+        .limit(limit)
+        .subquery()
+    )
+    # Headlines are cut from the escaped text: the parser reads entities as
+    # single tokens, so the markers never land inside one
+    snippet = func.ts_headline(config, html_escape(func.concat_ws(SNIPPET_SEPARATOR, Task.title, Task.description)), tsquery, HEADLINE_OPTIONS)
+    rows = db.execute(
+        select(Task, page.c.rank, snippet)
+        .join(page, page.c.id == Task.id)
+        .order_by(page.c.rank.desc(), Task.id)
+        .options(selectinload(Task.assignee))
+    ).all()
+    return [SearchHit(task, rank, snippet) for task, rank, snippet in rows]
+
+
+def search_tasks_fallback(
+    db: Session, *, team_id: uuid.UUID, query: str, limit: int, after: Optional[Tuple[float, uuid.UUID]]
+) -> List[SearchHit]:
+    terms = query.split()
+    if not terms:
+        return []
+    matches = []
+    rank = 0.0
+    for term in terms:
+        pattern = "%" + re.sub(r"([\\%_])", r"\\\1", term) + "%"
+        in_title = Task.title.ilike(pattern, escape="\\")
+        in_description = Task.description.ilike(pattern, escape="\\")
+        matches.append(or_(in_title, in_description))
+        rank = rank + case((in_title, TITLE_WEIGHT), else_=0.0) + case((in_description, DESCRIPTION_WEIGHT), else_=0.0)
+
+    rows = db.execute(
+        select(Task, rank.label("rank"))
+        .where(*team_task_filters(team_id=team_id), *matches, *after_key(rank, after))
+        .order_by(rank.desc(), Task.id)
+        .limit(limit)
+        .options(selectinload(Task.assignee))
+    ).all()
+    return [
+        SearchHit(task, rank, highlight(SNIPPET_SEPARATOR.join(filter(None, (task.title, task.description))), terms))
+        for task, rank in rows
+    ]
+
+
+def html_escape(text):
+    """SQL expression HTML-escaping `text` like html.escape."""
+    for char, entity in HTML_ESCAPES:
+        text = func.replace(text, char, entity)
+    return text
+
+
+def highlight(text: str, terms: Sequence[str]) -> str:
+    """
+    HTML-escapes `text` and wraps every case-insensitive occurrence of the terms
+    in the highlight markers. Terms are matched before escaping, so they never
+    match inside an entity.
+    """
+    pattern = re.compile("|".join(re.escape(term) for term in sorted(terms, key=len, reverse=True)), re.IGNORECASE)
+    parts = []
+    position = 0
+    for match in pattern.finditer(text):
+        parts.append(html.escape(text[position:match.start()]))
+        parts.append(f"{HIGHLIGHT_START}{html.escape(match.group(0))}{HIGHLIGHT_STOP}")
+        position = match.end()
+    parts.append(html.escape(text[position:]))
+    return "".join(parts)
@@ -0,0 +1,177 @@
+import uuid
+from collections import Counter
+from datetime import date
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy import delete, func, literal, select, tuple_, union_all
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.models.task import Task
+from app.models.team import Team, team_task_counters_table as counters
+
+# Key of the counters of tasks without a priority or an assignee
+NONE_KEY = "none"
+
+
+class TaskState(NamedTuple):
+    """The fields of a task its team's counters depend on."""
+    team_id: uuid.UUID
+    is_deleted: bool
+    completed: bool
+    priority: Optional[int]
+    assignee_id: Optional[uuid.UUID]
+    due_date: date
+
+
+# Columns to select or return to build a TaskState, in order
+TASK_STATE_COLUMNS = (Task.team_id, Task.is_deleted, Task.completed, Task.priority, Task.assignee_id, Task.due_date)
+
+
+def task_state(task: Task) -> TaskState:
+    """Current state of a task object; `completed` may not be set before its INSERT."""
+    return TaskState(task.team_id, bool(task.is_deleted), bool(task.completed), task.priority, task.assignee_id, task.due_date)
+
+
+def counter_keys(state: TaskState) -> List[Tuple[str, str]]:
+    """
+    The (dimension, key) counters a task counts towards. Every live task counts
+    towards its status; open tasks also count by priority, assignee and due date,
+    so that overdue tasks can be summed from the due dates before today.
+    """
+    if state.is_deleted:
+        return []
+    if state.completed:
+        return [("status", "completed")]
+    return [
+        ("status", "open"),
+        ("priority", NONE_KEY if state.priority is None else str(state.priority)),
+        ("assignee", NONE_KEY if state.assignee_id is None else str(state.assignee_id)),
+        ("due_date", state.due_date.isoformat()),
+    ]
+
+
+def change_task_counts(db: Session, changes: Iterable[Tuple[TaskState, int]]) -> None:
+    """
+    Adds `n` to the counters of every (state, n) pair within the caller's
+    transaction: +1 for a new state of a task, -1 for its previous one. Changes
+    that cancel out (e.g. a title edit) write nothing. Counters are upserted in
+    key order, so concurrent writers lock them in the same order. Counters that
+    drop to zero are deleted, so a team keeps one row per key in use (e.g. per
+    due date of its open tasks) rather than per key ever used.
+    """
+    deltas: Counter = Counter()
+    for state, n in changes:
+        for dimension, key in counter_keys(state):
+            deltas[(state.team_id, dimension, key)] += n
+    rows = [
+        {"team_id": team_id, "dimension": dimension, "key": key, "count": n}
+        for (team_id, dimension, key), n in sorted(deltas.items(), key=lambda item: (str(item[0][0]), *item[0][1:]))
+        if n
+    ]
+    if not rows:
+        return
+    dialect = postgresql if db.get_bind().dialect.name == "postgresql" else sqlite
+    stmt = dialect.insert(counters)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[counters.c.team_id, counters.c.dimension, counters.c.key],
+        set_={"count": counters.c.count + stmt.excluded["count"]},
+    )
+    db.execute(stmt, rows)
+    decremented = [(row["team_id"], row["dimension"], row["key"]) for row in rows if row["count"] < 0]
+    if decremented:
+        db.execute(
+            delete(counters).where(
+                tuple_(counters.c.team_id, counters.c.dimension, counters.c.key).in_(decremented),
+                counters.c.count == 0,
+            )
+        )
+
+
+def get_team_task_stats(db: Session, *, team_id: uuid.UUID, today: Optional[date] = None) -> Dict[str, object]:
+    """
+    Task statistics of a team read from its counters, with the fields of
+    `schemas.TeamTaskStats`, in one statement. Overdue tasks are the open ones
+    due before `today`: their due date counters are summed by the database over
+    a range of the primary key, instead of loading every due date.
+    """
+    today = today or date.today()
+    per_key = select(counters.c.dimension, counters.c.key, counters.c.count).where(
+        counters.c.team_id == team_id, counters.c.dimension.in_(["status", "priority", "assignee"]),
+    )
+    # ISO dates compare like the dates themselves
+    overdue = select(literal("overdue"), literal(""), func.coalesce(func.sum(counters.c.count), 0)).where(
+        counters.c.team_id == team_id, counters.c.dimension == "due_date", counters.c.key < today.isoformat(),
+    )
+    by_dimension: Dict[str, Dict[str, int]] = {"status": {}, "priority": {}, "assignee": {}, "overdue": {}}
+    for dimension, key, count in db.execute(union_all(per_key, overdue)).all():
+        # Counters are deleted at zero; rows left at zero by older versions are skipped
+        if count:
+            by_dimension[dimension][key] = count
+    status = by_dimension["status"]
+    open_count, completed_count = status.get("open", 0), status.get("completed", 0)
+    return {
+        "team_id": team_id,
+        "total": open_count + completed_count,
+        "open": open_count,
+        "completed": completed_count,
+        "overdue": by_dimension["overdue"].get("", 0),
+        "by_priority": by_dimension["priority"],
+        "by_assignee": by_dimension["assignee"],
+    }
+
+
+def count_team_tasks(db: Session, *, team_id: uuid.UUID) -> Dict[Tuple[str, str], int]:
+    """Counters of a team recomputed from its tasks, grouped in the database."""
+    rows = db.execute(
+        select(*TASK_STATE_COLUMNS, func.count())
+        .where(Task.team_id == team_id, Task.is_deleted == False)
+        .group_by(*TASK_STATE_COLUMNS)
+    ).all()
+    expected: Counter = Counter()
+    for *state, n in rows:
+        for key in counter_keys(TaskState(*state)):
+            expected[key] += n
+    return dict(expected)
+
+
+def reconcile_team_task_stats(db: Session, *, team_id: uuid.UUID) -> bool:
+    """
+    Recomputes the counters of a team from its tasks and rewrites them if they
+    drifted, then commits. Every task write updates the team row (its tasks
+    version), so locking that row first waits for in-flight writes and keeps new
+    ones out until the counters are rewritten.
+    Returns whether the counters had to be corrected.
+    """
+    if db.scalar(select(Team.id).where(Team.id == team_id).with_for_update()) is None:
+        db.commit()
+        return False
+    expected = count_team_tasks(db, team_id=team_id)
+    current = {
+        (dimension, key): count
+        for dimension, key, count in db.execute(
+            select(counters.c.dimension, counters.c.key, counters.c.count).where(counters.c.team_id == team_id)
+        ).all()
+    }
+    drifted = {key: count for key, count in current.items() if count} != expected
+    # Rows that went back to zero are dropped as well
+    if current != expected:
+        db.execute(delete(counters).where(counters.c.team_id == team_id))
+        if expected:
+            db.execute(counters.insert(), [
+                {"team_id": team_id, "dimension": dimension, "key": key, "count": count}
+                for (dimension, key), count in sorted(expected.items())
+            ])
+    db.commit()
+    return drifted
+
+
+def reconcile_task_stats(db: Session, *, team_ids: Optional[Iterable[uuid.UUID]] = None) -> List[uuid.UUID]:
+    """
+    Reconciles the counters of the given teams, or of every team, one team per
+    transaction. Returns the ids of the teams whose counters had drifted.
+    """
+    if team_ids is None:
+        team_ids = db.scalars(select(Team.id).order_by(Team.id)).all()
+        db.commit()
+    return [team_id for team_id in team_ids if reconcile_team_task_stats(db, team_id=team_id)]
@@ -1,34 +1,246 @@
 import uuid
-from typing import List, Optional, Tuple
+from collections import defaultdict
+from datetime import datetime
+from typing import Collection, Dict, FrozenSet, List, Optional, Tuple
 
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import Row, case, delete, exists, func, insert, select, true, update
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
 
-from app.models.team import Team
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.events import publish_task_event
+from app.models.task import Task
+from app.models.team import Team, team_members_table, team_task_counters_table
 from app.models.user import User
 from app.schemas.team import TeamCreate, TeamUpdate
 
+# user id -> frozenset of the ids of the teams the user belongs to.
+# Only positive answers are served from the cache; a team missing from the
+# cached set is re-checked against the database.
+# Serves the checks that would otherwise be statements of their own: task
+# writes (creator and assignee), bulk writes, import, export, search and stats.
+# Reads that load a team, a task or a team's tasks version check the membership
+# with an EXISTS in that same statement instead, which costs one index probe
+# and no round trip, and stays exact across workers.
+membership_cache = TTLCache(
+    maxsize=settings.MEMBERSHIP_CACHE_SIZE,
+    ttl=settings.MEMBERSHIP_CACHE_TTL_SECONDS,
+)
+
+# Versioned snapshot of the team directory: pages keyed by (version, after, limit),
+# where the version is the cache generation. Every team write bumps it, so stale
+# pages are never served and age out of the cache.
+directory_cache = TTLCache(
+    maxsize=settings.TEAM_DIRECTORY_CACHE_SIZE,
+    ttl=settings.TEAM_DIRECTORY_CACHE_TTL_SECONDS,
+)
+
+# Members loaded per team when a team listing includes them
+MEMBERS_PREVIEW_SIZE = 10
+
 
 def get_team(db: Session, *, team_id: uuid.UUID, include_deleted: bool = False) -> Optional[Team]:
     """Gets a specific team by ID. Optionally includes soft-deleted teams."""
-    query = db.query(Team).options(joinedload(Team.members)).filter(Team.id == team_id)
+    query = db.query(Team).filter(Team.id == team_id)
 
     return query.first()
 
+def get_team_for_user(db: Session, *, team_id: uuid.UUID, user_id: uuid.UUID) -> Tuple[Optional[Team], bool]:
+    """
+    Resolves a team and checks the user's membership in a single statement.
+    Members are not loaded. Returns a tuple: (team_or_None, is_member)
+    """
+    is_member = exists().where(
+        team_members_table.c.team_id == Team.id,
+        team_members_table.c.user_id == user_id,
+    )
+    row = db.execute(select(Team, is_member.label("is_member")).where(Team.id == team_id)).first()
+    if row is None:
+        return None, False
+    return row.Team, row.is_member
+
+def get_team_tasks_version(db: Session, *, team_id: uuid.UUID, user_id: uuid.UUID) -> Tuple[Optional[int], bool]:
+    """
+    Reads the version of a team's task list and checks the user's membership in
+    a single statement. Returns a tuple: (tasks_version_or_None, is_member)
+    """
+    is_member = exists().where(
+        team_members_table.c.team_id == Team.id,
+        team_members_table.c.user_id == user_id,
+    )
+    row = db.execute(select(Team.tasks_version, is_member.label("is_member")).where(Team.id == team_id)).first()
+    if row is None:
+        return None, False
+    return row.tasks_version, row.is_member
+
+def get_team_updated_at_for_user(db: Session, *, team_id: uuid.UUID, user_id: uuid.UUID) -> Tuple[Optional[datetime], bool]:
+    """
+    Reads a team's updated_at and checks the user's membership in a single
+    statement, without loading the team. Returns a tuple: (updated_at_or_None, is_member)
+    """
+    is_member = exists().where(
+        team_members_table.c.team_id == Team.id,
+        team_members_table.c.user_id == user_id,
+    )
+    row = db.execute(select(Team.updated_at, is_member.label("is_member")).where(Team.id == team_id)).first()
+    if row is None:
+        return None, False
+    return row.updated_at, row.is_member
+
+def bump_tasks_version(db: Session, *, team_ids: Collection[uuid.UUID]) -> Dict[uuid.UUID, int]:
+    """
+    Advances the task list version of the given teams within the caller's
+    transaction. Every task write calls this so that list ETags change, and
+    stamps the new version on the tasks it writes (`Task.change_seq`): the team
+    row stays locked until commit, so versions commit in order.
+    The team's own updated_at is left alone: the team itself did not change.
+    Returns a dict: {team_id: new_tasks_version}
+    """
+    rows = db.execute(
+        update(Team)
+        .where(Team.id.in_(team_ids))
+        .values(tasks_version=Team.tasks_version + 1, updated_at=Team.updated_at)
+        .returning(Team.id, Team.tasks_version)
+        .execution_options(synchronize_session=False)
+    )
+    return dict(rows.all())
+
+def bump_assignee_tasks_version(db: Session, *, user_id: uuid.UUID) -> None:
+    """
+    Advances the task list version of the teams where the user is assigned live
+    tasks, within the caller's transaction. Task lists embed their assignees, so
+    a change to the user must change the ETag of these lists as well, and the
+    tasks are stamped with the new versions so the change feed sends them again.
+    Their updated_at is left alone: the tasks themselves did not change.
+    """
+    assigned_teams = select(Task.team_id).where(Task.assignee_id == user_id, Task.is_deleted == False)
+    versions = dict(db.execute(
+        update(Team)
+        .where(Team.id.in_(assigned_teams))
+        .values(tasks_version=Team.tasks_version + 1, updated_at=Team.updated_at)
+        .returning(Team.id, Team.tasks_version)
+        .execution_options(synchronize_session=False)
+    ).all())
+    if not versions:
+        return
+    rows = db.execute(
+        update(Task)
+        .where(Task.assignee_id == user_id, Task.is_deleted == False)
+        .values(change_seq=case(versions, value=Task.team_id), updated_at=Task.updated_at)
+        .returning(Task.team_id, Task.id)
+        .execution_options(synchronize_session=False)
+    ).all()
+    task_ids = defaultdict(list)
+    for team_id, task_id in rows:
+        task_ids[team_id].append(task_id)
+    for team_id, version in versions.items():
+        publish_task_event(db, team_id=team_id, type="updated", task_ids=task_ids[team_id], change_seq=version)
+
+def get_team_access(db: Session, *, team_id: uuid.UUID, user_id: uuid.UUID) -> Tuple[bool, bool]:
+    """
+    Checks that a team exists and that the user is a member of it, without loading the team.
+    Answered from the membership cache when possible, otherwise with a single statement.
+    Returns a tuple: (team_exists, is_member)
+    """
+    if team_id in get_user_team_ids(db, user_id=user_id):
+        return True, True
+    team_exists, is_member = db.execute(
+        select(
+            exists().where(Team.id == team_id),
+            exists().where(team_members_table.c.team_id == team_id, team_members_table.c.user_id == user_id),
+        )
+    ).one()
+    if is_member:
+        # Added through another worker since the set was cached
+        membership_cache.invalidate(user_id)
+    return team_exists, is_member
+
 def get_team_by_name(db: Session, *, name: str) -> Optional[Team]:
     """Gets a team by its name."""
-    return db.query(Team).options(joinedload(Team.members)).filter(Team.name == name).first()
+    return db.query(Team).filter(Team.name == name).first()
 
 def get_teams(db: Session, skip: int = 0, limit: int = 100) -> List[Team]:
     """Gets a list of all teams."""
-    return db.query(Team).options(joinedload(Team.members)).offset(skip).limit(limit).all()
+    return db.query(Team).offset(skip).limit(limit).all()
+
+def get_team_directory_page(db: Session, *, limit: int = 100, after: Optional[uuid.UUID] = None) -> Tuple[Row, ...]:
+    """
+    Gets a page of all teams ordered by id, as rows of (id, name, created_at,
+    updated_at, member_count), served from the directory cache when possible.
+    `after` is the id of the last team of the previous page.
+    """
+    generation = directory_cache.generation
+    key = (generation, after, limit)
+    page = directory_cache.get(key)
+    if page is None:
+        query = select(Team.id, Team.name, Team.created_at, Team.updated_at, Team.member_count).order_by(Team.id).limit(limit)
+        if after is not None:
+            query = query.where(Team.id > after)
+        page = tuple(db.execute(query))
+        directory_cache.set(key, page, generation=generation)
+    return page
+
+def get_user_teams(
+    db: Session,
+    *,
+    user_id: uuid.UUID,
+    skip: int = 0,
+    limit: int = 100,
+    after: Optional[uuid.UUID] = None,
+    members_limit: int = 0,
+) -> List[Team]:
+    """
+    Gets a page of the teams a user is a member of, ordered by team id, walking the
+    (user_id, team_id) index of team_members. `after` is the id of the last team of
+    the previous page. With `members_limit`, the first members of the teams are
+    loaded by one more statement (see `load_first_members`).
+    """
+    query = (
+        select(Team)
+        .join(team_members_table, team_members_table.c.team_id == Team.id)
+        .where(team_members_table.c.user_id == user_id)
+        .order_by(team_members_table.c.team_id)
+        .offset(skip)
+        .limit(limit)
+    )
+    if after is not None:
+        query = query.where(team_members_table.c.team_id > after)
+    teams = list(db.scalars(query))
+    if members_limit and teams:
+        load_first_members(db, teams=teams, limit=members_limit)
+    return teams
 
-def get_all_teams_directly(db: Session) -> List[Team]:
-    """Gets a list of all teams directly, without pagination. Eagerly loads members."""
-    return db.query(Team).options(joinedload(Team.members)).all()
+def load_first_members(db: Session, *, teams: List[Team], limit: int) -> None:
+    """
+    Loads the first `limit` members (by user id) of each team in a single statement
+    and sets them as the team's `members`, as a loader would. The collections are
+    then partial: only use this for teams that are serialized, never modified.
+    """
+    team_ids = [team.id for team in teams]
+    if db.get_bind().dialect.name == "postgresql":
+        # A LATERAL subquery stops after `limit` index entries per team
+        page = select(Team.id.label("team_id")).where(Team.id.in_(team_ids)).subquery()
+        first = (
+            select(team_members_table.c.user_id)
+            .where(team_members_table.c.team_id == page.c.team_id)
+            .order_by(team_members_table.c.user_id)
+            .limit(limit)
+            .lateral()
+        )
+        query = select(page.c.team_id, User).select_from(page).join(first, true()).join(User, User.id == first.c.user_id)
+    else:
+        rank = func.row_number().over(partition_by=team_members_table.c.team_id, order_by=team_members_table.c.user_id)
+        ranked = select(
+            team_members_table.c.team_id, team_members_table.c.user_id, rank.label("rank"),
+        ).where(team_members_table.c.team_id.in_(team_ids)).subquery()
+        query = select(ranked.c.team_id, User).join(User, User.id == ranked.c.user_id).where(ranked.c.rank <= limit)
 
-def get_user_teams(db: Session, *, user_id: uuid.UUID, skip: int = 0, limit: int = 100) -> List[Team]:
-    """Gets a list of teams a specific user is a member of."""
-    return db.query(Team).options(joinedload(Team.members)).join(Team.members).filter(User.id == user_id).offset(skip).limit(limit).all()
+    members = {team_id: [] for team_id in team_ids}
+    for team_id, user in db.execute(query.order_by(User.id)):
+        members[team_id].append(user)
+    for team in teams:
+        set_committed_value(team, "members", members[team.id])
 
 def create_team_with_creator(db: Session, *, team_in: TeamCreate, creator: User) -> Team:
     """Creates a new team and adds the creator as the first member."""
@@ -36,8 +248,9 @@ def create_team_with_creator(db: Session, *, team_in: TeamCreate, creator: User)
     db_team.members.append(creator)
     db.add(db_team)
     db.commit()
+    membership_cache.invalidate(creator.id)
+    directory_cache.invalidate()
     db.refresh(db_team)
-    db.query(Team).options(joinedload(Team.members)).filter(Team.id == db_team.id).first()
     return db_team
 
 def update_team(db: Session, *, db_team: Team, team_in: TeamUpdate) -> Team:
@@ -47,34 +260,90 @@ def update_team(db: Session, *, db_team: Team, team_in: TeamUpdate) -> Team:
         setattr(db_team, field, value)
     db.add(db_team)
     db.commit()
+    directory_cache.invalidate()
     db.refresh(db_team)
-    db.query(Team).options(joinedload(Team.members)).filter(Team.id == db_team.id).first()
     return db_team
 
 def delete_team(db: Session, *, db_team: Team) -> Team:
     """Deletes a team."""
+    member_ids = db.scalars(
+        delete(team_members_table).where(team_members_table.c.team_id == db_team.id).returning(team_members_table.c.user_id)
+    ).all()
+    db.expire(db_team, ["members"]) # Rows are gone; do not let the unit of work delete them again
+    db.execute(delete(team_task_counters_table).where(team_task_counters_table.c.team_id == db_team.id))
     db.delete(db_team)
     db.commit()
+    membership_cache.invalidate(*member_ids)
+    directory_cache.invalidate()
     return db_team
 
+def is_member_row(db: Session, *, team_id: uuid.UUID, user_id: uuid.UUID) -> bool:
+    """Checks the team_members table directly, bypassing the membership cache."""
+    return db.execute(
+        select(exists().where(team_members_table.c.team_id == team_id, team_members_table.c.user_id == user_id))
+    ).scalar()
+
 def add_user_to_team(db: Session, *, db_team: Team, db_user: User) -> Team:
-    """Adds a user to a team's members list if not already present."""
-    if db_user not in db_team.members:
-        db_team.members.append(db_user)
+    """Adds a user to a team's members if not already present, without loading the other members."""
+    if not is_member_row(db, team_id=db_team.id, user_id=db_user.id):
+        db.execute(insert(team_members_table).values(team_id=db_team.id, user_id=db_user.id))
+        db_team.updated_at = func.now() # The member count is part of the team's representation (and ETag)
         db.add(db_team)
         db.commit()
+        membership_cache.invalidate(db_user.id)
+        directory_cache.invalidate() # member_count changed
         db.refresh(db_team)
     return db_team
 
 def remove_user_from_team(db: Session, *, db_team: Team, db_user: User) -> Team:
-    """Removes a user from a team's members list if present."""
-    if db_user in db_team.members:
-        db_team.members.remove(db_user)
+    """Removes a user from a team's members if present, without loading the other members."""
+    removed = db.execute(
+        delete(team_members_table).where(
+            team_members_table.c.team_id == db_team.id, team_members_table.c.user_id == db_user.id,
+        )
+    ).rowcount
+    if removed:
+        db_team.updated_at = func.now() # The member count is part of the team's representation (and ETag)
         db.add(db_team)
         db.commit()
+        membership_cache.invalidate(db_user.id)
+        directory_cache.invalidate() # member_count changed
         db.refresh(db_team)
     return db_team
 
+def get_team_members(db: Session, *, team_id: uuid.UUID, limit: int = 100, after: Optional[uuid.UUID] = None) -> List[User]:
+    """
+    Gets a page of a team's members ordered by user id, walking the team_members
+    primary key. `after` is the id of the last member of the previous page.
+    """
+    query = (
+        select(User)
+        .join(team_members_table, team_members_table.c.user_id == User.id)
+        .where(team_members_table.c.team_id == team_id)
+        .order_by(team_members_table.c.user_id)
+        .limit(limit)
+    )
+    if after is not None:
+        query = query.where(team_members_table.c.user_id > after)
+    return list(db.scalars(query))
+
+def get_user_team_ids(db: Session, *, user_id: uuid.UUID) -> FrozenSet[uuid.UUID]:
+    """Gets the ids of the teams a user belongs to, through the membership cache."""
+    team_ids = membership_cache.get(user_id)
+    if team_ids is None:
+        generation = membership_cache.generation
+        team_ids = frozenset(
+            db.execute(select(team_members_table.c.team_id).where(team_members_table.c.user_id == user_id)).scalars()
+        )
+        membership_cache.set(user_id, team_ids, generation=generation)
+    return team_ids
+
 def is_user_member_of_team(db: Session, *, team_id: uuid.UUID, user_id: uuid.UUID) -> bool:
     """Checks if a user is a member of a specific team."""
-    return db.query(Team).join(Team.members).filter(Team.id == team_id, User.id == user_id).count() > 0
+    if team_id in get_user_team_ids(db, user_id=user_id):
+        return True
+    is_member = is_member_row(db, team_id=team_id, user_id=user_id)
+    if is_member:
+        # Added through another worker since the set was cached
+        membership_cache.invalidate(user_id)
+    return is_member
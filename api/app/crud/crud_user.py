@@ -1,11 +1,22 @@
 import uuid
 from typing import Optional
 
-from sqlalchemy.orm import Session
+from sqlalchemy import inspect
+from sqlalchemy.orm import Session, make_transient_to_detached
 
 from app.models.user import User
 from app.schemas.user import UserCreate, UserUpdate
+from app.core.cache import TTLCache
+from app.core.config import settings
 from app.core.security import get_password_hash
+from app.crud import crud_team
+
+# user id -> column values of the user. Values rather than instances are cached,
+# since an ORM instance can only be attached to one session at a time.
+principal_cache = TTLCache(
+    maxsize=settings.PRINCIPAL_CACHE_SIZE,
+    ttl=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+)
 
 def get_user_by_email(db: Session, *, email: str) -> Optional[User]:
     """Gets a user by their email address."""
@@ -15,9 +26,30 @@ def get_user(db: Session, *, user_id: uuid.UUID) -> Optional[User]:
     """Gets a user by their ID."""
     return db.query(User).filter(User.id == user_id).first()
 
-def create_user(db: Session, *, user_in: UserCreate) -> User:
-    """Creates a new user in the database."""
-    hashed_pwd = get_password_hash(user_in.password)
+def get_user_cached(db: Session, *, user_id: uuid.UUID) -> Optional[User]:
+    """
+    Gets a user by their ID through the principal cache.
+    On a cache hit the user is attached to `db` without querying the database.
+    """
+    values = principal_cache.get(user_id)
+    if values is None:
+        generation = principal_cache.generation
+        db_user = get_user(db, user_id=user_id)
+        if db_user is not None:
+            values = {attr.key: getattr(db_user, attr.key) for attr in inspect(User).column_attrs}
+            principal_cache.set(user_id, values, generation=generation)
+        return db_user
+
+    db_user = User(**values)
+    make_transient_to_detached(db_user)
+    return db.merge(db_user, load=False)
+
+def create_user(db: Session, *, user_in: UserCreate, hashed_password: Optional[str] = None) -> User:
+    """
+    Creates a new user in the database.
+    Callers on the event loop hash the password beforehand and pass `hashed_password`.
+    """
+    hashed_pwd = hashed_password or get_password_hash(user_in.password)
     # Create a dictionary of the data for the User model
     # Exclude the plain password, include the hashed one
     db_user = User(
@@ -41,6 +73,9 @@ def update_user(db: Session, *, db_user: User, user_in: UserUpdate) -> User:
         setattr(db_user, field, value)
 
     db.add(db_user)
+    # Task lists embedding the user as assignee are versioned by their team
+    crud_team.bump_assignee_tasks_version(db, user_id=db_user.id)
     db.commit()
+    principal_cache.invalidate(db_user.id)
     db.refresh(db_user)
     return db_user
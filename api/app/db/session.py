@@ -1,17 +1,190 @@
-from sqlalchemy import create_engine
+import itertools
+import threading
+import time
+import uuid
+from typing import Any, Dict, Hashable, Optional
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, Pool, QueuePool
+from app.core.cache import TTLCache
 from app.core.config import settings
 
 # Ensure DATABASE_URL is available
 if settings.DATABASE_URL is None:
     raise ValueError("DATABASE_URL is not configured properly.")
 
-connect_args = {} # Add specific arguments if needed for PostgreSQL
+# Async drivers used for each backend when deriving the async URL
+ASYNC_DRIVERS = {
+    "postgresql": "asyncpg",
+    "sqlite": "aiosqlite",
+}
+
+
+def get_async_database_url(database_url: str) -> str:
+    """Swaps the driver of a sync database URL for its async counterpart."""
+    url = make_url(database_url)
+    driver = ASYNC_DRIVERS.get(url.get_backend_name())
+    if driver is None:
+        raise ValueError(f"No async driver known for database backend '{url.get_backend_name()}'")
+    return url.set(drivername=f"{url.get_backend_name()}+{driver}").render_as_string(hide_password=False)
+
+
+class PoolStats:
+    """Counters for connection checkouts: how many, how long they waited, how many timed out."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def record_checkout(self, wait_seconds: float) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.wait_seconds_total += wait_seconds
+            self.wait_seconds_max = max(self.wait_seconds_max, wait_seconds)
+
+    def record_timeout(self) -> None:
+        with self._lock:
+            self.timeouts += 1
+
+    def reset(self) -> None:
+        with self._lock:
+            self.checkouts = 0
+            self.timeouts = 0
+            self.wait_seconds_total = 0.0
+            self.wait_seconds_max = 0.0
+
+
+pool_stats = PoolStats()
+
+
+class MeasuredAsyncQueuePool(AsyncAdaptedQueuePool):
+    """Async queue pool recording how long each checkout waits for a connection."""
+
+    def _do_get(self) -> Any:
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            pool_stats.record_timeout()
+            raise
+        pool_stats.record_checkout(time.perf_counter() - start)
+        return connection
+
+
+def engine_options(database_url: str, *, is_async: bool) -> Dict[str, Any]:
+    """Builds create_engine/create_async_engine keyword arguments from the pool settings."""
+    url = make_url(database_url)
+    is_postgres = url.get_backend_name() == "postgresql"
+    options: Dict[str, Any] = {"pool_pre_ping": settings.DB_POOL_PRE_PING}
+    connect_args: Dict[str, Any] = {}
 
-engine = create_engine(
-    settings.DATABASE_URL,
-    pool_pre_ping=True,
-    connect_args=connect_args
-)
+    if settings.DB_PGBOUNCER_MODE:
+        # PgBouncer does the pooling; a server connection only lasts one transaction
+        options["poolclass"] = NullPool
+        if is_async and is_postgres:
+            # Prepared statements do not survive moving between server connections
+            connect_args["statement_cache_size"] = 0
+            connect_args["prepared_statement_cache_size"] = 0
+            connect_args["prepared_statement_name_func"] = lambda: f"__asyncpg_{uuid.uuid4()}__"
+    else:
+        options.update(
+            poolclass=MeasuredAsyncQueuePool if is_async else QueuePool,
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+            pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+        )
+        if is_postgres and settings.DB_STATEMENT_TIMEOUT_MS is not None:
+            # Session-level setting, applied once when the connection is opened
+            if is_async:
+                connect_args["server_settings"] = {"statement_timeout": str(settings.DB_STATEMENT_TIMEOUT_MS)}
+            else:
+                connect_args["options"] = f"-c statement_timeout={settings.DB_STATEMENT_TIMEOUT_MS}"
+
+    options["connect_args"] = connect_args
+    return options
+
+
+def apply_transaction_statement_timeout(sync_engine: Engine) -> None:
+    """
+    Under transaction pooling session-level settings would leak to other clients,
+    so the timeout is set with SET LOCAL at the start of every transaction instead.
+    """
+    @event.listens_for(sync_engine, "begin")
+    def set_local_statement_timeout(conn):
+        conn.exec_driver_sql(f"SET LOCAL statement_timeout = {int(settings.DB_STATEMENT_TIMEOUT_MS)}")
+
+
+def pool_status(pool: Pool) -> Dict[str, Optional[float]]:
+    """Current state of a pool plus the checkout counters."""
+    is_queue_pool = isinstance(pool, QueuePool)
+    checkouts = pool_stats.checkouts
+    return {
+        "pool_class": type(pool).__name__,
+        "size": pool.size() if is_queue_pool else None,
+        "checked_in": pool.checkedin() if is_queue_pool else None,
+        "checked_out": pool.checkedout() if is_queue_pool else None,
+        "overflow": max(pool.overflow(), 0) if is_queue_pool else None,
+        "max_overflow": settings.DB_MAX_OVERFLOW if is_queue_pool else None,
+        "checkouts": checkouts,
+        "timeouts": pool_stats.timeouts,
+        "wait_seconds_total": pool_stats.wait_seconds_total,
+        "wait_seconds_max": pool_stats.wait_seconds_max,
+        "wait_seconds_avg": pool_stats.wait_seconds_total / checkouts if checkouts else 0.0,
+    }
+
+
+# Sync engine and session factory, used by Alembic, scripts and tests
+engine = create_engine(settings.DATABASE_URL, **engine_options(settings.DATABASE_URL, is_async=False))
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+# Async engine and session factory serving API requests
+ASYNC_DATABASE_URL = settings.ASYNC_DATABASE_URL or get_async_database_url(settings.DATABASE_URL)
+async_engine = create_async_engine(ASYNC_DATABASE_URL, **engine_options(ASYNC_DATABASE_URL, is_async=True))
+
+# Async engines of the read replicas, used in turn by the read-only endpoints
+replica_engines = [
+    create_async_engine(url, **engine_options(url, is_async=True))
+    for url in (get_async_database_url(replica_url) for replica_url in settings.DATABASE_REPLICA_URLS)
+]
+
+if (settings.DB_PGBOUNCER_MODE and settings.DB_STATEMENT_TIMEOUT_MS is not None
+        and make_url(ASYNC_DATABASE_URL).get_backend_name() == "postgresql"):
+    apply_transaction_statement_timeout(engine)
+    for sync_engine in [async_engine.sync_engine] + [replica.sync_engine for replica in replica_engines]:
+        apply_transaction_statement_timeout(sync_engine)
+
+# Objects stay usable after commit: attributes must not be lazily reloaded
+# outside of the session's greenlet once a response is being serialized.
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+ReplicaSessionLocals = [
+    async_sessionmaker(bind=replica, autoflush=False, expire_on_commit=False) for replica in replica_engines
+]
+_replica_turns = itertools.count()
+
+# Users who wrote within the last REPLICA_STICKINESS_SECONDS: their reads go to the primary
+recent_writers = TTLCache(maxsize=100000, ttl=settings.REPLICA_STICKINESS_SECONDS)
+
+
+def record_write(user_id: Hashable) -> None:
+    """Pins the user's reads to the primary for the stickiness window."""
+    if ReplicaSessionLocals:
+        recent_writers.set(user_id, True)
+
+
+def read_session_factory(user_id: Hashable) -> Optional[async_sessionmaker]:
+    """
+    Session factory of the next replica in turn, or None when reads must use
+    the primary: no replica is configured or the user wrote recently.
+    """
+    if not ReplicaSessionLocals or recent_writers.get(user_id):
+        return None
+    return ReplicaSessionLocals[next(_replica_turns) % len(ReplicaSessionLocals)]
@@ -2,7 +2,7 @@ import uuid
 from datetime import date, datetime
 from typing import Optional, TYPE_CHECKING
 
-from sqlalchemy import Column, String, Boolean, DateTime, Date, Integer, ForeignKey, func
+from sqlalchemy import Column, String, Boolean, DateTime, Date, Integer, ForeignKey, Index, func, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship, Mapped, mapped_column
 
@@ -12,7 +12,51 @@ if TYPE_CHECKING:
     from .user import User  # noqa: F401
     from .team import Team  # noqa: F401
 
+# Partial indexes only cover live rows; every listing filters on is_deleted = false
+ACTIVE_TASKS = text("is_deleted = false")
+
+# PostgreSQL full-text search document of a task, title ranked above description.
+# Kept as SQL text so queries repeat the exact expression of the GIN index, with
+# constants rather than bound parameters.
+SEARCH_CONFIG = "english"
+SEARCH_VECTOR_SQL = (
+    f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(title, '')), 'A') || "
+    f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(description, '')), 'B')"
+)
+
+
 class Task(Base):
+    __table_args__ = (
+        # Team listing: WHERE team_id = ? ORDER BY created_at, id (and keyset seeks)
+        Index("ix_tasks_team_id_created_at_active", "team_id", "created_at", "id",
+              postgresql_where=ACTIVE_TASKS, sqlite_where=ACTIVE_TASKS),
+        # Team listing filtered by assignee
+        Index("ix_tasks_team_id_assignee_id_created_at_active", "team_id", "assignee_id", "created_at", "id",
+              postgresql_where=ACTIVE_TASKS, sqlite_where=ACTIVE_TASKS),
+        # Team listing filtered by completion status
+        Index("ix_tasks_team_id_completed_created_at_active", "team_id", "completed", "created_at", "id",
+              postgresql_where=ACTIVE_TASKS, sqlite_where=ACTIVE_TASKS),
+        # Team listing by due date (range filters, due_date sorts)
+        Index("ix_tasks_team_id_due_date_active", "team_id", "due_date", "id",
+              postgresql_where=ACTIVE_TASKS, sqlite_where=ACTIVE_TASKS),
+        # Team listing filtered or sorted by priority
+        Index("ix_tasks_team_id_priority_active", "team_id", "priority", "id",
+              postgresql_where=ACTIVE_TASKS, sqlite_where=ACTIVE_TASKS),
+        # Change feed: WHERE team_id = ? AND (change_seq, id) > (?, ?), tombstones included
+        Index("ix_tasks_team_id_change_seq", "team_id", "change_seq", "id"),
+        # Full-text search; an expression index is maintained by PostgreSQL on every write
+        Index("ix_tasks_search_vector_active", text(f"({SEARCH_VECTOR_SQL})"),
+              postgresql_using="gin", postgresql_where=ACTIVE_TASKS).ddl_if(dialect="postgresql"),
+        # Inbox of a user across teams: assigned (and created) tasks by due date
+        Index("ix_tasks_assignee_id_due_date_active", "assignee_id", "due_date", "id",
+              postgresql_where=ACTIVE_TASKS, sqlite_where=ACTIVE_TASKS),
+        Index("ix_tasks_creator_id_due_date_active", "creator_id", "due_date", "id",
+              postgresql_where=ACTIVE_TASKS, sqlite_where=ACTIVE_TASKS),
+        # Foreign key lookups (user deletes, per-user task queries)
+        Index("ix_tasks_assignee_id", "assignee_id"),
+        Index("ix_tasks_creator_id", "creator_id"),
+    )
+
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     title: Mapped[str] = mapped_column(String(length=255), index=True, nullable=False)
     description: Mapped[Optional[str]] = mapped_column(String, nullable=True)
@@ -20,6 +64,8 @@ class Task(Base):
     completed: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)
     priority: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
     is_deleted: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False, index=True)
+    # Team tasks_version stamped by the last write of the task; orders the change feed
+    change_seq: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default=text("0"))
 
     team_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("teams.id"), nullable=False)
     creator_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
@@ -27,7 +73,8 @@ class Task(Base):
 
     team: Mapped["Team"] = relationship("Team", back_populates="tasks")
     creator: Mapped["User"] = relationship("User", foreign_keys=[creator_id], back_populates="created_tasks")
-    assignee: Mapped[Optional["User"]] = relationship("User", foreign_keys=[assignee_id], back_populates="assigned_tasks")
+    # Always serialized with the task, so loaded eagerly: lazy loads cannot run once an async response is rendered
+    assignee: Mapped[Optional["User"]] = relationship("User", foreign_keys=[assignee_id], back_populates="assigned_tasks", lazy="selectin")
 
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
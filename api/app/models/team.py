@@ -2,9 +2,9 @@ import uuid
 from datetime import datetime
 from typing import List, TYPE_CHECKING
 
-from sqlalchemy import Column, String, DateTime, Table, ForeignKey, func, Boolean
+from sqlalchemy import Column, String, DateTime, Table, ForeignKey, Index, Integer, func, Boolean, select, text
 from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.orm import relationship, Mapped, mapped_column
+from sqlalchemy.orm import column_property, relationship, Mapped, mapped_column
 
 from app.db.base_class import Base
 
@@ -14,6 +14,20 @@ team_members_table = Table(
     Base.metadata,
     Column("team_id", UUID(as_uuid=True), ForeignKey("teams.id"), primary_key=True),
     Column("user_id", UUID(as_uuid=True), ForeignKey("users.id"), primary_key=True),
+    # The primary key serves lookups by team; this one serves "teams of a user"
+    Index("ix_team_members_user_id_team_id", "user_id", "team_id"),
+)
+
+# Live task counts of a team, maintained by every task write in the same transaction
+# (see app.crud.crud_task_stats). One row per (dimension, key), e.g. ("status", "open")
+# or ("priority", "2"), so reading a team's stats does not depend on its number of tasks.
+team_task_counters_table = Table(
+    "team_task_counters",
+    Base.metadata,
+    Column("team_id", UUID(as_uuid=True), ForeignKey("teams.id"), primary_key=True),
+    Column("dimension", String(length=16), primary_key=True),
+    Column("key", String(length=64), primary_key=True),
+    Column("count", Integer, nullable=False),
 )
 
 if TYPE_CHECKING:
@@ -26,12 +40,24 @@ class Team(Base):
 
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
+    # Bumped by every write to the team's tasks; versions the task list for ETags
+    tasks_version: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default=text("0"))
+    # Loaded with the team by a correlated count on the team_members primary key
+    member_count: Mapped[int] = column_property(
+        select(func.count())
+        .where(team_members_table.c.team_id == id)
+        .correlate_except(team_members_table)
+        .scalar_subquery()
+    )
 
     # Relationships
+    # Not part of the team's representation: members are listed page by page through
+    # GET /teams/{id}/members. Only touch it inside run_sync (lazy loads cannot run
+    # once an async response is rendered).
     members: Mapped[List["User"]] = relationship(
         "User",
         secondary=team_members_table,
-        back_populates="teams"
+        back_populates="teams",
     )
     tasks: Mapped[List["Task"]] = relationship(
         "Task",
@@ -1,9 +1,19 @@
-from .team import Team, TeamCreate, TeamUpdate
-from .task import Task, TaskCreate, TaskUpdate
+from .metrics import CacheMetrics, Metrics, PoolMetrics
+from .team import Team, TeamCreate, TeamPage, TeamTaskStats, TeamUpdate, TeamWithMembers, TeamWithMembersPage
+from .task import (
+    Task, TaskBulkChanges, TaskBulkCreate, TaskBulkCreateItem, TaskBulkError, TaskBulkFilter, TaskBulkResult, TaskBulkSelection, TaskBulkUpdate,
+    TaskChange, TaskChangeFeed, TaskCreate, TaskImportError, TaskImportResult, TaskImportRow, TaskSearchPage, TaskSearchResult, TaskUpdate,
+)
 from .token import Token, TokenData
-from .user import User, UserCreate, UserUpdate
+from .user import User, UserCreate, UserPage, UserUpdate
 
 # Update forward refs
 User.model_rebuild()
 Task.model_rebuild()
+TaskSearchResult.model_rebuild()
+TaskChange.model_rebuild()
+TaskChangeFeed.model_rebuild()
 Team.model_rebuild()
+TeamWithMembers.model_rebuild()
+TeamPage.model_rebuild()
+TeamWithMembersPage.model_rebuild()
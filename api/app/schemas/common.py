@@ -1,14 +1,28 @@
 # api/app/schemas/common.py
-from typing import List, Generic, TypeVar
+from enum import Enum
+from typing import List, Generic, Optional, TypeVar
 from pydantic import BaseModel, Field
 
+class TotalMode(str, Enum):
+    """ How a paginated endpoint computes `total_items` """
+    EXACT = "exact"  # Counted exactly, in the same statement as the page
+    ESTIMATED = "estimated"  # Planner estimate on PostgreSQL, no scan
+    NONE = "none"  # Not computed
+
+class ExportFormat(str, Enum):
+    """ Output formats of streaming exports """
+    NDJSON = "ndjson"
+    CSV = "csv"
+
 # Generic TypeVar for the items in the page
 DataType = TypeVar('DataType')
 
 class Page(BaseModel, Generic[DataType]):
     """ Generic pagination schema """
     items: List[DataType]
-    total_items: int = Field(..., description="Total number of items available")
-    page_number: int = Field(..., description="Current page number (1-based)")
+    total_items: Optional[int] = Field(None, description="Total number of items available. Null when the total was not requested")
+    page_number: Optional[int] = Field(None, description="Current page number (1-based). Not set when paging with a cursor")
     page_size: int = Field(..., description="Number of items per page")
-    total_pages: int = Field(..., description="Total number of pages")
+    total_pages: Optional[int] = Field(None, description="Total number of pages. Null when the total was not requested")
+    total_is_estimate: bool = Field(False, description="True when `total_items` is the query planner's estimate")
+    next_cursor: Optional[str] = Field(None, description="Opaque cursor for the next page, null when there are no more items")
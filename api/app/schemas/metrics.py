@@ -0,0 +1,30 @@
+from typing import Dict, Optional
+
+from pydantic import BaseModel, Field
+
+
+class PoolMetrics(BaseModel):
+    """State of the database connection pool of this worker process."""
+    pool_class: str
+    size: Optional[int] = Field(None, description="Configured pool size. Null when pooling is left to PgBouncer")
+    checked_in: Optional[int] = Field(None, description="Idle connections in the pool")
+    checked_out: Optional[int] = Field(None, description="Connections currently in use")
+    overflow: Optional[int] = Field(None, description="Connections open beyond the pool size")
+    max_overflow: Optional[int] = None
+    checkouts: int = Field(..., description="Checkouts since start")
+    timeouts: int = Field(..., description="Checkouts that gave up after DB_POOL_TIMEOUT_SECONDS")
+    wait_seconds_total: float
+    wait_seconds_max: float
+    wait_seconds_avg: float
+
+
+class CacheMetrics(BaseModel):
+    hits: int
+    misses: int
+    size: int
+    maxsize: int
+
+
+class Metrics(BaseModel):
+    db_pool: PoolMetrics
+    caches: Dict[str, CacheMetrics]
@@ -2,12 +2,17 @@ from __future__ import annotations
 
 import uuid
 from datetime import date, datetime
-from typing import Optional, List
+from typing import Annotated, Optional, List
 
-from pydantic import BaseModel, Field, ConfigDict, computed_field
+from pydantic import BaseModel, Field, ConfigDict, computed_field, field_validator, model_validator
 from .common import Page
 from .user import User as UserSchema
 
+# Range of the INTEGER (int4) columns: larger values would fail in the database
+INT4_MIN = -2**31
+INT4_MAX = 2**31 - 1
+Priority = Annotated[int, Field(ge=INT4_MIN, le=INT4_MAX)]
+
 # Shared properties
 class TaskBase(BaseModel):
     title: Optional[str] = None
@@ -15,7 +20,7 @@ class TaskBase(BaseModel):
     description: Optional[str] = None
     due_date: Optional[date] = None
     completed: Optional[bool] = False
-    priority: Optional[int] = None
+    priority: Optional[Priority] = None
     # Add team_id - needed when creating a task within a team context
     team_id: Optional[uuid.UUID] = None # Make it optional here, but required in Create
 
@@ -29,6 +34,84 @@ class TaskCreate(TaskBase):
 class TaskUpdate(TaskBase):
     pass
 
+# Upper bound on the number of tasks in one bulk request
+MAX_BULK_TASKS = 1000
+
+class TaskBulkCreateItem(TaskCreate):
+    """ Task of a bulk creation, inserted as given: values must fit the columns """
+    title: str = Field(..., max_length=255)
+
+    @field_validator("completed")
+    @classmethod
+    def default_completed(cls, value: Optional[bool]) -> bool:
+        # Like a single creation, a null completed means not completed
+        return False if value is None else value
+
+class TaskBulkCreate(BaseModel):
+    items: List[TaskBulkCreateItem] = Field(..., min_length=1, max_length=MAX_BULK_TASKS)
+
+class TaskBulkError(BaseModel):
+    index: int = Field(..., description="Position of the invalid item in the request")
+    detail: str
+
+class TaskBulkFilter(BaseModel):
+    team_id: uuid.UUID
+    assignee_id: Optional[uuid.UUID] = None
+    completed: Optional[bool] = None
+
+class TaskBulkSelection(BaseModel):
+    """ Tasks targeted by a bulk operation: either a list of ids or a filter within one team """
+    ids: Optional[List[uuid.UUID]] = Field(None, min_length=1, max_length=MAX_BULK_TASKS)
+    filter: Optional[TaskBulkFilter] = None
+
+    @model_validator(mode="after")
+    def check_one_selector(self) -> "TaskBulkSelection":
+        if (self.ids is None) == (self.filter is None):
+            raise ValueError("Provide either ids or filter")
+        return self
+
+class TaskBulkChanges(TaskUpdate):
+    """ Change set of a bulk update; columns that cannot be NULL cannot be cleared """
+
+    @model_validator(mode="after")
+    def check_not_null(self) -> "TaskBulkChanges":
+        for field in ("title", "due_date", "completed"):
+            if field in self.model_fields_set and getattr(self, field) is None:
+                raise ValueError(f"{field} cannot be null")
+        return self
+
+class TaskBulkUpdate(TaskBulkSelection):
+    changes: TaskBulkChanges
+
+class TaskBulkResult(BaseModel):
+    affected_ids: List[uuid.UUID] = Field(..., description="IDs of the tasks that were changed")
+
+# One data row of a CSV task import; empty cells are treated as missing
+class TaskImportRow(BaseModel):
+    title: str = Field(..., min_length=1, max_length=255)
+    description: Optional[str] = None
+    due_date: date
+    completed: bool = False
+    priority: Optional[Priority] = None
+    assignee_id: Optional[uuid.UUID] = None
+
+    @field_validator("title", "description")
+    @classmethod
+    def check_no_nul(cls, value: Optional[str]) -> Optional[str]:
+        # PostgreSQL text cannot hold NUL characters
+        if value is not None and "\x00" in value:
+            raise ValueError("must not contain NUL characters")
+        return value
+
+class TaskImportError(BaseModel):
+    line: int = Field(..., description="Line number in the CSV file (the header is line 1)")
+    detail: str
+
+class TaskImportResult(BaseModel):
+    imported: int = Field(..., description="Number of tasks created")
+    error_count: int = Field(..., description="Number of invalid rows")
+    errors: List[TaskImportError] = Field(..., description="Errors of the first invalid rows")
+
 class TaskInDBBase(TaskBase):
     id: uuid.UUID
     team_id: uuid.UUID
@@ -65,3 +148,21 @@ class TaskInDB(TaskInDBBase):
 
 class TaskPage(Page[Task]):
     pass
+
+class TaskSearchResult(BaseModel):
+    task: Task
+    rank: float = Field(..., description="Relevance of the match, higher is better")
+    snippet: str = Field(..., description="Title and description excerpts, HTML-escaped, with matches wrapped in <mark></mark>")
+
+class TaskSearchPage(Page[TaskSearchResult]):
+    pass
+
+class TaskChange(BaseModel):
+    id: uuid.UUID
+    deleted: bool = Field(..., description="Tombstone: the task was deleted and `task` is null")
+    task: Optional[Task] = None
+
+class TaskChangeFeed(BaseModel):
+    changes: List[TaskChange] = Field(..., description="Tasks created, updated or deleted after the token, in change order")
+    next_token: str = Field(..., description="Pass as `since` to get the changes that follow")
+    has_more: bool = Field(..., description="Whether more changes can be fetched right away with `next_token`")
@@ -2,9 +2,10 @@ from __future__ import annotations
 
 import uuid
 from datetime import datetime
-from typing import Optional, List
+from typing import Dict, Optional, List
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+from app.schemas.common import Page
 from app.schemas.user import User as UserSchema
 
 # Shared properties
@@ -30,13 +31,34 @@ class TeamInDBBase(TeamBase):
         from_attributes = True
 
 
-# Additional properties to return to client
+# Additional properties to return to client. Members are listed with GET /teams/{id}/members
 class Team(TeamInDBBase):
-    members: List[UserSchema] = []
+    member_count: int = Field(..., description="Number of members of the team")
+
+# Team listings with `include_members`: only the first members, by id
+class TeamWithMembers(Team):
+    members: List[UserSchema] = Field(..., description="First members of the team, ordered by id")
 
     class Config:
         orm_mode = True
 
+class TeamPage(Page[Team]):
+    pass
+
+class TeamWithMembersPage(Page[TeamWithMembers]):
+    pass
+
+
+# Task statistics of a team, read from counters maintained by every task write
+class TeamTaskStats(BaseModel):
+    team_id: uuid.UUID
+    total: int = Field(..., description="Live (not deleted) tasks")
+    open: int = Field(..., description="Tasks not completed")
+    completed: int
+    overdue: int = Field(..., description="Open tasks due before today")
+    by_priority: Dict[str, int] = Field(..., description="Open tasks per priority, 'none' for tasks without one")
+    by_assignee: Dict[str, int] = Field(..., description="Open tasks per assignee id, 'none' for unassigned tasks")
+
 
 # Additional properties stored in DB
 class TeamInDB(TeamInDBBase):
@@ -4,6 +4,7 @@ from datetime import datetime
 from typing import Optional
 
 from pydantic import BaseModel, EmailStr
+from .common import Page
 
 # Shared properties
 class UserBase(BaseModel):
@@ -37,3 +38,6 @@ class User(UserInDBBase):
 # Additional properties stored in DB
 class UserInDB(UserInDBBase):
     hashed_password: str
+
+class UserPage(Page[User]):
+    pass
@@ -0,0 +1,32 @@
+import hashlib
+from typing import Any, Optional
+
+
+def make_etag(*parts: Any) -> str:
+    """
+    Builds a strong ETag from the values a representation is derived from
+    (ids, updated_at timestamps, versions). Equal parts give equal ETags.
+    """
+    digest = hashlib.blake2b("|".join(str(part) for part in parts).encode(), digest_size=12).hexdigest()
+    return f'"{digest}"'
+
+
+def etag_matches(header: Optional[str], etag: str, *, weak: bool = True) -> bool:
+    """
+    Checks an If-None-Match (weak comparison) or If-Match (`weak=False`, strong
+    comparison) header against the current ETag of a resource.
+    """
+    if header is None:
+        return False
+    header = header.strip()
+    if header == "*":
+        return True
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            if not weak:
+                continue  # A weak ETag never matches strongly
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
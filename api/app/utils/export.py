@@ -0,0 +1,55 @@
+import csv
+import io
+import json
+import uuid
+from datetime import date, datetime
+from typing import Any, AsyncIterator, Iterable, Sequence
+
+from sqlalchemy.ext.asyncio import AsyncResult
+
+from app.schemas.common import ExportFormat
+
+MEDIA_TYPES = {
+    ExportFormat.NDJSON: "application/x-ndjson",
+    ExportFormat.CSV: "text/csv",
+}
+
+
+def export_value(value: Any) -> Any:
+    """Converts a column value to its JSON/CSV representation (ISO dates, string UUIDs)."""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    return value
+
+
+def ndjson_chunk(keys: Sequence[str], rows: Iterable[Sequence[Any]]) -> str:
+    """Encodes rows as newline-delimited JSON objects."""
+    return "".join(
+        json.dumps({key: export_value(value) for key, value in zip(keys, row)}, separators=(",", ":")) + "\n"
+        for row in rows
+    )
+
+
+def csv_chunk(rows: Iterable[Sequence[Any]]) -> str:
+    """Encodes rows as CSV lines. None becomes an empty field."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerows([export_value(value) for value in row] for row in rows)
+    return buffer.getvalue()
+
+
+async def stream_export(result: AsyncResult, export_format: ExportFormat) -> AsyncIterator[str]:
+    """
+    Encodes a streamed result chunk by chunk. Only one partition (the result's
+    `yield_per` size) is held in memory at a time, however many rows there are.
+    """
+    keys = list(result.keys())
+    if export_format is ExportFormat.CSV:
+        yield csv_chunk([keys])
+    async for partition in result.partitions():
+        if export_format is ExportFormat.CSV:
+            yield csv_chunk(partition)
+        else:
+            yield ndjson_chunk(keys, partition)
@@ -1,23 +1,34 @@
+import base64
+import binascii
+import json
 import math
-from typing import List, TypeVar
+import uuid
+from datetime import date, datetime
+from typing import Any, Callable, List, Optional, TypeVar
 
 from app.schemas.common import Page
 DataType = TypeVar('DataType')
 
 def create_page(
     items: List[DataType],
-    total_items: int,
+    total_items: Optional[int],
     skip: int,
     limit: int,
+    next_cursor: Optional[str] = None,
+    total_is_estimate: bool = False,
 ) -> Page[DataType]:
     """
     Creates a Page response object with pagination metadata.
 
     Args:
         items: The list of items for the current page.
-        total_items: The total number of items available across all pages.
+        total_items: The total number of items available across all pages,
+            or None when the total was not computed.
         skip: The number of items skipped (offset).
         limit: The maximum number of items per page.
+        next_cursor: Optional keyset cursor pointing after the last item, so a
+            client can switch from offset to cursor paging.
+        total_is_estimate: Whether `total_items` is an estimate.
 
     Returns:
         A Page object containing the items and pagination metadata.
@@ -26,12 +37,12 @@ def create_page(
     effective_limit = limit
     if effective_limit <= 0:
         # If limit is non-positive, return all items on page 1
-        effective_limit = max(total_items, 1) # Ensure limit is at least 1
+        effective_limit = max(total_items or len(items), 1) # Ensure limit is at least 1
         page_number = 1
         total_pages = 1
     else:
         page_number = (skip // effective_limit) + 1
-        total_pages = math.ceil(total_items / effective_limit)
+        total_pages = math.ceil(total_items / effective_limit) if total_items is not None else None
 
     return Page(
         items=items,
@@ -39,4 +50,87 @@ def create_page(
         page_number=page_number,
         page_size=effective_limit, # Report the effective limit used
         total_pages=total_pages,
+        total_is_estimate=total_is_estimate and total_items is not None,
+        next_cursor=next_cursor,
     )
+
+
+def create_cursor_page(
+    items: List[DataType],
+    total_items: Optional[int],
+    limit: int,
+    cursor_for: Callable[[DataType], str],
+    total_is_estimate: bool = False,
+) -> Page[DataType]:
+    """
+    Creates a Page response object for keyset (cursor) pagination.
+
+    Args:
+        items: The items fetched for this page. CRUD functions fetch one row more
+            than `limit` so that the presence of a next page is known without
+            another query; the extra row is trimmed here.
+        total_items: The total number of items matching the filters, or None
+            when the total was not computed.
+        limit: The maximum number of items per page.
+        cursor_for: Callable building the cursor string for an item.
+        total_is_estimate: Whether `total_items` is an estimate.
+
+    Returns:
+        A Page object whose `next_cursor` is set when more items follow.
+    """
+    has_more = len(items) > limit
+    items = items[:limit]
+    next_cursor = cursor_for(items[-1]) if has_more and items else None
+
+    return Page(
+        items=items,
+        total_items=total_items,
+        page_number=None, # Page numbers are meaningless when paging by key
+        page_size=limit,
+        total_pages=(math.ceil(total_items / limit) if limit > 0 else 1) if total_items is not None else None,
+        total_is_estimate=total_is_estimate and total_items is not None,
+        next_cursor=next_cursor,
+    )
+
+
+def encode_cursor(*values: Any) -> str:
+    """
+    Encodes the sort key values of a row into an opaque, URL-safe cursor.
+    Datetimes and dates are stored in ISO format, UUIDs as strings.
+    """
+    payload = [
+        v.isoformat() if isinstance(v, (datetime, date)) else (str(v) if isinstance(v, uuid.UUID) else v)
+        for v in values
+    ]
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, *types: type) -> List[Any]:
+    """
+    Decodes a cursor created by `encode_cursor`, converting each value to the
+    matching type in `types`. None values are passed through unchanged.
+    Raises ValueError if the cursor is malformed.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+    except (binascii.Error, UnicodeDecodeError, json.JSONDecodeError) as e:
+        raise ValueError("Malformed cursor") from e
+    if not isinstance(payload, list) or len(payload) != len(types):
+        raise ValueError("Malformed cursor")
+
+    values = []
+    try:
+        for value, type_ in zip(payload, types):
+            if value is None:
+                values.append(None)
+            elif type_ is datetime:
+                values.append(datetime.fromisoformat(value))
+            elif type_ is date:
+                values.append(date.fromisoformat(value))
+            else:
+                values.append(type_(value))
+    except (TypeError, ValueError) as e:
+        raise ValueError("Malformed cursor") from e
+    return values
@@ -1,9 +1,21 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.api.v1.endpoints import users, tasks, teams, login
+from app.api.v1.endpoints import users, tasks, teams, login, metrics
+from app.core import events
 from app.core.config import settings
 
-app = FastAPI(title=settings.PROJECT_NAME)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Forwards the task events of every worker to this worker's WebSocket subscribers
+    listener = events.start_listener()
+    yield
+    await events.stop_listener(listener)
+
+
+app = FastAPI(title=settings.PROJECT_NAME, lifespan=lifespan)
 
 # Set up CORS
 origins = ["*"]  # Allow access from any URL
@@ -14,6 +26,8 @@ app.add_middleware(
     allow_credentials=True,  # Allow cookies/auth headers
     allow_methods=["*"],      # Allow all methods (GET, POST, etc.)
     allow_headers=["*"],      # Allow all headers
+    # Let browser clients read conditional request validators and pagination links
+    expose_headers=["ETag", "Link"],
 )
 
 # Include routers from V1 endpoints
@@ -22,3 +36,4 @@ app.include_router(login.router, prefix=f"{api_prefix}", tags=["login"])
 app.include_router(users.router, prefix=f"{api_prefix}/users", tags=["users"])
 app.include_router(tasks.router, prefix=f"{api_prefix}/tasks", tags=["tasks"])
 app.include_router(teams.router, prefix=f"{api_prefix}/teams", tags=["teams"])
+app.include_router(metrics.router, prefix=f"{api_prefix}/metrics", tags=["metrics"])
@@ -0,0 +1,27 @@
+from fastapi.testclient import TestClient
+
+from app import models
+
+# --- Test Metrics ---
+
+def test_read_metrics(client: TestClient, auth_headers: dict, test_team: models.team.Team):
+    """Test that pool and cache metrics are reported."""
+    client.get("/api/v1/teams/", headers=auth_headers)
+    response = client.get("/api/v1/metrics/", headers=auth_headers)
+    assert response.status_code == 200
+    data = response.json()
+    assert data["db_pool"]["pool_class"] == "MeasuredAsyncQueuePool"
+    assert data["db_pool"]["size"] == 5
+    for key in ("checked_out", "overflow", "checkouts", "timeouts", "wait_seconds_avg", "wait_seconds_max"):
+        assert key in data["db_pool"]
+    assert set(data["caches"]) == {"membership", "principal", "team_directory"}
+    assert data["caches"]["principal"]["misses"] >= 1
+
+
+def test_read_metrics_unauthenticated(client: TestClient):
+    """Test that metrics are not exposed to anonymous clients."""
+    response = client.get("/api/v1/metrics/")
+    assert response.status_code == 401
+
+
+print("test_metrics.py loaded")
@@ -1,11 +1,19 @@
+import csv
+import io
+import json
+
 import pytest
+from fastapi import WebSocketDisconnect
 from fastapi.testclient import TestClient
+from sqlalchemy import event
 from sqlalchemy.orm import Session
-from datetime import date, timedelta
+from datetime import date, datetime, timedelta
 import uuid
 
 from app import models, schemas
+from app.core import events
 from app.crud import crud_user, crud_team, crud_task
+from app.utils.pagination import encode_cursor
 
 # --- Test Create Task --- 
 
@@ -69,6 +77,173 @@ def test_create_task_invalid_team(client: TestClient, auth_headers: dict):
     response = client.post("/api/v1/tasks/", headers=auth_headers, json=task_data)
     assert response.status_code == 404 # Not Found
 
+# --- Test Bulk Create Tasks ---
+
+def test_create_tasks_bulk_success(client: TestClient, db: Session, auth_headers: dict, test_team: models.team.Team, test_user: models.user.User, test_user_b: models.user.User):
+    """Test creating many tasks in one request, validated and inserted set-wise."""
+    crud_team.add_user_to_team(db, db_team=test_team, db_user=test_user_b)
+    items = [
+        {"title": f"Bulk Task {i}", "due_date": date.today().isoformat(), "team_id": str(test_team.id),
+         "assignee_id": str(test_user_b.id) if i % 2 else None}
+        for i in range(50)
+    ]
+    engine = db.get_bind()
+    statements = []
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        response = client.post("/api/v1/tasks/bulk", headers=auth_headers, json={"items": items})
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+    assert response.status_code == 201, response.text
+    data = response.json()
+    assert [t["title"] for t in data] == [f"Bulk Task {i}" for i in range(50)]
+    assert data[1]["assignee"]["id"] == str(test_user_b.id)
+    assert data[0]["assignee"] is None
+    assert all(t["creator_id"] == str(test_user.id) for t in data)
+    # A single INSERT for the whole batch, plus one upsert of the team counters
+    assert len([s for s in statements if s.lstrip().upper().startswith("INSERT INTO TASKS")]) == 1
+    assert len([s for s in statements if s.lstrip().upper().startswith("INSERT INTO TEAM_TASK_COUNTERS")]) == 1
+
+    _, total = crud_task.get_tasks_by_team(db, team_id=test_team.id)
+    assert total == 50
+
+def test_create_tasks_bulk_reports_item_errors(client: TestClient, db: Session, auth_headers: dict, test_team: models.team.Team, test_user_b: models.user.User):
+    """Test that invalid items are reported by position and nothing is created."""
+    other_team = crud_team.create_team_with_creator(db, team_in=schemas.TeamCreate(name="Bulk Other Team"), creator=test_user_b)
+    today = date.today().isoformat()
+    missing_team_id = uuid.uuid4()
+    missing_user_id = uuid.uuid4()
+    items = [
+        {"title": "Valid", "due_date": today, "team_id": str(test_team.id)},
+        {"title": "No Team", "due_date": today, "team_id": str(missing_team_id)},
+        {"title": "Not Member", "due_date": today, "team_id": str(other_team.id)},
+        {"title": "No Assignee", "due_date": today, "team_id": str(test_team.id), "assignee_id": str(missing_user_id)},
+        {"title": "Outsider", "due_date": today, "team_id": str(test_team.id), "assignee_id": str(test_user_b.id)},
+    ]
+    response = client.post("/api/v1/tasks/bulk", headers=auth_headers, json={"items": items})
+    assert response.status_code == 400
+    assert response.json()["detail"] == [
+        {"index": 1, "detail": f"Team with id {missing_team_id} not found."},
+        {"index": 2, "detail": "Not authorized to create tasks for this team"},
+        {"index": 3, "detail": f"Assignee user with id {missing_user_id} not found."},
+        {"index": 4, "detail": f"Assignee user {test_user_b.id} is not a member of team {test_team.id}"},
+    ]
+    _, total = crud_task.get_tasks_by_team(db, team_id=test_team.id)
+    assert total == 0
+
+def test_create_tasks_bulk_limits(client: TestClient, auth_headers: dict, test_team: models.team.Team):
+    """Test that empty and oversized batches are rejected."""
+    response = client.post("/api/v1/tasks/bulk", headers=auth_headers, json={"items": []})
+    assert response.status_code == 422
+    item = {"title": "Too Many", "due_date": date.today().isoformat(), "team_id": str(test_team.id)}
+    response = client.post("/api/v1/tasks/bulk", headers=auth_headers, json={"items": [item] * (schemas.task.MAX_BULK_TASKS + 1)})
+    assert response.status_code == 422
+
+def test_create_tasks_bulk_column_values(client: TestClient, db: Session, auth_headers: dict, test_team: models.team.Team):
+    """Test that a null completed is created as not completed and a title too long for its column is rejected."""
+    today = date.today().isoformat()
+    response = client.post("/api/v1/tasks/bulk", headers=auth_headers, json={"items": [
+        {"title": "Null Completed", "due_date": today, "team_id": str(test_team.id), "completed": None},
+    ]})
+    assert response.status_code == 201, response.text
+    assert response.json()[0]["completed"] is False
+
+    response = client.post("/api/v1/tasks/bulk", headers=auth_headers, json={"items": [
+        {"title": "Fits", "due_date": today, "team_id": str(test_team.id)},
+        {"title": "x" * 256, "due_date": today, "team_id": str(test_team.id)},
+    ]})
+    assert response.status_code == 422
+    _, total = crud_task.get_tasks_by_team(db, team_id=test_team.id)
+    assert total == 1
+
+# --- Test Import Tasks ---
+
+def upload_csv(client: TestClient, headers: dict, team_id, content: str, **params):
+    query = "&".join(f"{key}={value}" for key, value in {"team_id": team_id, **params}.items())
+    return client.post(f"/api/v1/tasks/import?{query}", headers=headers, files={"file": ("tasks.csv", content.encode(), "text/csv")})
+
+def test_import_tasks_success(client: TestClient, db: Session, auth_headers: dict, test_team: models.team.Team, test_user: models.user.User):
+    """Test importing a CSV file into a team, preserving the row order."""
+    content = "title,due_date,description,completed,priority,assignee_id\n" + "".join(
+        f"Imported {i},2030-01-{i % 28 + 1:02d},Line {i + 2},{'true' if i % 2 else ''},{i % 3 or ''},{test_user.id if i % 5 == 0 else ''}\n"
+        for i in range(30)
+    )
+    response = upload_csv(client, auth_headers, test_team.id, content)
+    assert response.status_code == 201, response.text
+    assert response.json() == {"imported": 30, "error_count": 0, "errors": []}
+
+    items = crud_task.get_tasks_export_query(team_id=test_team.id)
+    rows = db.execute(items).all()
+    assert len(rows) == 30
+    by_title = {row.title: row for row in rows}
+    assert by_title["Imported 5"].completed is True and by_title["Imported 5"].assignee_id == test_user.id
+    assert by_title["Imported 2"].description == "Line 4" and by_title["Imported 2"].priority == 2
+    assert by_title["Imported 3"].priority is None and by_title["Imported 3"].assignee_id is None
+    assert all(row.creator_id == test_user.id for row in rows)
+    # Listed in file order, which created_at keeps
+    listed, _ = crud_task.get_tasks_by_team(db, team_id=test_team.id, limit=30)
+    assert [task.title for task in listed] == [f"Imported {i}" for i in range(30)]
+
+def test_import_tasks_invalid_rows(client: TestClient, db: Session, auth_headers: dict, test_team: models.team.Team, test_user_b: models.user.User):
+    """Test that invalid rows are reported by line and abort the import unless skipped."""
+    content = (
+        "title,due_date,assignee_id,priority\n"
+        "Good,2030-01-01,,\n"
+        ",2030-01-01,,\n"
+        "Bad Date,someday,,\n"
+        f"Outsider,2030-01-01,{test_user_b.id},\n"
+        "Huge Priority,2030-01-01,,2147483648\n"
+        "Also Good,2030-01-02,,2147483647\n"
+    )
+    response = upload_csv(client, auth_headers, test_team.id, content)
+    assert response.status_code == 400
+    detail = response.json()["detail"]
+    assert detail["imported"] == 0 and detail["error_count"] == 4
+    assert [error["line"] for error in detail["errors"]] == [3, 4, 5, 6]
+    assert detail["errors"][0]["detail"].startswith("title:")
+    assert detail["errors"][2]["detail"] == f"Assignee user {test_user_b.id} is not a member of team {test_team.id}"
+    # Out of the INTEGER column's range: rejected by line rather than failing the whole load
+    assert detail["errors"][3]["detail"].startswith("priority:")
+    assert crud_task.get_tasks_by_team(db, team_id=test_team.id)[1] == 0
+
+    response = upload_csv(client, auth_headers, test_team.id, content, skip_invalid="true")
+    assert response.status_code == 201
+    assert response.json()["imported"] == 2 and response.json()["error_count"] == 4
+    assert crud_task.get_tasks_by_team(db, team_id=test_team.id)[1] == 2
+
+def test_import_tasks_malformed_rows(client: TestClient, db: Session, auth_headers: dict, test_team: models.team.Team):
+    """Test that NUL characters and extra fields are reported by line instead of failing the load."""
+    content = (
+        "title,due_date,description\n"
+        "Nul\x00Title,2030-01-01,\n"
+        "Nul Description,2030-01-01,a\x00b\n"
+        "Extra Field,2030-01-01,,surplus\n"
+        "Good,2030-01-01,\n"
+    )
+    response = upload_csv(client, auth_headers, test_team.id, content, skip_invalid="true")
+    assert response.status_code == 201, response.text
+    data = response.json()
+    assert data["imported"] == 1 and data["error_count"] == 3
+    assert [error["line"] for error in data["errors"]] == [2, 3, 4]
+    assert data["errors"][0]["detail"].startswith("title:")
+    assert data["errors"][1]["detail"].startswith("description:")
+    assert data["errors"][2]["detail"] == "Row has more fields than the header"
+    assert [task.title for task in crud_task.get_tasks_by_team(db, team_id=test_team.id)[0]] == ["Good"]
+
+def test_import_tasks_rejected(client: TestClient, db: Session, auth_headers: dict, test_team: models.team.Team, test_user_b: models.user.User):
+    """Test imports with a bad header or into a team the user is not part of."""
+    response = upload_csv(client, auth_headers, test_team.id, "title\nNo Due Date\n")
+    assert response.status_code == 400
+    assert "due_date" in response.json()["detail"]
+    response = upload_csv(client, auth_headers, test_team.id, "title,due_date,team_id\nX,2030-01-01,abc\n")
+    assert response.status_code == 400
+
+    other_team = crud_team.create_team_with_creator(db, team_in=schemas.TeamCreate(name="Import Other Team"), creator=test_user_b)
+    response = upload_csv(client, auth_headers, other_team.id, "title,due_date\nX,2030-01-01\n")
+    assert response.status_code == 403
+
 # --- Test Read Tasks --- 
 
 def test_read_tasks_success(client: TestClient, db: Session, auth_headers: dict, test_team: models.team.Team, test_task: models.task.Task, test_user: models.user.User):
@@ -111,6 +286,71 @@ def test_read_tasks_pagination(client: TestClient, db: Session, auth_headers: di
     # Check if item IDs differ between pages (simple check)
     assert data1["items"][0]["id"] != data2["items"][0]["id"]
 
+def test_read_tasks_cursor_pagination(client: TestClient, db: Session, auth_headers: dict, test_team: models.team.Team, test_user: models.user.User):
+    """Test walking a team's tasks with keyset cursors."""
+    created_ids = set()
+    base_time = datetime(2025, 1, 1, 12, 0, 0)
+    for i in range(5):
+        task = crud_task.create_task(db, task_in=schemas.TaskCreate(title=f"Cursor Task {i}", team_id=test_team.id, due_date=date.today()), creator_id=test_user.id)
+        # Two tasks share a timestamp so the id tie-breaker is exercised
+        task.created_at = base_time + timedelta(minutes=i // 2)
+        created_ids.add(str(task.id))
+    db.commit()
+
+    # First page uses offset mode and hands out a cursor
+    response = client.get(f"/api/v1/tasks/?team_id={test_team.id}&limit=2", headers=auth_headers)
+    assert response.status_code == 200
+    data = response.json()
+    seen = [t["id"] for t in data["items"]]
+    assert data["next_cursor"] is not None
+
+    while data["next_cursor"]:
+        response = client.get(f"/api/v1/tasks/?team_id={test_team.id}&limit=2&cursor={data['next_cursor']}", headers=auth_headers)
+        assert response.status_code == 200
+        data = response.json()
+        assert data["page_number"] is None
+        assert data["total_items"] == 5
+        seen.extend(t["id"] for t in data["items"])
+
+    assert len(seen) == len(set(seen)) == 5
+    assert set(seen) == created_ids
+
+def test_read_tasks_total_modes(client: TestClient, db: Session, auth_headers: dict, test_team: models.team.Team, test_user: models.user.User):
+    """Test the exact, estimated and omitted totals of a task page."""
+    for i in range(5):
+        crud_task.create_task(db, task_in=schemas.TaskCreate(title=f"Total Task {i}", team_id=test_team.id, due_date=date.today()), creator_id=test_user.id)
+    url = f"/api/v1/tasks/?team_id={test_team.id}&limit=2"
+
+    # Exact total, also past the last page where no row carries the count
+    data = client.get(url, headers=auth_headers).json()
+    assert data["total_items"] == 5 and data["total_pages"] == 3
+    assert data["total_is_estimate"] is False
+    data = client.get(f"{url}&skip=10", headers=auth_headers).json()
+    assert data["items"] == [] and data["total_items"] == 5 and data["next_cursor"] is None
+
+    # Without a total, paging still works thanks to the lookahead row
+    data = client.get(f"{url}&include_total=false", headers=auth_headers).json()
+    assert data["total_items"] is None and data["total_pages"] is None
+    assert len(data["items"]) == 2 and data["next_cursor"] is not None
+    data = client.get(f"{url}&total=none&skip=4", headers=auth_headers).json()
+    assert len(data["items"]) == 1 and data["next_cursor"] is None
+
+    # SQLite has no planner estimate, so the estimate is the exact count
+    data = client.get(f"{url}&total=estimated", headers=auth_headers).json()
+    assert data["total_items"] == 5 and data["total_is_estimate"] is True
+
+    response = client.get(f"{url}&total=approximate", headers=auth_headers)
+    assert response.status_code == 422
+
+def test_read_tasks_invalid_cursor(client: TestClient, auth_headers: dict, test_team: models.team.Team):
+    """Test that a malformed cursor, or a cursor combined with skip, is rejected."""
+    response = client.get(f"/api/v1/tasks/?team_id={test_team.id}&cursor=not-a-cursor", headers=auth_headers)
+    assert response.status_code == 400
+
+    cursor = encode_cursor(datetime(2025, 1, 1), uuid.uuid4())
+    response = client.get(f"/api/v1/tasks/?team_id={test_team.id}&skip=2&cursor={cursor}", headers=auth_headers)
+    assert response.status_code == 400
+
 def test_read_tasks_filter_by_assignee(client: TestClient, db: Session, auth_headers: dict, test_team: models.team.Team, test_user: models.user.User):
     """Test filtering tasks by assignee."""
     # Create another user and assign a task to them
@@ -153,6 +393,82 @@ def test_read_tasks_filter_by_completed(client: TestClient, db: Session, auth_he
     assert any(t["id"] == str(task_pending.id) for t in data_false["items"]), "Pending task not found in completed=false filter"
     assert all(not t["completed"] for t in data_false["items"])
 
+def test_read_tasks_filter_by_due_date_and_priority(client: TestClient, db: Session, auth_headers: dict, test_team: models.team.Team, test_user: models.user.User):
+    """Test the due date range, priority and overdue filters."""
+    today = date.today()
+    specs = [("Late", -3, 1, False), ("Late Done", -2, 2, True), ("Today", 0, 1, False), ("Next Week", 7, None, False)]
+    tasks = {
+        title: crud_task.create_task(db, task_in=schemas.TaskCreate(title=title, team_id=test_team.id, due_date=today + timedelta(days=offset), priority=priority, completed=completed), creator_id=test_user.id)
+        for title, offset, priority, completed in specs
+    }
+    url = f"/api/v1/tasks/?team_id={test_team.id}"
+
+    def titles(query: str) -> set:
+        response = client.get(f"{url}&{query}", headers=auth_headers)
+        assert response.status_code == 200
+        return {t["title"] for t in response.json()["items"]}
+
+    # Both ends of the range are inclusive
+    assert titles(f"due_after={today - timedelta(days=2)}&due_before={today}") == {"Late Done", "Today"}
+    assert titles(f"due_after={today + timedelta(days=1)}") == {"Next Week"}
+    assert titles("priority=1") == {"Late", "Today"}
+    assert titles("overdue=true") == {"Late"}
+    assert titles("overdue=false") == {"Late Done", "Today", "Next Week"}
+    assert titles(f"overdue=true&due_after={today}") == set()
+    assert tasks["Late"].completed is False
+
+def test_read_tasks_sorted(client: TestClient, db: Session, auth_headers: dict, test_team: models.team.Team, test_user: models.user.User):
+    """Test multi-key sorting, with tasks without a priority last in both directions."""
+    today = date.today()
+    base_time = datetime(2025, 1, 1, 12, 0, 0)
+    specs = [("A", 1, 2), ("B", 0, None), ("C", 0, 3), ("D", 1, 5), ("E", 0, 3)]
+    for i, (title, offset, priority) in enumerate(specs):
+        task = crud_task.create_task(db, task_in=schemas.TaskCreate(title=title, team_id=test_team.id, due_date=today + timedelta(days=offset), priority=priority), creator_id=test_user.id)
+        task.created_at = base_time + timedelta(minutes=i)
+    db.commit()
+    url = f"/api/v1/tasks/?team_id={test_team.id}"
+
+    def titles(sort: str) -> list:
+        response = client.get(f"{url}&sort={sort}", headers=auth_headers)
+        assert response.status_code == 200
+        return [t["title"] for t in response.json()["items"]]
+
+    assert titles("due_date,-priority,created_at") == ["C", "E", "B", "D", "A"]
+    assert titles("priority,-created_at") == ["A", "E", "C", "D", "B"]
+    assert titles("-title") == ["E", "D", "C", "B", "A"]
+    assert titles("created_at") == ["A", "B", "C", "D", "E"]
+
+    for sort in ("due_date,-due_date", "assignee_id", "", "due_date,"):
+        response = client.get(f"{url}&sort={sort}", headers=auth_headers)
+        assert response.status_code == 400
+
+def test_read_tasks_sorted_cursor_pagination(client: TestClient, db: Session, auth_headers: dict, test_team: models.team.Team, test_user: models.user.User):
+    """Test that keyset cursors follow the requested sort, across NULL priorities and mixed directions."""
+    today = date.today()
+    base_time = datetime(2025, 1, 1, 12, 0, 0)
+    for i in range(9):
+        priority = None if i % 3 == 0 else i % 2
+        task = crud_task.create_task(db, task_in=schemas.TaskCreate(title=f"Sorted Task {i}", team_id=test_team.id, due_date=today + timedelta(days=i % 2), priority=priority), creator_id=test_user.id)
+        task.created_at = base_time + timedelta(minutes=i // 2)
+    db.commit()
+
+    for sort in ("due_date,-priority,created_at", "-priority", "priority,-due_date"):
+        url = f"/api/v1/tasks/?team_id={test_team.id}&sort={sort}"
+        expected = [t["id"] for t in client.get(url, headers=auth_headers).json()["items"]]
+        data = client.get(f"{url}&limit=2", headers=auth_headers).json()
+        seen = [t["id"] for t in data["items"]]
+        while data["next_cursor"]:
+            response = client.get(f"{url}&limit=2&cursor={data['next_cursor']}", headers=auth_headers)
+            assert response.status_code == 200
+            data = response.json()
+            seen.extend(t["id"] for t in data["items"])
+        assert seen == expected and len(seen) == 9
+
+    # A cursor only makes sense with the sort it was built for
+    cursor = encode_cursor(datetime(2025, 1, 1), uuid.uuid4())
+    response = client.get(f"/api/v1/tasks/?team_id={test_team.id}&sort=due_date&cursor={cursor}", headers=auth_headers)
+    assert response.status_code == 400
+
 def test_read_tasks_forbidden(client: TestClient, db: Session, auth_headers: dict):
     """Test reading tasks for a team the user is not a member of."""
     # Create a team owned by someone else
@@ -164,6 +480,277 @@ def test_read_tasks_forbidden(client: TestClient, db: Session, auth_headers: dic
     response = client.get(f"/api/v1/tasks/?team_id={other_team.id}", headers=auth_headers)
     assert response.status_code == 403 # Forbidden
 
+def test_read_tasks_serialization_matches_schema(client: TestClient, db: Session, auth_headers: dict, test_team: models.team.Team, test_user: models.user.User):
+    """Test that the unvalidated fast serialization gives the same JSON as validating against the schema."""
+    tasks = create_team_tasks(db, test_team, test_user, 2, assignee_id=test_user.id, priority=1)
+    tasks += create_team_tasks(db, test_team, test_user, 1, description="No assignee")
+    for i, task in enumerate(tasks):
+        task.created_at = datetime(2025, 1, 1, 12, i, 0)
+    db.commit()
+
+    response = client.get(f"/api/v1/tasks/?team_id={test_team.id}&limit=2", headers=auth_headers)
+    assert response.status_code == 200, response.text
+    assert response.headers["content-type"] == "application/json"
+    data = response.json()
+    assert data["total_items"] == 3 and data["total_pages"] == 2 and data["next_cursor"] is not None
+    response = client.get(f"/api/v1/tasks/?team_id={test_team.id}&cursor={data['next_cursor']}", headers=auth_headers)
+    assert response.status_code == 200, response.text
+    items = data["items"] + response.json()["items"]
+
+    expected = {str(t.id): schemas.Task.model_validate(t, from_attributes=True).model_dump(mode="json") for t in tasks}
+    assert {item["id"]: item for item in items} == expected
+
+# --- Test Search Tasks ---
+
+def test_search_tasks_ranked_with_snippets(client: TestClient, db: Session, auth_headers: dict, test_team: models.team.Team, test_user: models.user.User):
+    """Test that title matches rank above description matches and matches are highlighted."""
+    in_title = crud_task.create_task(db, task_in=schemas.TaskCreate(title="Fix invoice export", team_id=test_team.id, due_date=date.today()), creator_id=test_user.id)
+    in_description = crud_task.create_task(db, task_in=schemas.TaskCreate(title="Billing cleanup", description="The invoice totals are wrong", team_id=test_team.id, due_date=date.today()), creator_id=test_user.id)
+    crud_task.create_task(db, task_in=schemas.TaskCreate(title="Unrelated", team_id=test_team.id, due_date=date.today()), creator_id=test_user.id)
+    deleted = crud_task.create_task(db, task_in=schemas.TaskCreate(title="Old invoice", team_id=test_team.id, due_date=date.today()), creator_id=test_user.id)
+    crud_task.soft_delete_task(db, db_task=deleted)
+
+    response = client.get(f"/api/v1/tasks/search?team_id={test_team.id}&q=Invoice", headers=auth_headers)
+    assert response.status_code == 200, response.text
+    hits = response.json()["items"]
+    assert [hit["task"]["id"] for hit in hits] == [str(in_title.id), str(in_description.id)]
+    assert hits[0]["rank"] > hits[1]["rank"]
+    assert hits[0]["snippet"] == "Fix <mark>invoice</mark> export"
+    assert hits[1]["snippet"] == "Billing cleanup — The <mark>invoice</mark> totals are wrong"
+
+    # Every word must match
+    response = client.get(f"/api/v1/tasks/search?team_id={test_team.id}&q=invoice%20totals", headers=auth_headers)
+    assert [hit["task"]["id"] for hit in response.json()["items"]] == [str(in_description.id)]
+
+def test_search_tasks_snippets_escaped(client: TestClient, db: Session, auth_headers: dict, test_team: models.team.Team, test_user: models.user.User):
+    """Test that task text is HTML-escaped in snippets, and only the markers are markup."""
+    crud_task.create_task(db, task_in=schemas.TaskCreate(title="<script>alert('amp')</script> & co", team_id=test_team.id, due_date=date.today()), creator_id=test_user.id)
+    response = client.get(f"/api/v1/tasks/search?team_id={test_team.id}&q=amp", headers=auth_headers)
+    assert response.status_code == 200, response.text
+    assert response.json()["items"][0]["snippet"] == "&lt;script&gt;alert(&#x27;<mark>amp</mark>&#x27;)&lt;/script&gt; &amp; co"
+
+def test_search_tasks_cursor_pagination(client: TestClient, db: Session, auth_headers: dict, test_team: models.team.Team, test_user: models.user.User):
+    """Test walking equally ranked hits with keyset cursors."""
+    created = {str(t.id) for t in create_team_tasks(db, test_team, test_user, 5)}
+
+    seen = []
+    url = f"/api/v1/tasks/search?team_id={test_team.id}&q=edit&limit=2"
+    data = client.get(url, headers=auth_headers).json()
+    seen += [hit["task"]["id"] for hit in data["items"]]
+    while data["next_cursor"]:
+        data = client.get(f"{url}&cursor={data['next_cursor']}", headers=auth_headers).json()
+        seen += [hit["task"]["id"] for hit in data["items"]]
+    assert len(seen) == 5 and set(seen) == created
+
+def test_search_tasks_forbidden(client: TestClient, db: Session, auth_headers: dict, test_user_b: models.user.User):
+    """Test searching a team the user is not a member of."""
+    other_team = crud_team.create_team_with_creator(db, team_in=schemas.TeamCreate(name="Search Other Team"), creator=test_user_b)
+    response = client.get(f"/api/v1/tasks/search?team_id={other_team.id}&q=task", headers=auth_headers)
+    assert response.status_code == 403
+
+# --- Test My Tasks ---
+
+def test_read_my_tasks_across_teams(client: TestClient, db: Session, auth_headers: dict, test_team: models.team.Team, test_user: models.user.User, test_user_b: models.user.User):
+    """Test the current user's tasks from all their teams, by due date, excluding teams they left."""
+    today = date.today()
+    other_team = crud_team.create_team_with_creator(db, team_in=schemas.TeamCreate(name="Inbox Other Team"), creator=test_user_b)
+    crud_team.add_user_to_team(db, db_team=other_team, db_user=test_user)
+    left_team = crud_team.create_team_with_creator(db, team_in=schemas.TeamCreate(name="Inbox Left Team"), creator=test_user_b)
+    crud_team.add_user_to_team(db, db_team=left_team, db_user=test_user)
+
+    def create(title: str, team: models.team.Team, days: int, creator: models.user.User, assignee: models.user.User = None, **fields) -> models.task.Task:
+        task_in = schemas.TaskCreate(title=title, team_id=team.id, due_date=today + timedelta(days=days), assignee_id=assignee.id if assignee else None, **fields)
+        return crud_task.create_task(db, task_in=task_in, creator_id=creator.id)
+
+    create("Assigned Later", test_team, 2, test_user, test_user)
+    create("Created Only", test_team, 0, test_user)
+    create("Other Team", other_team, 1, test_user_b, test_user)
+    create("Other Team Done", other_team, 3, test_user_b, test_user, completed=True)
+    create("Not Mine", other_team, 0, test_user_b)
+    crud_task.soft_delete_task(db, db_task=create("Deleted", test_team, 0, test_user, test_user))
+    create("Left Team", left_team, 0, test_user_b, test_user)
+    crud_team.remove_user_from_team(db, db_team=left_team, db_user=test_user)
+
+    def titles(query: str = "") -> list:
+        response = client.get(f"/api/v1/tasks/mine?{query}", headers=auth_headers)
+        assert response.status_code == 200, response.text
+        return [t["title"] for t in response.json()["items"]]
+
+    assert titles() == ["Other Team", "Assigned Later", "Other Team Done"]
+    assert titles("include_created=true") == ["Created Only", "Other Team", "Assigned Later", "Other Team Done"]
+    assert titles("include_created=true&completed=false") == ["Created Only", "Other Team", "Assigned Later"]
+
+    # Keyset paging walks the same order
+    data = client.get("/api/v1/tasks/mine?include_created=true&limit=1", headers=auth_headers).json()
+    seen = [t["title"] for t in data["items"]]
+    while data["next_cursor"]:
+        data = client.get(f"/api/v1/tasks/mine?include_created=true&limit=1&cursor={data['next_cursor']}", headers=auth_headers).json()
+        assert data["total_items"] is None
+        seen.extend(t["title"] for t in data["items"])
+    assert seen == ["Created Only", "Other Team", "Assigned Later", "Other Team Done"]
+
+def test_read_my_tasks_invalid(client: TestClient, auth_headers: dict):
+    """Test that the inbox requires authentication and rejects malformed cursors."""
+    assert client.get("/api/v1/tasks/mine").status_code == 401
+    response = client.get(f"/api/v1/tasks/mine?cursor={encode_cursor(datetime(2025, 1, 1), uuid.uuid4())}", headers=auth_headers)
+    assert response.status_code == 400
+
+# --- Test Task Changes ---
+
+def test_read_task_changes(client: TestClient, db: Session, auth_headers: dict, test_team: models.team.Team, test_user: models.user.User):
+    """Test a first sync, then deltas with updates, tombstones and bulk writes in write order."""
+    a, b, c = [
+        crud_task.create_task(db, task_in=schemas.TaskCreate(title=f"Sync {name}", team_id=test_team.id, due_date=date.today()), creator_id=test_user.id)
+        for name in "ABC"
+    ]
+    url = f"/api/v1/tasks/changes?team_id={test_team.id}"
+
+    def sync(token: str = None, **params) -> dict:
+        query = "".join(f"&{key}={value}" for key, value in params.items()) + (f"&since={token}" if token else "")
+        response = client.get(url + query, headers=auth_headers)
+        assert response.status_code == 200, response.text
+        return response.json()
+
+    first = sync(limit=2)
+    assert [change["task"]["title"] for change in first["changes"]] == ["Sync A", "Sync B"] and first["has_more"]
+    rest = sync(first["next_token"], limit=2)
+    assert [change["id"] for change in rest["changes"]] == [str(c.id)] and not rest["has_more"]
+    token = rest["next_token"]
+    # Nothing changed: nothing to download, same token
+    assert sync(token) == {"changes": [], "next_token": token, "has_more": False}
+
+    crud_task.update_task(db, db_task=a, task_in=schemas.TaskUpdate(title="Sync A2"))
+    crud_task.soft_delete_task(db, db_task=b)
+    d = crud_task.create_task(db, task_in=schemas.TaskCreate(title="Sync D", team_id=test_team.id, due_date=date.today()), creator_id=test_user.id)
+    crud_task.update_tasks_bulk(db, team_ids=[test_team.id], task_ids=[c.id], values={"completed": True})
+
+    delta = sync(token)
+    assert [change["id"] for change in delta["changes"]] == [str(a.id), str(b.id), str(d.id), str(c.id)]
+    assert delta["changes"][0]["task"]["title"] == "Sync A2"
+    assert delta["changes"][1] == {"id": str(b.id), "deleted": True, "task": None}
+    assert delta["changes"][3]["task"]["completed"] is True
+    assert sync(delta["next_token"])["changes"] == []
+
+    # A first sync has no tombstones
+    assert {change["id"] for change in sync()["changes"]} == {str(a.id), str(c.id), str(d.id)}
+
+def test_read_task_changes_assignee_update(client: TestClient, db: Session, auth_headers: dict, test_team: models.team.Team, test_user: models.user.User):
+    """Test that a change to an assignee sends their tasks again, with the new embedded assignee."""
+    assigned = crud_task.create_task(db, task_in=schemas.TaskCreate(title="Sync Assigned", team_id=test_team.id, due_date=date.today(), assignee_id=test_user.id), creator_id=test_user.id)
+    crud_task.create_task(db, task_in=schemas.TaskCreate(title="Sync Unassigned", team_id=test_team.id, due_date=date.today()), creator_id=test_user.id)
+    url = f"/api/v1/tasks/changes?team_id={test_team.id}"
+    token = client.get(url, headers=auth_headers).json()["next_token"]
+
+    crud_user.update_user(db, db_user=test_user, user_in=schemas.UserUpdate(email="renamed_sync_assignee@example.com"))
+    response = client.get(f"{url}&since={token}", headers=auth_headers)
+    assert response.status_code == 200, response.text
+    changes = response.json()["changes"]
+    assert [change["id"] for change in changes] == [str(assigned.id)]
+    assert changes[0]["task"]["assignee"]["email"] == "renamed_sync_assignee@example.com"
+
+def test_read_task_changes_invalid(client: TestClient, db: Session, auth_headers: dict, test_team: models.team.Team, test_user_b: models.user.User):
+    """Test that malformed tokens and non-members are rejected."""
+    response = client.get(f"/api/v1/tasks/changes?team_id={test_team.id}&since=not-a-token", headers=auth_headers)
+    assert response.status_code == 400
+    other_team = crud_team.create_team_with_creator(db, team_in=schemas.TeamCreate(name="Changes Other Team"), creator=test_user_b)
+    assert client.get(f"/api/v1/tasks/changes?team_id={other_team.id}", headers=auth_headers).status_code == 403
+
+# --- Test Task Events ---
+
+def test_task_events(client: TestClient, db: Session, auth_headers: dict, test_team: models.team.Team, test_user: models.user.User):
+    """Test that a team's subscribers receive the committed task writes, in order, as ids only."""
+    with client.websocket_connect(f"/api/v1/tasks/events?team_id={test_team.id}", headers=auth_headers) as websocket:
+        subscribed = websocket.receive_json()
+        assert subscribed["type"] == "subscribed" and subscribed["team_id"] == str(test_team.id)
+
+        task = crud_task.create_task(db, task_in=schemas.TaskCreate(title="Pushed", team_id=test_team.id, due_date=date.today()), creator_id=test_user.id)
+        crud_task.update_task(db, db_task=task, task_in=schemas.TaskUpdate(completed=True))
+        crud_task.update_tasks_bulk(db, team_ids=[test_team.id], task_ids=[task.id], values={"is_deleted": True})
+
+        created, updated, deleted = websocket.receive_json(), websocket.receive_json(), websocket.receive_json()
+        assert created == {"type": "created", "team_id": str(test_team.id), "task_ids": [str(task.id)], "change_seq": subscribed["change_seq"] + 1}
+        assert (updated["type"], updated["task_ids"], updated["change_seq"]) == ("updated", [str(task.id)], subscribed["change_seq"] + 2)
+        assert (deleted["type"], deleted["task_ids"], deleted["change_seq"]) == ("deleted", [str(task.id)], subscribed["change_seq"] + 3)
+
+    # Events end with the connection
+    assert events.broker.subscriber_count(test_team.id) == 0
+
+def test_task_events_rejected(client: TestClient, db: Session, auth_headers: dict, test_team: models.team.Team, test_user_b: models.user.User):
+    """Test that connections without valid credentials or membership are refused, and that the token can be a query parameter."""
+    other_team = crud_team.create_team_with_creator(db, team_in=schemas.TeamCreate(name="Events Other Team"), creator=test_user_b)
+    token = auth_headers["Authorization"].split()[1]
+    for url, headers in [
+        (f"/api/v1/tasks/events?team_id={test_team.id}", {}),
+        (f"/api/v1/tasks/events?team_id={test_team.id}&token=not-a-token", {}),
+        (f"/api/v1/tasks/events?team_id={other_team.id}", auth_headers),
+        (f"/api/v1/tasks/events?team_id={uuid.uuid4()}", auth_headers),
+    ]:
+        with pytest.raises(WebSocketDisconnect) as disconnect:
+            with client.websocket_connect(url, headers=headers):
+                pass
+        assert disconnect.value.code == 1008, url
+
+    with client.websocket_connect(f"/api/v1/tasks/events?team_id={test_team.id}&token={token}") as websocket:
+        assert websocket.receive_json()["type"] == "subscribed"
+
+# --- Test Export Tasks ---
+
+def test_export_tasks_ndjson(client: TestClient, db: Session, auth_headers: dict, test_team: models.team.Team, test_user: models.user.User, monkeypatch: pytest.MonkeyPatch):
+    """Test streaming a team's tasks as NDJSON, in several chunks and with filters."""
+    from app.api.v1.endpoints import tasks as tasks_endpoints
+    monkeypatch.setattr(tasks_endpoints, "EXPORT_CHUNK_SIZE", 2)
+    for i in range(5):
+        crud_task.create_task(db, task_in=schemas.TaskCreate(title=f"Export Task {i}", team_id=test_team.id, due_date=date.today(), completed=i < 2), creator_id=test_user.id)
+
+    response = client.get(f"/api/v1/tasks/export?team_id={test_team.id}", headers=auth_headers)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert sorted(row["title"] for row in rows) == [f"Export Task {i}" for i in range(5)]
+    assert rows[0]["team_id"] == str(test_team.id)
+    assert rows[0]["due_date"] == date.today().isoformat()
+    assert "is_deleted" not in rows[0]
+
+    response = client.get(f"/api/v1/tasks/export?team_id={test_team.id}&completed=false", headers=auth_headers)
+    assert len(response.text.splitlines()) == 3
+
+def test_export_tasks_filtered_and_sorted(client: TestClient, db: Session, auth_headers: dict, test_team: models.team.Team, test_user: models.user.User):
+    """Test that the export takes the due date, priority and overdue filters and the sort of task lists."""
+    today = date.today()
+    for i, (due, priority, completed) in enumerate([(-3, 1, False), (-2, 2, True), (1, 1, False), (5, 3, False)]):
+        crud_task.create_task(db, task_in=schemas.TaskCreate(title=f"Export Filter {i}", team_id=test_team.id, due_date=today + timedelta(days=due), priority=priority, completed=completed), creator_id=test_user.id)
+    url = f"/api/v1/tasks/export?team_id={test_team.id}&format=csv"
+
+    def titles(query: str) -> list:
+        response = client.get(url + query, headers=auth_headers)
+        assert response.status_code == 200, response.text
+        return [row["title"] for row in csv.DictReader(io.StringIO(response.text))]
+
+    assert titles(f"&due_after={today.isoformat()}&due_before={(today + timedelta(days=2)).isoformat()}") == ["Export Filter 2"]
+    assert titles("&priority=1") == ["Export Filter 0", "Export Filter 2"]
+    assert titles("&overdue=true") == ["Export Filter 0"]
+    assert titles("&sort=-priority,due_date") == ["Export Filter 3", "Export Filter 1", "Export Filter 0", "Export Filter 2"]
+    assert client.get(url + "&sort=nope", headers=auth_headers).status_code == 400
+
+def test_export_tasks_csv(client: TestClient, auth_headers: dict, test_team: models.team.Team, test_task: models.task.Task):
+    """Test streaming a team's tasks as CSV with a header row."""
+    response = client.get(f"/api/v1/tasks/export?team_id={test_team.id}&format=csv", headers=auth_headers)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    assert f'filename="tasks-{test_team.id}.csv"' in response.headers["content-disposition"]
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert len(rows) == 1
+    assert rows[0]["id"] == str(test_task.id)
+    assert rows[0]["assignee_id"] == ""
+
+def test_export_tasks_forbidden(client: TestClient, db: Session, auth_headers: dict, test_user_b: models.user.User):
+    """Test exporting the tasks of a team the user is not part of."""
+    other_team = crud_team.create_team_with_creator(db, team_in=schemas.TeamCreate(name="Export Other Team"), creator=test_user_b)
+    response = client.get(f"/api/v1/tasks/export?team_id={other_team.id}", headers=auth_headers)
+    assert response.status_code == 403
+    response = client.get(f"/api/v1/tasks/export?team_id={other_team.id}&format=xml", headers=auth_headers)
+    assert response.status_code == 422
+
 # --- Test Read Single Task --- 
 
 def test_read_single_task_success(client: TestClient, auth_headers: dict, test_task: models.task.Task):
@@ -193,6 +780,129 @@ def test_read_single_task_forbidden(client: TestClient, db: Session, auth_header
     response = client.get(f"/api/v1/tasks/{other_task.id}", headers=auth_headers)
     assert response.status_code == 403 # Forbidden
 
+def test_get_task_for_user(db: Session, test_task: models.task.Task, test_user: models.user.User, test_user_b: models.user.User):
+    """Test loading a task and the user's team membership in one call."""
+    task, is_member = crud_task.get_task_for_user(db, task_id=test_task.id, user_id=test_user.id)
+    assert task is not None and task.id == test_task.id
+    assert is_member
+
+    task, is_member = crud_task.get_task_for_user(db, task_id=test_task.id, user_id=test_user_b.id)
+    assert task is not None
+    assert not is_member
+
+    crud_task.soft_delete_task(db, db_task=test_task)
+    task, _ = crud_task.get_task_for_user(db, task_id=test_task.id, user_id=test_user.id)
+    assert task is None
+    task, _ = crud_task.get_task_for_user(db, task_id=test_task.id, user_id=test_user.id, include_deleted=True)
+    assert task is not None
+
+# --- Test Conditional Requests ---
+
+def test_read_task_etag(client: TestClient, db: Session, auth_headers: dict, test_task: models.task.Task):
+    """Test that an unchanged task is answered with 304 from one small query."""
+    # SQLite timestamps have one second resolution: start from an older one
+    test_task.updated_at = datetime(2020, 1, 1)
+    db.commit()
+
+    response = client.get(f"/api/v1/tasks/{test_task.id}", headers=auth_headers)
+    assert response.status_code == 200
+    etag = response.headers["ETag"]
+
+    engine = db.get_bind()
+    statements = []
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        response = client.get(f"/api/v1/tasks/{test_task.id}", headers={**auth_headers, "If-None-Match": etag})
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+    assert response.status_code == 304
+    assert response.headers["ETag"] == etag and response.content == b""
+    assert len(statements) == 1
+
+    response = client.put(f"/api/v1/tasks/{test_task.id}", headers=auth_headers, json={"title": "Changed"})
+    assert response.headers["ETag"] != etag
+    response = client.get(f"/api/v1/tasks/{test_task.id}", headers={**auth_headers, "If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["title"] == "Changed"
+
+def test_read_tasks_etag(client: TestClient, db: Session, auth_headers: dict, test_team: models.team.Team, test_task: models.task.Task, test_user: models.user.User, test_user_b: models.user.User):
+    """Test that a team's task list is versioned by writes to the team's tasks only."""
+    url = f"/api/v1/tasks/?team_id={test_team.id}"
+    response = client.get(url, headers={**auth_headers, "Origin": "https://app.example.com"})
+    etag = response.headers["ETag"]
+    # Readable by cross-origin browser clients
+    assert "ETag" in response.headers["Access-Control-Expose-Headers"]
+    response = client.get(url, headers={**auth_headers, "If-None-Match": f'W/"other", {etag}'})
+    assert response.status_code == 304
+
+    # A write in another team leaves the list alone
+    other_team = crud_team.create_team_with_creator(db, team_in=schemas.TeamCreate(name="ETag Other Team"), creator=test_user_b)
+    crud_task.create_task(db, task_in=schemas.TaskCreate(title="Elsewhere", team_id=other_team.id, due_date=date.today()), creator_id=test_user_b.id)
+    assert client.get(url, headers={**auth_headers, "If-None-Match": etag}).status_code == 304
+
+    # Every kind of task write in the team changes the version
+    crud_task.create_task(db, task_in=schemas.TaskCreate(title="New", team_id=test_team.id, due_date=date.today()), creator_id=test_user.id)
+    response = client.get(url, headers={**auth_headers, "If-None-Match": etag})
+    assert response.status_code == 200 and response.json()["total_items"] == 2
+    etag = response.headers["ETag"]
+    client.delete(f"/api/v1/tasks/{test_task.id}", headers=auth_headers)
+    response = client.get(url, headers={**auth_headers, "If-None-Match": etag})
+    assert response.status_code == 200 and response.json()["total_items"] == 1
+
+    # So does an update of a user embedded as assignee
+    crud_team.add_user_to_team(db, db_team=test_team, db_user=test_user_b)
+    crud_task.create_task(db, task_in=schemas.TaskCreate(title="Assigned", team_id=test_team.id, due_date=date.today(), assignee_id=test_user_b.id), creator_id=test_user.id)
+    etag = client.get(url, headers=auth_headers).headers["ETag"]
+    crud_user.update_user(db, db_user=test_user_b, user_in=schemas.UserUpdate(email="renamed_assignee@example.com"))
+    response = client.get(url, headers={**auth_headers, "If-None-Match": etag})
+    assert response.status_code == 200
+    assert {item["assignee"]["email"] for item in response.json()["items"] if item["assignee"]} == {"renamed_assignee@example.com"}
+
+    # Membership is checked before answering 304
+    response = client.get(f"/api/v1/tasks/?team_id={other_team.id}", headers={**auth_headers, "If-None-Match": "*"})
+    assert response.status_code == 403
+
+def test_read_tasks_etag_per_query(client: TestClient, db: Session, auth_headers: dict, test_team: models.team.Team, test_user: models.user.User):
+    """Test that pages, filters and total modes of a team's list do not share an ETag."""
+    for i in range(4):
+        crud_task.create_task(db, task_in=schemas.TaskCreate(title=f"ETag Page {i}", team_id=test_team.id, due_date=date.today()), creator_id=test_user.id)
+    url = f"/api/v1/tasks/?team_id={test_team.id}&limit=2"
+    etag = client.get(url, headers=auth_headers).headers["ETag"]
+    assert client.get(url, headers={**auth_headers, "If-None-Match": etag}).status_code == 304
+    for query in ("&skip=2", "&completed=false", "&sort=-created_at", "&total=none"):
+        response = client.get(url + query, headers={**auth_headers, "If-None-Match": etag})
+        assert response.status_code == 200, query
+        assert response.headers["ETag"] != etag
+    next_cursor = client.get(url, headers=auth_headers).json()["next_cursor"]
+    assert client.get(f"{url}&cursor={next_cursor}", headers={**auth_headers, "If-None-Match": etag}).status_code == 200
+
+    # Estimates change without writes: no validator to revalidate them with
+    response = client.get(url + "&total=estimated", headers={**auth_headers, "If-None-Match": "*"})
+    assert response.status_code == 200 and "ETag" not in response.headers
+
+def test_update_task_if_match(client: TestClient, db: Session, auth_headers: dict, test_task: models.task.Task):
+    """Test optimistic concurrency on task updates with If-Match."""
+    test_task.updated_at = datetime(2020, 1, 1)
+    db.commit()
+    etag = client.get(f"/api/v1/tasks/{test_task.id}", headers=auth_headers).headers["ETag"]
+
+    response = client.put(f"/api/v1/tasks/{test_task.id}", headers={**auth_headers, "If-Match": '"stale"'}, json={"title": "Lost"})
+    assert response.status_code == 412
+    response = client.put(f"/api/v1/tasks/{test_task.id}", headers={**auth_headers, "If-Match": f"W/{etag}"}, json={"title": "Lost"})
+    assert response.status_code == 412  # Weak ETags never match If-Match
+
+    response = client.put(f"/api/v1/tasks/{test_task.id}", headers={**auth_headers, "If-Match": etag}, json={"title": "Won"})
+    assert response.status_code == 200
+    assert response.json()["title"] == "Won"
+    # The ETag it was based on is now stale
+    response = client.put(f"/api/v1/tasks/{test_task.id}", headers={**auth_headers, "If-Match": etag}, json={"title": "Lost"})
+    assert response.status_code == 412
+    response = client.put(f"/api/v1/tasks/{test_task.id}", headers={**auth_headers, "If-Match": "*"}, json={"completed": True})
+    assert response.status_code == 200
+    assert response.json()["title"] == "Won"
+
 # --- Test Update Task --- 
 
 def test_update_task_success(client: TestClient, db: Session, auth_headers: dict, test_task: models.task.Task):
@@ -301,4 +1011,132 @@ def test_delete_task_forbidden(client: TestClient, db: Session, auth_headers: di
     assert response.status_code == 403 # Forbidden
 
 
+# --- Test Bulk Update / Delete Tasks ---
+
+def create_team_tasks(db: Session, team: models.team.Team, creator: models.user.User, count: int, **fields) -> list:
+    return [
+        crud_task.create_task(db, task_in=schemas.TaskCreate(title=f"Bulk Edit Task {i}", team_id=team.id, due_date=date.today(), **fields), creator_id=creator.id)
+        for i in range(count)
+    ]
+
+def test_update_tasks_bulk_by_ids(client: TestClient, db: Session, auth_headers: dict, test_team: models.team.Team, test_user: models.user.User):
+    """Test applying one change set to a list of tasks with a single UPDATE."""
+    tasks = create_team_tasks(db, test_team, test_user, 3)
+    untouched = create_team_tasks(db, test_team, test_user, 1)[0]
+    ids = [str(t.id) for t in tasks]
+
+    engine = db.get_bind()
+    statements = []
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        response = client.patch("/api/v1/tasks/bulk", headers=auth_headers, json={
+            "ids": ids + [str(uuid.uuid4())],  # Unknown ids are skipped
+            "changes": {"completed": True, "priority": 2},
+        })
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+    assert response.status_code == 200, response.text
+    assert sorted(response.json()["affected_ids"]) == sorted(ids)
+    assert len([s for s in statements if s.lstrip().upper().startswith("UPDATE TASKS")]) == 1
+
+    for task in tasks:
+        db.refresh(task)
+        assert task.completed is True and task.priority == 2
+    db.refresh(untouched)
+    assert untouched.completed is False
+
+def test_update_tasks_bulk_by_filter(client: TestClient, db: Session, auth_headers: dict, test_team: models.team.Team, test_user: models.user.User):
+    """Test applying one change set to the tasks of a team matching a filter."""
+    pending = create_team_tasks(db, test_team, test_user, 3)
+    done = create_team_tasks(db, test_team, test_user, 2, completed=True)
+    response = client.patch("/api/v1/tasks/bulk", headers=auth_headers, json={
+        "filter": {"team_id": str(test_team.id), "completed": False},
+        "changes": {"assignee_id": str(test_user.id)},
+    })
+    assert response.status_code == 200, response.text
+    assert sorted(response.json()["affected_ids"]) == sorted(str(t.id) for t in pending)
+    for task in done:
+        db.refresh(task)
+        assert task.assignee_id is None
+
+def test_update_tasks_bulk_versions_matched_teams(client: TestClient, db: Session, auth_headers: dict, test_team: models.team.Team, test_user: models.user.User):
+    """Test that a bulk update only advances the tasks version of teams it changed tasks in."""
+    task = create_team_tasks(db, test_team, test_user, 1)[0]
+    other_team = crud_team.create_team_with_creator(db, team_in=schemas.TeamCreate(name="Bulk Edit Untouched Team"), creator=test_user)
+    create_team_tasks(db, other_team, test_user, 1, completed=True)
+    db.refresh(test_team)
+    db.refresh(other_team)
+    versions = (test_team.tasks_version, other_team.tasks_version)
+
+    crud_task.update_tasks_bulk(db, team_ids=[test_team.id, other_team.id], values={"priority": 1}, completed=False)
+    db.refresh(test_team)
+    db.refresh(other_team)
+    assert (test_team.tasks_version, other_team.tasks_version) == (versions[0] + 1, versions[1])
+    db.refresh(task)
+    assert task.change_seq == test_team.tasks_version
+
+def test_update_tasks_bulk_forbidden(client: TestClient, db: Session, auth_headers: dict, test_team: models.team.Team, test_user: models.user.User, test_user_b: models.user.User):
+    """Test that a bulk update touching a team the user is not part of changes nothing."""
+    own_task = create_team_tasks(db, test_team, test_user, 1)[0]
+    other_team = crud_team.create_team_with_creator(db, team_in=schemas.TeamCreate(name="Bulk Edit Other Team"), creator=test_user_b)
+    other_task = create_team_tasks(db, other_team, test_user_b, 1)[0]
+    response = client.patch("/api/v1/tasks/bulk", headers=auth_headers, json={
+        "ids": [str(own_task.id), str(other_task.id)], "changes": {"completed": True},
+    })
+    assert response.status_code == 403
+    db.refresh(own_task)
+    assert own_task.completed is False
+
+    response = client.patch("/api/v1/tasks/bulk", headers=auth_headers, json={
+        "filter": {"team_id": str(other_team.id)}, "changes": {"completed": True},
+    })
+    assert response.status_code == 403
+
+def test_update_tasks_bulk_invalid(client: TestClient, db: Session, auth_headers: dict, test_team: models.team.Team, test_user: models.user.User, test_user_b: models.user.User):
+    """Test rejected bulk updates: bad selection, team change, empty changes, outsider assignee."""
+    task = create_team_tasks(db, test_team, test_user, 1)[0]
+    response = client.patch("/api/v1/tasks/bulk", headers=auth_headers, json={
+        "ids": [str(task.id)], "filter": {"team_id": str(test_team.id)}, "changes": {"completed": True},
+    })
+    assert response.status_code == 422
+    response = client.patch("/api/v1/tasks/bulk", headers=auth_headers, json={"ids": [str(task.id)], "changes": {"team_id": str(uuid.uuid4())}})
+    assert response.status_code == 400
+    response = client.patch("/api/v1/tasks/bulk", headers=auth_headers, json={"ids": [str(task.id)], "changes": {}})
+    assert response.status_code == 400
+    response = client.patch("/api/v1/tasks/bulk", headers=auth_headers, json={"ids": [str(task.id)], "changes": {"assignee_id": str(test_user_b.id)}})
+    assert response.status_code == 400
+    db.refresh(task)
+    assert task.assignee_id is None
+
+def test_update_tasks_bulk_null_changes(client: TestClient, db: Session, auth_headers: dict, test_team: models.team.Team, test_user: models.user.User):
+    """Test that clearing a column that cannot be NULL is rejected and changes nothing."""
+    task = create_team_tasks(db, test_team, test_user, 1, priority=1)[0]
+    for field in ("title", "due_date", "completed"):
+        response = client.patch("/api/v1/tasks/bulk", headers=auth_headers, json={"ids": [str(task.id)], "changes": {field: None, "priority": 3}})
+        assert response.status_code == 422, field
+    db.refresh(task)
+    assert task.title == "Bulk Edit Task 0" and task.due_date == date.today()
+    assert task.completed is False and task.priority == 1
+
+def test_delete_tasks_bulk(client: TestClient, db: Session, auth_headers: dict, test_team: models.team.Team, test_user: models.user.User):
+    """Test soft deleting many tasks at once, by ids and by filter."""
+    by_ids = create_team_tasks(db, test_team, test_user, 2)
+    by_filter = create_team_tasks(db, test_team, test_user, 2, completed=True)
+    kept = create_team_tasks(db, test_team, test_user, 1)[0]
+
+    response = client.post("/api/v1/tasks/bulk/delete", headers=auth_headers, json={"ids": [str(t.id) for t in by_ids]})
+    assert response.status_code == 200, response.text
+    assert sorted(response.json()["affected_ids"]) == sorted(str(t.id) for t in by_ids)
+    # Deleting again affects nothing
+    response = client.post("/api/v1/tasks/bulk/delete", headers=auth_headers, json={"ids": [str(t.id) for t in by_ids]})
+    assert response.json()["affected_ids"] == []
+
+    response = client.post("/api/v1/tasks/bulk/delete", headers=auth_headers, json={"filter": {"team_id": str(test_team.id), "completed": True}})
+    assert sorted(response.json()["affected_ids"]) == sorted(str(t.id) for t in by_filter)
+
+    items, total = crud_task.get_tasks_by_team(db, team_id=test_team.id)
+    assert total == 1 and items[0].id == kept.id
+
 print("test_tasks.py loaded")
@@ -1,10 +1,14 @@
 import pytest
 from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import event, func, select
 from sqlalchemy.orm import Session
 import uuid
+from datetime import date, datetime, timedelta
 
 from app import models, schemas
-from app.crud import crud_user, crud_team
+from app.crud import crud_user, crud_task, crud_task_stats, crud_team
+from app.models.team import team_members_table, team_task_counters_table
 
 # --- Test Create Team --- 
 
@@ -42,12 +46,51 @@ def test_read_user_teams_success(client: TestClient, db: Session, auth_headers:
 
     response = client.get("/api/v1/teams/", headers=auth_headers)
     assert response.status_code == 200
-    data = response.json()
+    data = response.json()["items"]
     assert isinstance(data, list)
     assert len(data) >= 2 # Should include test_team and team2
     team_ids = [t["id"] for t in data]
     assert str(test_team.id) in team_ids
     assert team2_id in team_ids
+    assert next(t for t in data if t["id"] == str(test_team.id)) == schemas.Team.model_validate(test_team, from_attributes=True).model_dump(mode="json")
+
+def test_read_user_teams_cursor_pagination(client: TestClient, db: Session, auth_headers: dict, test_team: models.team.Team, test_user: models.user.User):
+    """Test walking the user's teams with cursors, in team id order; the Link header points to the same pages."""
+    for i in range(4):
+        crud_team.create_team_with_creator(db, team_in=schemas.TeamCreate(name=f"Paged Team {i}"), creator=test_user)
+
+    seen = []
+    url = "/api/v1/teams/?limit=2"
+    while url:
+        response = client.get(url, headers=auth_headers)
+        assert response.status_code == 200
+        data = response.json()
+        seen += [t["id"] for t in data["items"]]
+        assert data["total_items"] is None and data["page_size"] == 2
+        link = response.headers.get("Link")
+        if data["next_cursor"]:
+            url = f"/api/v1/teams/?limit=2&cursor={data['next_cursor']}"
+            assert link == f'<http://testserver{url}>; rel="next"'
+        else:
+            url = None
+            assert link is None
+    assert len(seen) == 5
+    assert seen == sorted(seen)
+
+    response = client.get("/api/v1/teams/?skip=1&cursor=abc", headers=auth_headers)
+    assert response.status_code == 400
+
+def test_read_user_teams_include_members(client: TestClient, db: Session, auth_headers: dict, test_team: models.team.Team, test_user: models.user.User, test_user_b: models.user.User, monkeypatch: pytest.MonkeyPatch):
+    """Test that included members are capped per team and omitted by default."""
+    monkeypatch.setattr(crud_team, "MEMBERS_PREVIEW_SIZE", 1)
+    crud_team.add_user_to_team(db, db_team=test_team, db_user=test_user_b)
+
+    data = client.get("/api/v1/teams/", headers=auth_headers).json()["items"]
+    assert "members" not in data[0]
+
+    data = client.get("/api/v1/teams/?include_members=true", headers=auth_headers).json()["items"]
+    assert data[0]["member_count"] == 2
+    assert [m["id"] for m in data[0]["members"]] == [min(str(test_user.id), str(test_user_b.id))]
 
 def test_read_user_teams_empty(client: TestClient, db: Session, auth_headers: dict):
     """Test reading teams when user is not part of any (after setup)."""
@@ -65,8 +108,40 @@ def test_read_user_teams_empty(client: TestClient, db: Session, auth_headers: di
     response = client.get("/api/v1/teams/", headers=isolated_auth_headers)
     assert response.status_code == 200
     data = response.json()
-    assert isinstance(data, list)
-    assert len(data) == 0
+    assert data["items"] == [] and data["next_cursor"] is None
+
+# --- Test Team Directory ---
+
+def test_read_all_teams_pages_and_cache(client: TestClient, db: Session, auth_headers: dict, test_team: models.team.Team, test_user: models.user.User):
+    """Test that the directory is paged, served from the cache, and refreshed by team writes."""
+    for i in range(2):
+        crud_team.create_team_with_creator(db, team_in=schemas.TeamCreate(name=f"Directory Team {i}"), creator=test_user)
+
+    response = client.get("/api/v1/teams/all?limit=2", headers=auth_headers)
+    assert response.status_code == 200
+    first_page = response.json()
+    assert len(first_page["items"]) == 2 and "members" not in first_page["items"][0]
+    next_url = f"/api/v1/teams/all?limit=2&cursor={first_page['next_cursor']}"
+    assert response.headers["Link"] == f'<http://testserver{next_url}>; rel="next"'
+    response = client.get(next_url, headers=auth_headers)
+    assert response.status_code == 200
+    assert response.json()["next_cursor"] is None and "Link" not in response.headers
+    ids = [t["id"] for t in first_page["items"] + response.json()["items"]]
+    assert len(ids) == 3 and ids == sorted(ids)
+
+    hits = crud_team.directory_cache.stats()["hits"]
+    assert client.get("/api/v1/teams/all?limit=2", headers=auth_headers).json() == first_page
+    assert crud_team.directory_cache.stats()["hits"] == hits + 1
+
+    response = client.put(f"/api/v1/teams/{test_team.id}", headers=auth_headers, json={"name": "Renamed In Directory"})
+    assert response.status_code == 200
+    data = client.get("/api/v1/teams/all", headers=auth_headers).json()["items"]
+    assert {t["id"]: t["name"] for t in data}[str(test_team.id)] == "Renamed In Directory"
+
+def test_read_all_teams_unauthorized(client: TestClient):
+    """Test that the directory requires authentication."""
+    response = client.get("/api/v1/teams/all")
+    assert response.status_code == 401
 
 # --- Test Read Single Team --- 
 
@@ -95,6 +170,124 @@ def test_read_single_team_forbidden(client: TestClient, db: Session, auth_header
     response = client.get(f"/api/v1/teams/{other_team.id}", headers=auth_headers)
     assert response.status_code == 403 # Forbidden
 
+def test_get_team_for_user(db: Session, test_team: models.team.Team, test_user: models.user.User, test_user_b: models.user.User):
+    """Test resolving a team and the user's membership in one call."""
+    team, is_member = crud_team.get_team_for_user(db, team_id=test_team.id, user_id=test_user.id)
+    assert team is not None and team.id == test_team.id
+    assert is_member
+
+    team, is_member = crud_team.get_team_for_user(db, team_id=test_team.id, user_id=test_user_b.id)
+    assert team is not None
+    assert not is_member
+
+    team, is_member = crud_team.get_team_for_user(db, team_id=uuid.uuid4(), user_id=test_user.id)
+    assert team is None
+    assert not is_member
+
+def test_membership_cache_hits_and_invalidation(db: Session, test_team: models.team.Team, test_user: models.user.User, test_user_b: models.user.User):
+    """Test that membership checks are served from the cache and invalidated on membership changes."""
+    cache = crud_team.membership_cache
+    assert crud_team.is_user_member_of_team(db, team_id=test_team.id, user_id=test_user.id)
+    misses = cache.stats()["misses"]
+    assert crud_team.is_user_member_of_team(db, team_id=test_team.id, user_id=test_user.id)
+    assert crud_team.get_team_access(db, team_id=test_team.id, user_id=test_user.id) == (True, True)
+    assert cache.stats()["misses"] == misses
+    assert cache.stats()["hits"] >= 2
+
+    crud_team.add_user_to_team(db, db_team=test_team, db_user=test_user_b)
+    assert crud_team.is_user_member_of_team(db, team_id=test_team.id, user_id=test_user_b.id)
+    crud_team.remove_user_from_team(db, db_team=test_team, db_user=test_user_b)
+    assert not crud_team.is_user_member_of_team(db, team_id=test_team.id, user_id=test_user_b.id)
+
+    crud_team.delete_team(db, db_team=test_team)
+    assert crud_team.get_team_access(db, team_id=test_team.id, user_id=test_user.id) == (False, False)
+
+def test_membership_cache_rechecks_missing_team(db: Session, test_team: models.team.Team, test_user_b: models.user.User):
+    """Test that a membership added behind the cache's back (e.g. by another worker) is still seen."""
+    assert not crud_team.is_user_member_of_team(db, team_id=test_team.id, user_id=test_user_b.id)
+    db.execute(team_members_table.insert().values(team_id=test_team.id, user_id=test_user_b.id))
+    assert crud_team.is_user_member_of_team(db, team_id=test_team.id, user_id=test_user_b.id)
+
+def test_membership_cache_scope(client: TestClient, db: Session, auth_headers: dict, test_team: models.team.Team, test_user: models.user.User, test_user_b: models.user.User):
+    """
+    Test that writes check memberships from the cache (creator and assignee), while list
+    reads check it inside the statement they run anyway, without consulting the cache.
+    """
+    crud_team.add_user_to_team(db, db_team=test_team, db_user=test_user_b)
+    task_data = {"title": "Cached Check", "due_date": date.today().isoformat(), "team_id": str(test_team.id), "assignee_id": str(test_user_b.id)}
+    assert client.post("/api/v1/tasks/", headers=auth_headers, json=task_data).status_code == 201
+    list_url = f"/api/v1/tasks/?team_id={test_team.id}"
+
+    statements = []
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+    engine = db.get_bind()
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        assert client.post("/api/v1/tasks/", headers=auth_headers, json=task_data).status_code == 201
+        writes = list(statements)
+        statements.clear()
+        stats = crud_team.membership_cache.stats()
+        assert client.get(list_url, headers=auth_headers).status_code == 200
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+    # Both checks of the write were cache hits: no statement read team_members
+    assert not [statement for statement in writes if "team_members" in statement]
+    # The list read its team version and the membership in one statement
+    assert len([statement for statement in statements if "team_members" in statement]) == 1
+    assert crud_team.membership_cache.stats() == stats
+
+def test_read_single_team_etag(client: TestClient, db: Session, auth_headers: dict, test_team: models.team.Team, test_user_b: models.user.User):
+    """Test 304 on an unchanged team, and a new ETag once its members change."""
+    # SQLite timestamps have one second resolution: start from an older one
+    test_team.updated_at = datetime(2020, 1, 1)
+    db.commit()
+    etag = client.get(f"/api/v1/teams/{test_team.id}", headers=auth_headers).headers["ETag"]
+    response = client.get(f"/api/v1/teams/{test_team.id}", headers={**auth_headers, "If-None-Match": etag})
+    assert response.status_code == 304
+
+    crud_team.add_user_to_team(db, db_team=test_team, db_user=test_user_b)
+    response = client.get(f"/api/v1/teams/{test_team.id}", headers={**auth_headers, "If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["member_count"] == 2
+
+# --- Test Read Replica Routing ---
+
+@pytest.fixture(scope="function")
+def replica_sessions(db: Session, monkeypatch: pytest.MonkeyPatch) -> list:
+    """Configure one fake replica sharing the test session. Returns the sessions it opened."""
+    from app.db import session as db_session
+
+    opened = []
+    def replica_session():
+        opened.append(AsyncSession(sync_session_class=lambda **kw: db))
+        return opened[-1]
+    monkeypatch.setattr(db_session, "ReplicaSessionLocals", [replica_session])
+    return opened
+
+def test_reads_routed_to_replica_until_user_writes(client: TestClient, auth_headers: dict, test_team: models.team.Team, test_user: models.user.User, replica_sessions: list):
+    """Test that reads use a replica, except for a while after the user wrote."""
+    from app.db import session as db_session
+
+    assert client.get(f"/api/v1/teams/{test_team.id}", headers=auth_headers).status_code == 200
+    assert client.get("/api/v1/teams/", headers=auth_headers).status_code == 200
+    assert client.get(f"/api/v1/tasks/?team_id={test_team.id}", headers=auth_headers).status_code == 200
+    assert len(replica_sessions) == 3
+
+    response = client.put(f"/api/v1/teams/{test_team.id}", headers=auth_headers, json={"name": "Renamed On Primary"})
+    assert response.status_code == 200
+    assert len(replica_sessions) == 3  # Writes always go to the primary
+
+    # Read-your-writes: the user is pinned to the primary during the stickiness window
+    response = client.get(f"/api/v1/teams/{test_team.id}", headers=auth_headers)
+    assert response.status_code == 200
+    assert response.json()["name"] == "Renamed On Primary"
+    assert len(replica_sessions) == 3
+
+    db_session.recent_writers.invalidate(test_user.id)  # Window expired
+    assert client.get(f"/api/v1/teams/{test_team.id}", headers=auth_headers).status_code == 200
+    assert len(replica_sessions) == 4
+
 # --- Test Update Team --- 
 
 def test_update_team_success(client: TestClient, db: Session, auth_headers: dict, test_team: models.team.Team, test_user: models.user.User):
@@ -183,7 +376,7 @@ def test_add_member_to_team_success(client: TestClient, db: Session, auth_header
     response = client.post(f"/api/v1/teams/{test_team.id}/members/{member_to_add.id}", headers=auth_headers)
     assert response.status_code == 200
     data = response.json()
-    assert any(member['id'] == str(member_to_add.id) for member in data['members'])
+    assert data['member_count'] == 2
     # Verify in DB
     assert crud_team.is_user_member_of_team(db, team_id=test_team.id, user_id=member_to_add.id)
 
@@ -206,8 +399,7 @@ def test_add_member_already_member(client: TestClient, db: Session, auth_headers
 
     response = client.post(f"/api/v1/teams/{test_team.id}/members/{member_to_add.id}", headers=auth_headers)
     assert response.status_code == 200 # OK (idempotent)
-
-    # Optionally: verify member count hasn't changed if needed
+    assert response.json()["member_count"] == 2
 
 def test_add_member_invalid_user(client: TestClient, auth_headers: dict, test_team: models.team.Team, test_user: models.user.User):
     """Test adding a non-existent user to a team."""
@@ -224,7 +416,7 @@ def test_remove_member_from_team_success(client: TestClient, db: Session, auth_h
     response = client.delete(f"/api/v1/teams/{test_team.id}/members/{member_to_add.id}", headers=auth_headers)
     assert response.status_code == 200
     data = response.json()
-    assert all(member['id'] != str(member_to_add.id) for member in data['members'])
+    assert data['member_count'] == 1
     # Verify in DB
     assert not crud_team.is_user_member_of_team(db, team_id=test_team.id, user_id=member_to_add.id)
 
@@ -256,30 +448,30 @@ def test_remove_self_from_team(client: TestClient, auth_headers: dict, test_team
 
 # --- Test List Team Members --- 
 
-@pytest.mark.skip(reason="GET /teams/{team_id}/members endpoint not implemented yet")
 def test_list_team_members_success(client: TestClient, db: Session, auth_headers: dict, test_team: models.team.Team, test_user: models.user.User, member_to_add: models.user.User):
-    """Test listing members of a team successfully."""
-    # Ensure both test_user (owner) and member_to_add are members
-    if test_team.owner_id == test_user.id:
-        crud_team.add_user_to_team(db, db_team=test_team, db_user=member_to_add)
-    else: # If test_user isn't owner, need to ensure they are at least a member
-        if not crud_team.is_user_member_of_team(db, team_id=test_team.id, user_id=test_user.id):
-             crud_team.add_user_to_team(db, db_team=test_team, db_user=test_user)
-        # Can't add member_to_add in this case as not owner
-
-    response = client.get(f"/api/v1/teams/{test_team.id}/members", headers=auth_headers)
+    """Test listing members of a team successfully, one page at a time."""
+    crud_team.add_user_to_team(db, db_team=test_team, db_user=member_to_add)
+
+    response = client.get(f"/api/v1/teams/{test_team.id}/members?limit=1", headers=auth_headers)
     assert response.status_code == 200
     data = response.json()
-    assert isinstance(data, list)
-    member_ids = [m["id"] for m in data]
-    assert str(test_user.id) in member_ids
-    if test_team.owner_id == test_user.id:
-        assert str(member_to_add.id) in member_ids
-        assert len(data) >= 2
-    else:
-        assert len(data) >= 1
-
-@pytest.mark.skip(reason="GET /teams/{team_id}/members endpoint not implemented yet")
+    assert data["total_items"] == 2
+    assert len(data["items"]) == 1 and data["next_cursor"] is not None
+    member_ids = [m["id"] for m in data["items"]]
+
+    response = client.get(f"/api/v1/teams/{test_team.id}/members?limit=1&cursor={data['next_cursor']}", headers=auth_headers)
+    assert response.status_code == 200
+    data = response.json()
+    assert data["next_cursor"] is None
+    member_ids += [m["id"] for m in data["items"]]
+    assert member_ids == sorted([str(test_user.id), str(member_to_add.id)])
+    assert "hashed_password" not in data["items"][0]
+
+def test_list_team_members_invalid_cursor(client: TestClient, auth_headers: dict, test_team: models.team.Team):
+    """Test that a malformed cursor is rejected."""
+    response = client.get(f"/api/v1/teams/{test_team.id}/members?cursor=not-a-cursor", headers=auth_headers)
+    assert response.status_code == 400
+
 def test_list_team_members_forbidden(client: TestClient, db: Session, auth_headers: dict):
     """Test listing members of a team the user is not part of."""
     # Create team user is not part of
@@ -291,4 +483,69 @@ def test_list_team_members_forbidden(client: TestClient, db: Session, auth_heade
     response = client.get(f"/api/v1/teams/{other_team.id}/members", headers=auth_headers)
     assert response.status_code == 403 # Forbidden
 
+# --- Test Team Stats ---
+
+def test_read_team_stats(client: TestClient, db: Session, auth_headers: dict, test_team: models.team.Team, test_user: models.user.User, test_user_b: models.user.User):
+    """Test that the counters behind the stats follow every kind of task write."""
+    today = date.today()
+    crud_team.add_user_to_team(db, db_team=test_team, db_user=test_user_b)
+
+    def create(days: int, **fields) -> models.task.Task:
+        task_in = schemas.TaskCreate(title="Stats Task", team_id=test_team.id, due_date=today + timedelta(days=days), **fields)
+        return crud_task.create_task(db, task_in=task_in, creator_id=test_user.id)
+
+    late = create(-2, priority=1, assignee_id=test_user.id)
+    create(-1, priority=2, completed=True)
+    upcoming = create(3, priority=1, assignee_id=test_user_b.id)
+    deleted = create(-5)
+    bulk_tasks, errors = crud_task.create_tasks_bulk(db, tasks_in=[
+        schemas.TaskCreate(title="Stats Bulk", team_id=test_team.id, due_date=today, priority=3) for _ in range(2)
+    ], creator_id=test_user.id)
+    assert not errors
+
+    crud_task.update_task(db, db_task=upcoming, task_in=schemas.TaskUpdate(assignee_id=test_user.id, priority=2))
+    crud_task.update_task(db, db_task=late, task_in=schemas.TaskUpdate(title="Renamed"))
+    crud_task.soft_delete_task(db, db_task=deleted)
+    crud_task.update_tasks_bulk(db, team_ids=[test_team.id], task_ids=[bulk_tasks[0].id], values={"completed": True})
+
+    response = client.get(f"/api/v1/teams/{test_team.id}/stats", headers=auth_headers)
+    assert response.status_code == 200, response.text
+    assert response.json() == {
+        "team_id": str(test_team.id),
+        "total": 5,
+        "open": 3,
+        "completed": 2,
+        "overdue": 1,
+        "by_priority": {"1": 1, "2": 1, "3": 1},
+        "by_assignee": {str(test_user.id): 2, "none": 1},
+    }
+    # Counters emptied by the writes above, like the due date of the deleted task, are gone
+    counters = team_task_counters_table
+    assert db.scalar(select(func.count()).select_from(counters).where(counters.c.team_id == test_team.id, counters.c.count == 0)) == 0
+    assert db.scalar(select(func.count()).select_from(counters).where(counters.c.team_id == test_team.id, counters.c.key == (today - timedelta(days=5)).isoformat())) == 0
+    # The counters match a recount from the tasks
+    assert crud_task_stats.reconcile_task_stats(db, team_ids=[test_team.id]) == []
+
+def test_reconcile_team_stats(db: Session, test_team: models.team.Team, test_user: models.user.User):
+    """Test that reconciliation rewrites drifted counters and drops empty ones."""
+    task = crud_task.create_task(db, task_in=schemas.TaskCreate(title="Drift", team_id=test_team.id, due_date=date.today()), creator_id=test_user.id)
+    crud_task.update_task(db, db_task=task, task_in=schemas.TaskUpdate(completed=True))
+    expected = crud_task_stats.get_team_task_stats(db, team_id=test_team.id)
+
+    counters = team_task_counters_table
+    db.execute(counters.update().where(counters.c.team_id == test_team.id, counters.c.key == "completed").values(count=7))
+    db.commit()
+    assert crud_task_stats.get_team_task_stats(db, team_id=test_team.id)["completed"] == 7
+
+    assert crud_task_stats.reconcile_task_stats(db) == [test_team.id]
+    assert crud_task_stats.get_team_task_stats(db, team_id=test_team.id) == expected
+    assert db.scalar(select(func.min(counters.c.count)).where(counters.c.team_id == test_team.id)) == 1
+    assert crud_task_stats.reconcile_task_stats(db) == []
+
+def test_read_team_stats_forbidden(client: TestClient, db: Session, auth_headers: dict, test_user_b: models.user.User):
+    """Test that only members read a team's stats."""
+    other_team = crud_team.create_team_with_creator(db, team_in=schemas.TeamCreate(name="Team Stats Forbidden"), creator=test_user_b)
+    assert client.get(f"/api/v1/teams/{other_team.id}/stats", headers=auth_headers).status_code == 403
+    assert client.get(f"/api/v1/teams/{uuid.uuid4()}/stats", headers=auth_headers).status_code == 404
+
 print("test_teams.py loaded")
@@ -0,0 +1,108 @@
+import asyncio
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app import models, schemas
+from app.crud import crud_user
+
+# --- Test Create User ---
+
+def test_create_user_success(client: TestClient, db: Session):
+    """Test signing up a new user."""
+    user_data = {"email": "signup@example.com", "password": "signuppass"}
+    response = client.post("/api/v1/users/", json=user_data)
+    assert response.status_code == 201
+    data = response.json()
+    assert data["email"] == user_data["email"]
+    assert "password" not in data and "hashed_password" not in data
+    # Verify in DB
+    db_user = crud_user.get_user_by_email(db, email=user_data["email"])
+    assert db_user is not None
+    assert db_user.hashed_password != user_data["password"]
+
+def test_create_user_duplicate_email(client: TestClient, test_user: models.user.User):
+    """Test signing up with an email that is already registered."""
+    response = client.post("/api/v1/users/", json={"email": test_user.email, "password": "whatever"})
+    assert response.status_code == 400
+
+# --- Test Principal Cache ---
+
+def test_principal_cache_serves_repeat_requests(client: TestClient, auth_headers: dict, test_team: models.team.Team):
+    """Test that the authenticated user is loaded once and then served from the cache."""
+    response = client.get("/api/v1/teams/", headers=auth_headers)
+    assert response.status_code == 200
+    hits = crud_user.principal_cache.stats()["hits"]
+
+    response = client.get("/api/v1/teams/", headers=auth_headers)
+    assert response.status_code == 200
+    assert crud_user.principal_cache.stats()["hits"] == hits + 1
+
+    # A cached principal still works where the ORM instance is needed (team creator)
+    response = client.post("/api/v1/teams/", headers=auth_headers, json={"name": "Team From Cached User"})
+    assert response.status_code == 201
+    assert crud_user.principal_cache.stats()["hits"] == hits + 2
+
+def test_principal_cache_invalidated_on_deactivation(client: TestClient, db: Session, auth_headers: dict, test_user: models.user.User):
+    """Test that deactivating a user takes effect immediately despite the cache."""
+    response = client.get("/api/v1/teams/", headers=auth_headers)
+    assert response.status_code == 200
+
+    crud_user.update_user(db, db_user=test_user, user_in=schemas.UserUpdate(is_active=False))
+
+    response = client.get("/api/v1/teams/", headers=auth_headers)
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Inactive user"
+
+
+# --- Test Password Executor Saturation ---
+
+@pytest.fixture(scope="function")
+def saturated_password_executor(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Replace the password job slots with a single slot that is already taken."""
+    from app.core import security
+
+    slots = threading.BoundedSemaphore(1)
+    slots.acquire()
+    monkeypatch.setattr(security, "password_slots", slots)
+
+def test_signup_rejected_when_password_executor_saturated(client: TestClient, saturated_password_executor: None):
+    """Test that signup fails fast with 503 instead of queueing behind other bcrypt work."""
+    response = client.post("/api/v1/users/", json={"email": "busy@example.com", "password": "busypass"})
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+
+def test_login_rejected_when_password_executor_saturated(client: TestClient, test_user: models.user.User, saturated_password_executor: None):
+    """Test that login fails fast with 503 when bcrypt capacity is exhausted."""
+    response = client.post("/api/v1/login/access-token", data={"username": test_user.email, "password": "testpassword"})
+    assert response.status_code == 503
+
+def test_password_slot_held_until_job_finishes(monkeypatch: pytest.MonkeyPatch):
+    """Test that a caller going away (client disconnect) does not free the slot of a job still running."""
+    from app.core import security
+
+    slots = threading.BoundedSemaphore(1)
+    monkeypatch.setattr(security, "password_slots", slots)
+    started, finish = threading.Event(), threading.Event()
+
+    def slow_job() -> None:
+        started.set()
+        finish.wait(5)
+
+    async def cancel_caller() -> None:
+        caller = asyncio.create_task(security.run_password_job(slow_job))
+        await asyncio.to_thread(started.wait, 5)
+        caller.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await caller
+
+    asyncio.run(cancel_caller())
+    # The job still runs: its slot is still taken
+    assert not slots.acquire(blocking=False)
+    finish.set()
+    assert slots.acquire(timeout=5)
+
+
+print("test_users.py loaded")
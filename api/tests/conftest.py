@@ -4,6 +4,7 @@ from typing import Generator, Any
 from app import models # Import your models from top-level app
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import sessionmaker, Session
 
 from main import app  # Import your FastAPI app from top-level main.py
@@ -61,15 +62,34 @@ def db() -> Generator[Session, Any, None]:
         connection.close()
 
 
+@pytest.fixture(scope="function", autouse=True)
+def clear_caches() -> Generator[None, Any, None]:
+    """In-process caches outlive the per-test rollback, so reset them around every test."""
+    from app.crud import crud_team, crud_user
+    from app.db import session as db_session
+
+    crud_team.membership_cache.clear()
+    crud_team.directory_cache.clear()
+    crud_user.principal_cache.clear()
+    db_session.recent_writers.clear()
+    yield
+    crud_team.membership_cache.clear()
+    crud_team.directory_cache.clear()
+    crud_user.principal_cache.clear()
+    db_session.recent_writers.clear()
+
+
 # --- Test Client Setup ---
 @pytest.fixture(scope="function")
 def client(db: Session) -> Generator[TestClient, Any, None]:
     """Fixture to provide a TestClient with overridden database dependency."""
     print("\n Creating TestClient")
-    def override_get_db():
+    async def override_get_db():
+        # Endpoints expect an AsyncSession. Proxy the test's sync session through one
+        # so requests and test code share the same transaction (rolled back after the test).
         try:
             # print(" Overriding get_db")
-            yield db
+            yield AsyncSession(sync_session_class=lambda **kw: db)
         finally:
             # print(" Closing overridden db")
             # Session is closed by the 'db' fixture's finally block
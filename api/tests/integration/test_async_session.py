@@ -0,0 +1,171 @@
+# api/tests/integration/test_async_session.py
+"""
+Runs the API against real async drivers (aiosqlite, and asyncpg when
+TEST_POSTGRES_URL is set) instead of the shared sync test session.
+
+With an async driver, any attribute that is lazily loaded while a response is
+being serialized raises MissingGreenlet, so these tests catch endpoints that
+return objects which are not fully loaded.
+"""
+import os
+import datetime
+import uuid
+from typing import Any, Generator
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from main import app
+from app.api import deps
+from app.db.base import Base
+from app.db.session import get_async_database_url
+
+SQLITE_URL = "sqlite:///./test_async.db"
+POSTGRES_URL = os.environ.get("TEST_POSTGRES_URL")
+
+
+@pytest.fixture(scope="module", params=["sqlite", "postgresql"])
+def database_url(request) -> Generator[str, Any, None]:
+    """Sync URL of a database with freshly created tables."""
+    if request.param == "sqlite":
+        url = SQLITE_URL
+    elif POSTGRES_URL is None:
+        pytest.skip("TEST_POSTGRES_URL not set")
+    else:
+        url = POSTGRES_URL
+    engine = create_engine(url)
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    yield url
+    Base.metadata.drop_all(bind=engine)
+    engine.dispose()
+    if url == SQLITE_URL and os.path.exists("./test_async.db"):
+        os.remove("./test_async.db")
+
+
+@pytest.fixture(scope="function")
+def async_client(database_url: str) -> Generator[TestClient, Any, None]:
+    """TestClient whose requests each get a real AsyncSession, as in production."""
+    # NullPool: connections must not outlive the event loop of the TestClient
+    engine = create_async_engine(get_async_database_url(database_url), poolclass=NullPool)
+    session_factory = async_sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
+
+    async def override_get_db():
+        async with session_factory() as db:
+            yield db
+
+    app.dependency_overrides[deps.get_db] = override_get_db
+    with TestClient(app) as c:
+        yield c
+    del app.dependency_overrides[deps.get_db]
+
+
+def signup_and_login(client: TestClient, email: str, password: str) -> dict:
+    response = client.post("/api/v1/users/", json={"email": email, "password": password})
+    assert response.status_code == 201, response.text
+    response = client.post("/api/v1/login/access-token", data={"username": email, "password": password})
+    assert response.status_code == 200, response.text
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+def test_async_team_task_lifecycle(async_client: TestClient):
+    """Every endpoint returns a fully loaded response when backed by an async driver."""
+    suffix = uuid.uuid4().hex[:6]
+    headers_a = signup_and_login(async_client, f"async_a_{suffix}@example.com", "password_a")
+    headers_b = signup_and_login(async_client, f"async_b_{suffix}@example.com", "password_b")
+
+    # Team creation and membership
+    response = async_client.post("/api/v1/teams/", headers=headers_a, json={"name": f"Async Team {suffix}"})
+    assert response.status_code == 201, response.text
+    team = response.json()
+    assert team["member_count"] == 1
+
+    # User B creates a team of their own, whose member list tells us their id
+    response = async_client.post("/api/v1/teams/", headers=headers_b, json={"name": f"Async Team B {suffix}"})
+    assert response.status_code == 201, response.text
+    response = async_client.get(f"/api/v1/teams/{response.json()['id']}/members", headers=headers_b)
+    assert response.status_code == 200, response.text
+    user_b_id = response.json()["items"][0]["id"]
+
+    response = async_client.post(f"/api/v1/teams/{team['id']}/members/{user_b_id}", headers=headers_a)
+    assert response.status_code == 200, response.text
+    assert response.json()["member_count"] == 2
+    response = async_client.get(f"/api/v1/teams/{team['id']}/members?limit=1", headers=headers_b)
+    assert response.status_code == 200, response.text
+    assert response.json()["total_items"] == 2 and response.json()["next_cursor"] is not None
+
+    response = async_client.get(f"/api/v1/teams/{team['id']}", headers=headers_b)
+    assert response.status_code == 200, response.text
+    response = async_client.put(f"/api/v1/teams/{team['id']}", headers=headers_a, json={"name": f"Async Team Renamed {suffix}"})
+    assert response.status_code == 200, response.text
+    response = async_client.get("/api/v1/teams/", headers=headers_a)
+    assert response.status_code == 200, response.text
+    response = async_client.get("/api/v1/teams/all", headers=headers_b)
+    assert response.status_code == 200, response.text
+
+    # Task lifecycle
+    due_date = (datetime.date.today() + datetime.timedelta(days=3)).isoformat()
+    response = async_client.post("/api/v1/tasks/", headers=headers_a, json={
+        "title": "Async Task", "team_id": team["id"], "due_date": due_date, "assignee_id": user_b_id,
+    })
+    assert response.status_code == 201, response.text
+    task = response.json()
+    assert task["assignee"]["id"] == user_b_id
+
+    response = async_client.post("/api/v1/tasks/bulk", headers=headers_a, json={"items": [
+        {"title": f"Async Bulk Task {i}", "team_id": team["id"], "due_date": due_date, "assignee_id": user_b_id}
+        for i in range(3)
+    ]})
+    assert response.status_code == 201, response.text
+    assert all(t["assignee"]["id"] == user_b_id for t in response.json())
+    bulk_ids = [t["id"] for t in response.json()]
+    response = async_client.patch("/api/v1/tasks/bulk", headers=headers_b, json={"ids": bulk_ids, "changes": {"priority": 1}})
+    assert response.status_code == 200, response.text
+    assert sorted(response.json()["affected_ids"]) == sorted(bulk_ids)
+
+    response = async_client.get(f"/api/v1/tasks/?team_id={team['id']}", headers=headers_b)
+    assert response.status_code == 200, response.text
+    assert response.json()["total_items"] == 4
+    csv_content = f"title,due_date,assignee_id\nImported 1,{due_date},{user_b_id}\nImported 2,{due_date},\n"
+    response = async_client.post(f"/api/v1/tasks/import?team_id={team['id']}", headers=headers_b,
+                                 files={"file": ("tasks.csv", csv_content.encode(), "text/csv")})
+    assert response.status_code == 201, response.text
+    assert response.json()["imported"] == 2
+
+    response = async_client.get(f"/api/v1/tasks/search?team_id={team['id']}&q=imported&limit=1", headers=headers_b)
+    assert response.status_code == 200, response.text
+    page = response.json()
+    assert page["items"][0]["task"]["title"].startswith("Imported") and "<mark>" in page["items"][0]["snippet"]
+    response = async_client.get(f"/api/v1/tasks/search?team_id={team['id']}&q=imported&cursor={page['next_cursor']}", headers=headers_b)
+    assert response.status_code == 200, response.text
+    assert len(response.json()["items"]) == 1
+    response = async_client.get(f"/api/v1/tasks/export?team_id={team['id']}&format=csv", headers=headers_b)
+    assert response.status_code == 200, response.text
+    assert len(response.text.splitlines()) == 7  # Header and six tasks
+    response = async_client.get(f"/api/v1/tasks/{task['id']}", headers=headers_b)
+    assert response.status_code == 200, response.text
+    etag = response.headers["ETag"]
+    response = async_client.get(f"/api/v1/tasks/{task['id']}", headers={**headers_b, "If-None-Match": etag})
+    assert response.status_code == 304, response.text
+    response = async_client.put(f"/api/v1/tasks/{task['id']}", headers={**headers_b, "If-Match": etag}, json={"completed": True})
+    assert response.status_code == 200, response.text
+    assert response.json()["completed"] is True
+    assert response.json()["assignee"]["id"] == user_b_id
+    response = async_client.delete(f"/api/v1/tasks/{task['id']}", headers=headers_a)
+    assert response.status_code == 204, response.text
+    response = async_client.post("/api/v1/tasks/bulk/delete", headers=headers_a, json={"filter": {"team_id": team["id"]}})
+    assert response.status_code == 200, response.text
+    assert len(response.json()["affected_ids"]) == 5  # Bulk created and imported tasks
+    assert set(bulk_ids) <= set(response.json()["affected_ids"])
+
+    # Member removal and team deletion
+    response = async_client.delete(f"/api/v1/teams/{team['id']}/members/{user_b_id}", headers=headers_a)
+    assert response.status_code == 200, response.text
+    assert response.json()["member_count"] == 1
+    response = async_client.delete(f"/api/v1/teams/{team['id']}", headers=headers_a)
+    assert response.status_code == 204, response.text
+    response = async_client.get(f"/api/v1/teams/{team['id']}", headers=headers_a)
+    assert response.status_code == 404
@@ -0,0 +1,90 @@
+# api/tests/integration/test_db_pool.py
+"""
+Engine options built from the pool settings, and checkout wait metrics of
+the measured pool against a real aiosqlite engine.
+"""
+import asyncio
+import os
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.core.config import settings
+from app.db import session as db_session
+from app.db.session import MeasuredAsyncQueuePool, engine_options, pool_stats
+
+SQLITE_URL = "sqlite+aiosqlite:///./test_pool.db"
+POSTGRES_ASYNC_URL = "postgresql+asyncpg://postgres@localhost/app"
+
+
+@pytest.fixture(autouse=True)
+def reset_pool_stats():
+    pool_stats.reset()
+    yield
+    pool_stats.reset()
+    if os.path.exists("./test_pool.db"):
+        os.remove("./test_pool.db")
+
+
+def test_engine_options_from_settings(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(settings, "DB_POOL_SIZE", 20)
+    monkeypatch.setattr(settings, "DB_MAX_OVERFLOW", 0)
+    monkeypatch.setattr(settings, "DB_POOL_PRE_PING", False)
+    monkeypatch.setattr(settings, "DB_STATEMENT_TIMEOUT_MS", 5000)
+
+    options = engine_options(POSTGRES_ASYNC_URL, is_async=True)
+    assert options["poolclass"] is MeasuredAsyncQueuePool
+    assert options["pool_size"] == 20
+    assert options["max_overflow"] == 0
+    assert options["pool_pre_ping"] is False
+    assert options["connect_args"] == {"server_settings": {"statement_timeout": "5000"}}
+
+    options = engine_options("postgresql+psycopg2://postgres@localhost/app", is_async=False)
+    assert options["connect_args"] == {"options": "-c statement_timeout=5000"}
+
+    # SQLite has no statement_timeout
+    assert engine_options(SQLITE_URL, is_async=True)["connect_args"] == {}
+
+
+def test_engine_options_pgbouncer_mode(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(settings, "DB_PGBOUNCER_MODE", True)
+    monkeypatch.setattr(settings, "DB_STATEMENT_TIMEOUT_MS", 5000)
+
+    options = engine_options(POSTGRES_ASYNC_URL, is_async=True)
+    assert options["poolclass"] is NullPool
+    assert "pool_size" not in options
+    connect_args = options["connect_args"]
+    assert connect_args["statement_cache_size"] == 0
+    assert connect_args["prepared_statement_cache_size"] == 0
+    assert connect_args["prepared_statement_name_func"]() != connect_args["prepared_statement_name_func"]()
+    # The timeout is set per transaction instead of per session
+    assert "server_settings" not in connect_args
+
+
+def test_measured_pool_records_waits_and_timeouts():
+    async def exercise():
+        engine = create_async_engine(
+            SQLITE_URL, poolclass=MeasuredAsyncQueuePool, pool_size=1, max_overflow=0, pool_timeout=0.2,
+        )
+        try:
+            async with engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+                assert db_session.pool_status(engine.pool)["checked_out"] == 1
+                # The only connection is taken: the next checkout waits, then times out
+                with pytest.raises(PoolTimeoutError):
+                    async with engine.connect():
+                        pass
+            async with engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+            return db_session.pool_status(engine.pool)
+        finally:
+            await engine.dispose()
+
+    status = asyncio.run(exercise())
+    assert status["checkouts"] == 2
+    assert status["timeouts"] == 1
+    assert status["checked_out"] == 0
+    assert status["wait_seconds_max"] >= 0
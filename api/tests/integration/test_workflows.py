@@ -35,7 +35,7 @@ def test_team_task_lifecycle(
     response_add_member = client.post(f"/api/v1/teams/{team_id}/members/{test_user_b.id}", headers=auth_headers)
     assert response_add_member.status_code == 200, f"Failed to add member: {response_add_member.text}"
     team_data_after_add = response_add_member.json()
-    assert any(member['id'] == str(test_user_b.id) for member in team_data_after_add['members']), "User B not found in response members list"
+    assert team_data_after_add['member_count'] == 2, "User B not counted in response member_count"
     # Verify User B is a member in DB
     db.refresh(db_team)
     assert any(member.id == test_user_b.id for member in db_team.members), "User B not found in DB team members"
@@ -78,7 +78,7 @@ def test_team_task_lifecycle(
     response_remove_member = client.delete(f"/api/v1/teams/{team_id}/members/{test_user_b.id}", headers=auth_headers)
     assert response_remove_member.status_code == 200, f"Failed to remove member: {response_remove_member.text}"
     team_data_after_remove = response_remove_member.json()
-    assert all(member['id'] != str(test_user_b.id) for member in team_data_after_remove['members']), "User B still found in response members list after removal"
+    assert team_data_after_remove['member_count'] == 1, "User B still counted in response member_count after removal"
     # Verify User B is not a member in DB
     db.refresh(db_team)
     assert all(member.id != test_user_b.id for member in db_team.members), "User B still found in DB team members after removal"